@@ -0,0 +1,97 @@
+"""Benchmark: cost of a phase cue on the caller's thread, and its start latency.
+
+A sound device that plays synchronously (``winsound.PlaySound``, ``aplay``)
+is stood in for by a sink that sleeps for the length of the cue. Playing
+inline, as a richer cue called from ``_handle_phase_start`` would, blocks
+the caller for that long; ``CueEngine.cue`` only enqueues. Cue start
+latency is measured from each scheduled boundary while the main thread
+keeps busy with simulated frame work, as the Tk loop does; the device
+run spaces its boundaries by at least the longest cue, so nothing queues.
+Run from the ``python`` directory::
+
+    python -m benchmarks.bench_audio --cues 20 --interval 0.1 --load-ms 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from circuit_timer_pkg.adapters.audio import REST, WORK, AudioSink, Cue, CueEngine, NullSink, render_cues
+
+NAMES = (WORK, REST)
+
+
+class DeviceSink(AudioSink):
+    """Blocks for the duration of the cue, like a synchronous sound API."""
+
+    def play(self, cue: Cue) -> None:
+        time.sleep(cue.duration)
+
+
+def busy(seconds: float) -> None:
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def run(count: int, interval: float, load_ms: float) -> dict:
+    start = time.perf_counter()
+    cues = render_cues()
+    render_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    DeviceSink().play(cues[WORK])
+    inline_ms = (time.perf_counter() - start) * 1000
+
+    results = {"render_ms": render_ms, "inline_ms": inline_ms}
+    longest = max(cue.duration for cue in cues.values())
+    for label, sink, spacing in (("null", NullSink(), interval), ("device", DeviceSink(), max(interval, longest))):
+        engine = CueEngine(sink, cues, clock=time.perf_counter)
+        enqueue_max = enqueue_total = 0.0
+        due = time.perf_counter() + spacing
+        for index in range(count):
+            time.sleep(max(0.0, due - time.perf_counter()))
+            start = time.perf_counter()
+            engine.cue(NAMES[index % len(NAMES)], due)
+            spent = time.perf_counter() - start
+            enqueue_total += spent
+            enqueue_max = max(enqueue_max, spent)
+            busy(load_ms / 1000)
+            due += spacing
+        engine.close()
+        latency = engine.latency
+        results.update(
+            {
+                f"{label}_enqueue_us_mean": enqueue_total / count * 1e6,
+                f"{label}_enqueue_us_max": enqueue_max * 1e6,
+                f"{label}_latency_ms_mean": latency.total / latency.count * 1000 if latency.count else 0.0,
+                f"{label}_latency_ms_max": latency.max * 1000,
+                f"{label}_played": engine.played,
+                f"{label}_dropped": engine.dropped,
+            }
+        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cues", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=0.1, help="境界の間隔 (秒)")
+    parser.add_argument("--load-ms", type=float, default=3.0, help="境界ごとにメインスレッドで消費する CPU 時間 (ms)")
+    parser.add_argument("--budget-us", type=float, default=500.0, help="呼び出し側の 1 回あたりの上限 (µs)")
+    parser.add_argument("--budget-ms", type=float, default=20.0, help="null シンクでの開始遅延の上限 (ms)")
+    args = parser.parse_args()
+
+    result = run(args.cues, args.interval, args.load_ms)
+    for key, value in result.items():
+        print(f"{key:>26}: {value:.3f}" if isinstance(value, float) else f"{key:>26}: {value}")
+    worst = max(result["null_enqueue_us_max"], result["device_enqueue_us_max"])
+    if worst > args.budget_us:
+        raise SystemExit(f"キューの投入に {worst:.0f} µs かかりました (上限 {args.budget_us:.0f} µs)。")
+    if result["null_latency_ms_max"] > args.budget_ms:
+        raise SystemExit(f"キューの開始遅延が {args.budget_ms:.0f} ms を超えました。")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Benchmark: JSON snapshot vs mmap binary snapshot for startup, lookups and paging.
+
+Run from the ``python`` directory::
+
+    python -m benchmarks.bench_binary --menus 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from circuit_timer_pkg.adapters import storage
+from circuit_timer_pkg.adapters.binary_store import MenuSnapshot, convert
+from circuit_timer_pkg.domain.menu import TrainingMenu
+
+
+def make_menus(count: int) -> dict:
+    rng = random.Random(0)
+    return {
+        f"menu-{idx:07d}": TrainingMenu.from_seconds(
+            name=f"menu-{idx:07d}",
+            set_seconds=rng.randint(10, 120),
+            rest_seconds=rng.randint(0, 60),
+            sets=rng.randint(1, 20),
+        )
+        for idx in range(count)
+    }
+
+
+def run(count: int, lookups: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = Path(tmp) / "menus.json"
+        bin_path = Path(tmp) / "menus.ctm"
+        menus = make_menus(count)
+        storage.save_menus(menus, json_path)
+        convert(json_path, bin_path)
+        names = [f"menu-{random.randrange(count):07d}" for _ in range(lookups)]
+
+        start = time.perf_counter()
+        loaded = storage.load_menus(json_path)
+        page = [loaded[name] for name in sorted(loaded)[:50]]
+        json_first_page = time.perf_counter() - start
+
+        start = time.perf_counter()
+        snapshot = MenuSnapshot(bin_path)
+        page = snapshot.page(0, 50)
+        binary_first_page = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for name in names:
+            snapshot.get(name)
+        binary_lookup = time.perf_counter() - start
+
+        start = time.perf_counter()
+        binary_all = snapshot.load_all()
+        binary_load_all = time.perf_counter() - start
+        snapshot.close()
+
+        assert page and binary_all == loaded == menus
+        return {
+            "menus": count,
+            "json_bytes": json_path.stat().st_size,
+            "binary_bytes": bin_path.stat().st_size,
+            "json_first_page_ms": json_first_page * 1000,
+            "binary_first_page_ms": binary_first_page * 1000,
+            "binary_lookup_us": binary_lookup / lookups * 1e6,
+            "binary_load_all_ms": binary_load_all * 1000,
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--menus", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=1_000)
+    args = parser.parse_args()
+    for key, value in run(args.menus, args.lookups).items():
+        print(f"{key:>22}: {value:.3f}" if isinstance(value, float) else f"{key:>22}: {value}")
+
+
+if __name__ == "__main__":
+    main()
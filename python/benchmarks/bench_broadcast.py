@@ -0,0 +1,195 @@
+"""Benchmark: one timer fanned out to many loopback subscribers.
+
+The publisher runs a workout on a fast schedule (``--interval`` seconds per
+timer second) while a separate process holds ``--clients`` subscribers and
+reads them through one selector. Latency runs from the moment the timer
+reached a tick (the frame's own timestamp; both processes share the
+monotonic clock) to the frame's arrival at each subscriber, so it includes
+the publisher's lateness as well as the fan-out. Bytes are counted by the
+publisher; the wire estimate adds IPv4/TCP (with timestamps) or IPv4/UDP
+headers per frame, leaving out ACKs. The size of sending the whole display
+state as JSON every tick is shown for comparison. ``--sets`` runs the last
+``--seconds`` of a long template instead, so phase indices and counts go
+past 16 bits.
+Run from the ``python`` directory::
+
+    python -m benchmarks.bench_broadcast --clients 1000 --seconds 60 --interval 0.1
+    python -m benchmarks.bench_broadcast --clients 100 --sets 40000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import multiprocessing
+import selectors
+import statistics
+import time
+from typing import Dict, List
+
+from circuit_timer_pkg.adapters.broadcast import (
+    MULTICAST_GROUP,
+    Endpoint,
+    MulticastPublisher,
+    TcpBroadcastServer,
+    open_subscriber,
+)
+from circuit_timer_pkg.domain.broadcast import CompleteMessage, Publisher, TickMessage
+from circuit_timer_pkg.domain.controller import TICK_MS, TimerController
+from circuit_timer_pkg.domain.menu import TrainingMenu
+from circuit_timer_pkg.domain.scheduler import TickSchedule, run_until_complete
+
+TCP_HEADERS = 20 + 32
+UDP_HEADERS = 20 + 8
+LOOPBACK = "127.0.0.1"
+UDP_PORT = 48765
+
+
+def raise_file_limit(needed: int) -> None:
+    try:
+        import resource
+    except ImportError:  # pragma: no cover - not on Windows
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft != resource.RLIM_INFINITY and soft < needed:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (needed if hard == resource.RLIM_INFINITY else min(needed, hard), hard))
+
+
+def swarm(endpoint: Endpoint, count: int, conn) -> None:
+    """Subscriber side: ``count`` subscribers, latencies of every TICK frame sent back over ``conn``."""
+
+    subscribers = [open_subscriber(endpoint, interface=LOOPBACK) for _ in range(count)]
+    selector = selectors.DefaultSelector()
+    for subscriber in subscribers:
+        selector.register(subscriber, selectors.EVENT_READ)
+    conn.send("ready")
+    latencies: Dict[int, List[float]] = {}
+    received = done = 0
+    clock = time.monotonic
+    while done < count:
+        events = selector.select(5.0)
+        if not events:
+            break
+        for key, _ in events:
+            subscriber = key.fileobj
+            now = clock()
+            for message in subscriber.receive():
+                received += 1
+                if isinstance(message, TickMessage):
+                    latencies.setdefault(message.seq, []).append(now - message.at)
+                elif isinstance(message, CompleteMessage):
+                    done += 1
+            if subscriber.closed:
+                selector.unregister(subscriber)
+    conn.send({"latencies": latencies, "received": received, "completed": done})
+    for subscriber in subscribers:
+        subscriber.close()
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def json_state_bytes() -> int:
+    state = {"phase": "作業", "set": 3, "sets": 6, "remaining": 42, "elapsed": 123, "total": 360, "running": True}
+    return len(json.dumps(state, ensure_ascii=False).encode("utf-8")) + 1
+
+
+def run(clients: int, seconds: int, interval: float, transport: str, sets: int = 0) -> dict:
+    raise_file_limit(2 * clients + 64)
+    if transport == "udp":
+        publisher = MulticastPublisher(MULTICAST_GROUP, UDP_PORT, interface=LOOPBACK)
+        endpoint = Endpoint("udp", MULTICAST_GROUP, UDP_PORT)
+    else:
+        publisher = TcpBroadcastServer(LOOPBACK, 0, backlog=clients)
+        endpoint = Endpoint("tcp", LOOPBACK, publisher.address[1])
+
+    context = multiprocessing.get_context("fork")
+    parent, child = context.Pipe()
+    process = context.Process(target=swarm, args=(endpoint, clients, child), daemon=True)
+    process.start()
+    if parent.poll(60) and parent.recv() != "ready":
+        raise SystemExit("購読者を起動できませんでした。")
+    connected = clients
+    if isinstance(publisher, TcpBroadcastServer):
+        deadline = time.monotonic() + 30
+        while len(publisher) < clients and time.monotonic() < deadline:
+            publisher.wait(0.05)
+        connected = len(publisher)
+
+    # Ten-second sets with a short rest, so phase changes are part of the traffic.
+    menu = TrainingMenu.from_seconds("bench", 8, 2, sets or max(1, math.ceil(seconds / 10)))
+    controller = TimerController()
+    controller.load_menu(menu)
+    offset = max(0, controller.total_ms - seconds * TICK_MS) if sets else 0
+    schedule = TickSchedule(interval=interval)
+    Publisher(controller, schedule, publisher, publisher.keyframe_every).attach()
+
+    send_times: List[float] = []
+    send = publisher.send
+
+    def timed_send(frame: bytes) -> None:
+        start = time.perf_counter()
+        send(frame)
+        send_times.append(time.perf_counter() - start)
+
+    publisher.send = timed_send  # type: ignore[method-assign]
+    schedule.start(elapsed_ms=offset)
+    controller.start_at(offset)
+    run_until_complete(controller, schedule, publisher.wait, restart=False)
+    publisher.wait(0.2)
+    result = parent.recv() if parent.poll(30) else {"latencies": {}, "received": 0, "completed": 0}
+    publisher.close()
+    process.join(5)
+
+    per_tick = result["latencies"]
+    deliveries = [value for values in per_tick.values() for value in values]
+    fanout = [max(values) for values in per_tick.values()]
+    frames = publisher.frames
+    headers = UDP_HEADERS if transport == "udp" else TCP_HEADERS
+    copies = 1 if transport == "udp" else clients
+    payload_per_frame = publisher.bytes_sent / frames / copies if frames else 0.0
+    return {
+        "clients": clients,
+        "connected": connected,
+        "phases": len(controller.sequence),
+        "frames": frames,
+        "ticks": len(per_tick),
+        "completed": result["completed"],
+        "deliveries": len(deliveries),
+        "latency_ms_p50": percentile(deliveries, 0.5) * 1000 if deliveries else 0.0,
+        "latency_ms_p99": percentile(deliveries, 0.99) * 1000 if deliveries else 0.0,
+        "latency_ms_max": max(deliveries) * 1000 if deliveries else 0.0,
+        "fanout_ms_mean": statistics.fmean(fanout) * 1000 if fanout else 0.0,
+        "fanout_ms_max": max(fanout) * 1000 if fanout else 0.0,
+        "send_ms_mean": statistics.fmean(send_times) * 1000 if send_times else 0.0,
+        "payload_bytes_per_frame": payload_per_frame,
+        "wire_bytes_per_frame": (payload_per_frame + headers) * copies,
+        "json_wire_bytes_per_frame": (json_state_bytes() + headers) * copies,
+        "bytes_sent": publisher.bytes_sent,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--seconds", type=int, default=60, help="ワークアウトの長さ (タイマー秒)")
+    parser.add_argument("--interval", type=float, default=0.1, help="タイマー1秒あたりの実時間 (秒)")
+    parser.add_argument("--transport", choices=("tcp", "udp"), default="tcp")
+    parser.add_argument("--sets", type=int, default=0, help="長いテンプレートのセット数 (最後の --seconds 秒だけ流す)")
+    parser.add_argument("--budget-ms", type=float, default=50.0, help="p99 遅延の上限 (ms)")
+    args = parser.parse_args()
+
+    result = run(args.clients, args.seconds, args.interval, args.transport, args.sets)
+    for key, value in result.items():
+        print(f"{key:>25}: {value:,.3f}" if isinstance(value, float) else f"{key:>25}: {value:,}")
+    if result["completed"] < args.clients:
+        raise SystemExit(f"完了通知を受け取った購読者が {result['completed']} 件でした。")
+    if result["latency_ms_p99"] > args.budget_ms:
+        raise SystemExit(f"p99 遅延が {args.budget_ms:.0f} ms を超えました。")
+
+
+if __name__ == "__main__":
+    main()
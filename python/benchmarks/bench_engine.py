@@ -0,0 +1,73 @@
+"""Benchmark: many concurrent sessions at 1 Hz driven by one TimerEngine.
+
+Run from the ``python`` directory::
+
+    python -m benchmarks.bench_engine --sessions 10000 --seconds 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from circuit_timer_pkg.domain.controller import TimerController
+from circuit_timer_pkg.domain.engine import TimerEngine
+from circuit_timer_pkg.domain.menu import TrainingMenu
+
+
+def run(sessions: int, seconds: float, stagger: bool) -> dict:
+    engine = TimerEngine()
+    menu = TrainingMenu.from_seconds(name="bench", set_seconds=45, rest_seconds=15, sets=1000)
+    start = time.monotonic()
+    ids = []
+    for idx in range(sessions):
+        controller = TimerController()
+        controller.load_menu(menu)
+        # Spread the sessions over one second, as stations rarely start together.
+        offset = idx / sessions if stagger else 0.0
+        ids.append(engine.add(controller, now=start + offset))
+
+    stop_at = start + seconds
+    cpu_start = time.process_time()
+    wall_start = time.monotonic()
+    engine.run(until=lambda: time.monotonic() >= stop_at)
+    wall = time.monotonic() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    max_lateness = 0.0
+    total_lateness = 0.0
+    ticks = 0
+    for session_id in ids:
+        stats = engine._sessions[session_id].schedule.stats
+        max_lateness = max(max_lateness, stats.max_lateness)
+        total_lateness += stats.total_lateness
+        ticks += stats.ticks
+    return {
+        "sessions": sessions,
+        "wall_seconds": wall,
+        "cpu_seconds": cpu,
+        "cpu_utilization": cpu / wall if wall else 0.0,
+        "ticks": ticks,
+        "ticks_per_second": ticks / wall if wall else 0.0,
+        "max_lateness_ms": max_lateness * 1000,
+        "mean_lateness_ms": (total_lateness / ticks * 1000) if ticks else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=10_000)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--no-stagger", action="store_true", help="全セッションを同時刻に開始")
+    parser.add_argument("--max-cpu", type=float, default=0.25, help="許容する CPU 使用率 (0-1)")
+    args = parser.parse_args()
+
+    result = run(args.sessions, args.seconds, stagger=not args.no_stagger)
+    for key, value in result.items():
+        print(f"{key:>18}: {value:.3f}" if isinstance(value, float) else f"{key:>18}: {value}")
+    if result["cpu_utilization"] > args.max_cpu:
+        raise SystemExit(f"CPU 使用率 {result['cpu_utilization']:.1%} が上限 {args.max_cpu:.0%} を超えました。")
+
+
+if __name__ == "__main__":
+    main()
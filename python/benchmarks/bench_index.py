@@ -0,0 +1,78 @@
+"""Benchmark: ``--find`` query latency over a large synthetic library.
+
+Times the first page of :func:`scan` for each query, as ``--find`` pulls
+it. A query that matches nothing walks the whole library, so the budget is
+an interactive one rather than an index's. Run from the ``python``
+directory::
+
+    python -m benchmarks.bench_index --menus 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from itertools import islice
+
+from circuit_timer_pkg.domain.menu import TrainingMenu
+from circuit_timer_pkg.domain.menu_index import parse_query, scan
+
+QUERIES = (
+    "total<20m sets>=5 name:hiit",
+    "name:core*",
+    "sets=3 rest=0",
+    "set>=100 rest<=5 sets>18",
+    "sprint-e",
+    "total>=30m total<=45m",
+    "name:co* total<5m set>110 rest>55",
+    "name:zzz",
+)
+_WORDS = ("hiit", "tabata", "core", "legs", "cardio", "upper", "sprint", "emom")
+
+
+def make_menus(count: int) -> list:
+    rng = random.Random(0)
+    return [
+        TrainingMenu.from_seconds(
+            name=f"{rng.choice(_WORDS)}-{rng.choice(_WORDS)}-{idx}",
+            set_seconds=rng.randint(10, 120),
+            rest_seconds=rng.randint(0, 60),
+            sets=rng.randint(1, 20),
+        )
+        for idx in range(count)
+    ]
+
+
+def run(count: int, repeat: int, page_size: int) -> dict:
+    menus = make_menus(count)
+    results = {}
+    for text in QUERIES:
+        query = parse_query(text)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            list(islice(scan(menus, query), page_size + 1))
+        results[text] = (time.perf_counter() - start) / repeat * 1000
+    return {"queries_ms": results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--menus", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--budget-ms", type=float, default=250.0, help="1クエリあたりの許容時間")
+    args = parser.parse_args()
+
+    result = run(args.menus, args.repeat, args.page_size)
+    slow = []
+    for text, elapsed in result["queries_ms"].items():
+        print(f"{elapsed:8.3f} ms  {text}")
+        if elapsed > args.budget_ms:
+            slow.append(text)
+    if slow:
+        raise SystemExit(f"{len(slow)} 件のクエリが {args.budget_ms} ms を超えました。")
+
+
+if __name__ == "__main__":
+    main()
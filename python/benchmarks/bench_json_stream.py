@@ -0,0 +1,94 @@
+"""Benchmark: whole-file JSON decoding vs the streaming reader, and parallel validation.
+
+Run from the ``python`` directory::
+
+    python -m benchmarks.bench_json_stream --menus 200000 --workers 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Tuple
+
+from circuit_timer_pkg.adapters import storage
+from circuit_timer_pkg.adapters.json_stream import iter_menus, validate_file
+from circuit_timer_pkg.domain.menu import TrainingMenu
+
+
+def make_menus(count: int) -> dict:
+    rng = random.Random(0)
+    return {
+        f"menu-{idx:07d}": TrainingMenu.from_seconds(
+            name=f"menu-{idx:07d}",
+            set_seconds=rng.randint(10, 120),
+            rest_seconds=rng.randint(0, 60),
+            sets=rng.randint(1, 20),
+        )
+        for idx in range(count)
+    }
+
+
+def traced(func: Callable[[], object]) -> Tuple[float, int]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        func()
+        elapsed = time.perf_counter() - start
+        _current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return elapsed, peak
+
+
+def whole_file(path: Path) -> dict:
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return {item["name"]: TrainingMenu.from_dict(item) for item in data}
+
+
+def run(count: int, workers: int, split_mb: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "menus.json"
+        storage.save_menus(make_menus(count), path)
+        whole_s, whole_peak = traced(lambda: whole_file(path))
+        stream_s, stream_peak = traced(lambda: {menu.name: menu for menu in iter_menus(path)})
+        # Counting only: what a validation pass holds is the reader's buffer.
+        count_s, count_peak = traced(lambda: sum(1 for _menu in iter_menus(path)))
+
+        start = time.perf_counter()
+        serial = validate_file(path)
+        serial_s = time.perf_counter() - start
+        start = time.perf_counter()
+        parallel = validate_file(path, workers=workers, split_bytes=split_mb << 20)
+        parallel_s = time.perf_counter() - start
+        assert serial.valid == parallel.valid == count
+        return {
+            "menus": count,
+            "file_mb": path.stat().st_size / 1e6,
+            "whole_s": whole_s,
+            "whole_peak_mb": whole_peak / 1e6,
+            "stream_s": stream_s,
+            "stream_peak_mb": stream_peak / 1e6,
+            "stream_count_peak_mb": count_peak / 1e6,
+            "validate_serial_s": serial_s,
+            "validate_parallel_s": parallel_s,
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--menus", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--split-mb", type=int, default=4, help="並列検証で1プロセスに渡す範囲 (MB)")
+    args = parser.parse_args()
+    for key, value in run(args.menus, args.workers, args.split_mb).items():
+        print(f"{key:>22}: {value:.3f}" if isinstance(value, float) else f"{key:>22}: {value}")
+
+
+if __name__ == "__main__":
+    main()
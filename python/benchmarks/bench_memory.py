@@ -0,0 +1,76 @@
+"""Benchmark: memory held by menus and phase sequences in their compact forms.
+
+Compares a dict-backed menu dataclass (the previous layout) with the slotted
+``TrainingMenu``, and a list of ``Phase`` tuples with ``PhaseArray`` and
+``PhaseTimeline``. Run from the ``python`` directory::
+
+    python -m benchmarks.bench_memory --menus 100000 --phases 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable
+
+from circuit_timer_pkg.domain.menu import TrainingMenu
+from circuit_timer_pkg.domain.sequence import PhaseArray, build_sequence
+
+
+@dataclass
+class _DictMenu:
+    name: str
+    set_ms: int
+    rest_ms: int
+    sets: int
+
+
+def measure(build: Callable[[], object]) -> int:
+    """Bytes still allocated by ``build()``'s result once it returns."""
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = build()
+        size, _peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return size
+
+
+def run(menus: int, phases: int) -> dict:
+    names = [f"menu-{idx:07d}" for idx in range(menus)]
+    # Values above the small-int cache, as real libraries use varied durations.
+    dict_menus = measure(lambda: [_DictMenu(name, 300_000 + idx % 50, 260_000 + idx % 40, 1 + idx % 9) for idx, name in enumerate(names)])
+    slot_menus = measure(lambda: [TrainingMenu(name, 300_000 + idx % 50, 260_000 + idx % 40, 1 + idx % 9) for idx, name in enumerate(names)])
+
+    menu = TrainingMenu.from_seconds(name="bench", set_seconds=300, rest_seconds=270, sets=(phases + 1) // 2)
+    timeline = build_sequence(menu)
+    tuple_list = measure(lambda: list(timeline))
+    array_store = measure(lambda: PhaseArray(timeline))
+    timeline_store = measure(lambda: build_sequence(menu))
+    return {
+        "menus": menus,
+        "dict_menu_bytes": dict_menus / menus,
+        "slotted_menu_bytes": slot_menus / menus,
+        "phases": len(timeline),
+        "tuple_phase_bytes": tuple_list / len(timeline),
+        "array_phase_bytes": array_store / len(timeline),
+        "timeline_bytes": timeline_store,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--menus", type=int, default=100_000)
+    parser.add_argument("--phases", type=int, default=100_000)
+    args = parser.parse_args()
+    for key, value in run(args.menus, args.phases).items():
+        print(f"{key:>20}: {value:.1f}" if isinstance(value, float) else f"{key:>20}: {value}")
+
+
+if __name__ == "__main__":
+    main()
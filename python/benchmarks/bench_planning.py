@@ -0,0 +1,89 @@
+"""Benchmark: batch planning statistics and slot queries over a large library.
+
+Uses NumPy when it is installed; ``--pure-python`` forces the fallback.
+Run from the ``python`` directory::
+
+    python -m benchmarks.bench_planning --menus 1000000 --slot 30m
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from circuit_timer_pkg.domain.menu import TrainingMenu, parse_duration_ms
+from circuit_timer_pkg.domain.planning import (
+    MenuColumns,
+    count_pairs_within,
+    end_times,
+    fits_in_slot,
+    plan_stats,
+    total_ms,
+)
+from circuit_timer_pkg.domain.sequence import build_sequence, total_duration
+
+
+def make_columns(count: int) -> tuple:
+    rng = random.Random(0)
+    set_ms = [rng.randint(10, 120) * 1000 for _ in range(count)]
+    rest_ms = [rng.choice((0, rng.randint(5, 60) * 1000)) for _ in range(count)]
+    sets = [rng.randint(1, 30) for _ in range(count)]
+    return set_ms, rest_ms, sets
+
+
+def run(count: int, slot_ms: int, use_numpy: bool) -> dict:
+    raw = make_columns(count)
+    start = time.perf_counter()
+    columns = MenuColumns.from_columns(*raw, use_numpy=use_numpy)
+    convert = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fitting = fits_in_slot(total_ms(columns), slot_ms)
+    query = time.perf_counter() - start
+
+    start = time.perf_counter()
+    stats = plan_stats(columns)
+    full_stats = time.perf_counter() - start
+
+    start = time.perf_counter()
+    ends = end_times(stats.total_ms[:1000], gap=60_000)
+    pairs = count_pairs_within(stats.total_ms, slot_ms, gap=60_000)
+    combos = time.perf_counter() - start
+
+    # Spot-check the closed form against the phase-by-phase model.
+    for index in random.Random(1).sample(range(count), min(count, 1000)):
+        menu = TrainingMenu("check", raw[0][index], raw[1][index], raw[2][index])
+        phases = build_sequence(menu)
+        assert stats.total_ms[index] == total_duration(list(phases))
+        assert stats.phases[index] == len(phases)
+    assert len(ends) == min(count, 1000)
+    return {
+        "menus": count,
+        "numpy": columns.vectorized,
+        "convert_ms": convert * 1000,
+        "slot_query_ms": query * 1000,
+        "fitting": len(fitting),
+        "plan_stats_ms": full_stats * 1000,
+        "pairs_ms": combos * 1000,
+        "pairs_fitting": pairs,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--menus", type=int, default=1_000_000)
+    parser.add_argument("--slot", default="30m", help="枠の長さ (例: 30m)")
+    parser.add_argument("--pure-python", action="store_true", help="NumPy を使わない")
+    parser.add_argument("--budget-ms", type=float, default=500.0, help="枠判定の許容時間")
+    args = parser.parse_args()
+
+    result = run(args.menus, parse_duration_ms(args.slot), use_numpy=False if args.pure_python else None)
+    for key, value in result.items():
+        print(f"{key:>18}: {value:,.1f}" if isinstance(value, float) else f"{key:>18}: {value}")
+    if result["slot_query_ms"] > args.budget_ms:
+        raise SystemExit(f"枠判定が {args.budget_ms} ms を超えました。")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark and CI check: simulate a whole menu catalogue on a virtual clock.
+
+Every menu is run to completion and its callback stream is validated
+against the sequence; any inconsistency fails the run. Run from the
+``python`` directory::
+
+    python -m benchmarks.bench_simulation --menus 2000
+    python -m benchmarks.bench_simulation --menus-file ../menus.json --phases-only
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from pathlib import Path
+from typing import List
+
+from circuit_timer_pkg.adapters.storage import load_menus
+from circuit_timer_pkg.domain.menu import TrainingMenu
+from circuit_timer_pkg.domain.simulation import simulate_batch, validate
+
+
+def make_menus(count: int) -> List[TrainingMenu]:
+    rng = random.Random(0)
+    return [
+        TrainingMenu.from_seconds(
+            name=f"template-{idx:04d}",
+            set_seconds=rng.randint(10, 120),
+            rest_seconds=rng.randint(0, 60),
+            sets=rng.randint(1, 30),
+        )
+        for idx in range(count)
+    ]
+
+
+def run(menus: List[TrainingMenu], ticks: bool) -> dict:
+    problems: List[str] = []
+    virtual = 0.0
+    start = time.perf_counter()
+    for result in simulate_batch(menus, ticks=ticks, record=False):
+        virtual += result.virtual_seconds
+        problems.extend(validate(result, ticks=ticks))
+    wall = time.perf_counter() - start
+    return {
+        "menus": len(menus),
+        "virtual_hours": virtual / 3600,
+        "wall_s": wall,
+        "simulated_s_per_s": virtual / wall if wall else float("inf"),
+        "problems": problems,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--menus", type=int, default=2_000)
+    parser.add_argument("--menus-file", type=Path, help="合成データの代わりに menus.json を検証する")
+    parser.add_argument("--phases-only", action="store_true", help="毎秒の tick を省きフェーズ境界だけ検証する")
+    parser.add_argument("--min-rate", type=float, default=400_000.0, help="必要な仮想秒/実秒 (既定値は毎秒 tick ありでの実測値)")
+    args = parser.parse_args()
+
+    menus = list(load_menus(args.menus_file).values()) if args.menus_file else make_menus(args.menus)
+    result = run(menus, ticks=not args.phases_only)
+    for key, value in result.items():
+        if key != "problems":
+            print(f"{key:>18}: {value:,.3f}" if isinstance(value, float) else f"{key:>18}: {value}")
+    for problem in result["problems"][:20]:
+        print(problem)
+    if result["problems"]:
+        raise SystemExit(f"{len(result['problems'])} 件の不整合が見つかりました。")
+    if result["simulated_s_per_s"] < args.min_rate:
+        raise SystemExit(f"シミュレーション速度が {args.min_rate:,.0f} 仮想秒/秒を下回りました。")
+
+
+if __name__ == "__main__":
+    main()
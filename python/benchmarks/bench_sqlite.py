@@ -0,0 +1,86 @@
+"""Benchmark: JSON load_menus vs SQLite MenuRepository startup and lookups.
+
+Run from the ``python`` directory::
+
+    python -m benchmarks.bench_sqlite --menus 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from circuit_timer_pkg.adapters import storage
+from circuit_timer_pkg.adapters.sqlite_store import MenuRepository, migrate_from_json
+from circuit_timer_pkg.domain.menu import TrainingMenu
+
+
+def make_menus(count: int) -> dict:
+    rng = random.Random(0)
+    return {
+        f"menu-{idx:07d}": TrainingMenu.from_seconds(
+            name=f"menu-{idx:07d}",
+            set_seconds=rng.randint(10, 120),
+            rest_seconds=rng.randint(0, 60),
+            sets=rng.randint(1, 20),
+        )
+        for idx in range(count)
+    }
+
+
+def run(count: int, lookups: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = Path(tmp) / "menus.json"
+        db_path = Path(tmp) / "menus.sqlite3"
+        storage.save_menus(make_menus(count), json_path)
+
+        start = time.perf_counter()
+        migrate_from_json(json_path, db_path)
+        migrate = time.perf_counter() - start
+
+        names = [f"menu-{random.randrange(count):07d}" for _ in range(lookups)]
+
+        start = time.perf_counter()
+        menus = storage.load_menus(json_path)
+        first_page = sorted(menus)[:50]
+        json_startup = time.perf_counter() - start
+        start = time.perf_counter()
+        for name in names:
+            menus.get(name)
+        json_lookup = time.perf_counter() - start
+
+        start = time.perf_counter()
+        repo = MenuRepository(db_path)
+        first_page = repo.list_page(limit=50)
+        sqlite_startup = time.perf_counter() - start
+        start = time.perf_counter()
+        for name in names:
+            repo.get(name)
+        sqlite_lookup = time.perf_counter() - start
+        repo.close()
+
+    assert first_page
+    return {
+        "menus": count,
+        "migrate_s": migrate,
+        "json_startup_ms": json_startup * 1000,
+        "sqlite_startup_ms": sqlite_startup * 1000,
+        "json_lookup_us": json_lookup / lookups * 1e6,
+        "sqlite_lookup_us": sqlite_lookup / lookups * 1e6,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--menus", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=1_000)
+    args = parser.parse_args()
+    for key, value in run(args.menus, args.lookups).items():
+        print(f"{key:>18}: {value:.3f}" if isinstance(value, float) else f"{key:>18}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Benchmark: cold start of the CLI, with a budget.
+
+Measures ``python -X importtime`` for ``circuit_timer`` and the wall time of
+``circuit_timer.py --cli`` from spawn to exit (answering "4" at the first
+prompt), and checks that the CLI path does not import Tkinter or storage.
+Run from the ``python`` directory::
+
+    python -m benchmarks.bench_startup --runs 10 --budget-ms 250
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+APP_DIR = Path(__file__).resolve().parent.parent
+# Modules the CLI must not load before the user asks for something that needs them.
+DEFERRED = (
+    "tkinter",
+    "circuit_timer_pkg.adapters.storage",
+    "circuit_timer_pkg.domain.menu_index",
+    "circuit_timer_pkg.adapters.audio",
+    "circuit_timer_pkg.adapters.broadcast",
+)
+
+
+def import_time_us() -> int:
+    """Cumulative import time of ``circuit_timer`` reported by ``-X importtime``."""
+
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import circuit_timer"],
+        cwd=APP_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in reversed(proc.stderr.splitlines()):
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) == 3 and fields[2] == "circuit_timer":
+            return int(fields[1])
+    raise RuntimeError("importtime の出力に circuit_timer がありません。")
+
+
+def cli_wall_ms() -> float:
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "circuit_timer.py", "--cli"],
+        cwd=APP_DIR,
+        input="4\n",
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return (time.perf_counter() - start) * 1000
+
+
+def loaded_deferred() -> List[str]:
+    code = "import sys, circuit_timer; print('\\n'.join(sys.modules))"
+    proc = subprocess.run([sys.executable, "-c", code], cwd=APP_DIR, capture_output=True, text=True, check=True)
+    modules = set(proc.stdout.split())
+    return [name for name in DEFERRED if name in modules]
+
+
+def run(runs: int) -> dict:
+    imports = [import_time_us() / 1000 for _ in range(runs)]
+    walls = [cli_wall_ms() for _ in range(runs)]
+    return {
+        "import_ms": statistics.median(imports),
+        "cli_wall_ms": statistics.median(walls),
+        "deferred_loaded": loaded_deferred(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=250.0, help="CLI 起動〜終了の許容時間 (中央値)")
+    parser.add_argument("--import-budget-ms", type=float, default=80.0, help="circuit_timer の import 許容時間 (中央値)")
+    args = parser.parse_args()
+
+    result = run(args.runs)
+    print(f"    import_ms: {result['import_ms']:.1f}")
+    print(f"  cli_wall_ms: {result['cli_wall_ms']:.1f}")
+    failures = []
+    if result["deferred_loaded"]:
+        failures.append(f"CLI 起動時に読み込まれています: {', '.join(result['deferred_loaded'])}")
+    if result["import_ms"] > args.import_budget_ms:
+        failures.append(f"import が {args.import_budget_ms} ms を超えました。")
+    if result["cli_wall_ms"] > args.budget_ms:
+        failures.append(f"CLI の起動が {args.budget_ms} ms を超えました。")
+    if failures:
+        raise SystemExit("\n".join(failures))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Benchmark: bytes written to stdout per workout by the CLI countdown.
+
+Runs ``run_timer`` on a virtual clock against a terminal-like stream and a
+pipe-like stream, and the previous print-per-second output for comparison.
+Run from the ``python`` directory::
+
+    python -m benchmarks.bench_terminal --sets 10 --set-seconds 45 --rest-seconds 15
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+from typing import Optional
+
+from circuit_timer import format_time, run_timer
+from circuit_timer_pkg.domain.controller import TimerController
+from circuit_timer_pkg.domain.menu import MS_PER_SECOND, TrainingMenu
+from circuit_timer_pkg.domain.scheduler import TickSchedule, run_until_complete
+from circuit_timer_pkg.domain.sequence import Phase
+from circuit_timer_pkg.domain.simulation import VirtualClock
+
+
+class CountingStream(io.TextIOBase):
+    """Discards output, counting UTF-8 bytes, ``write`` calls and ``flush`` calls."""
+
+    def __init__(self, tty: bool):
+        self.tty = tty
+        self.bytes = 0
+        self.writes = 0
+        self.flushes = 0
+
+    def isatty(self) -> bool:
+        return self.tty
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        self.bytes += len(text.encode("utf-8"))
+        self.writes += 1
+        return len(text)
+
+    def flush(self) -> None:
+        self.flushes += 1
+
+
+def legacy_run(menu: TrainingMenu, stream: CountingStream) -> None:
+    """The output of ``run_timer`` before the renderer: every line printed in full."""
+
+    controller: TimerController
+
+    def _describe(phase: Phase) -> str:
+        return f"{phase.label} (セット {phase.set_index}/{phase.total_sets})"
+
+    def _phase_start(phase: Phase) -> None:
+        print("\a", end="", file=stream)
+        print(f"\n--- {_describe(phase)} ---", file=stream)
+        index = controller.current_index + 1
+        if index < len(controller.sequence):
+            print(f"次: {_describe(controller.sequence[index])}", file=stream)
+
+    def _tick(phase: Phase, remaining_ms: int, elapsed_ms: int) -> None:
+        remaining = -(-remaining_ms // MS_PER_SECOND)
+        detail = f"{format_time(elapsed_ms // MS_PER_SECOND)} / {format_time(controller.total_seconds or 1)}"
+        print(f"{phase.label}: 残り {max(0, remaining):02d} 秒 | {detail}", end="\r", flush=True, file=stream)
+
+    def _complete() -> None:
+        print("\nおつかれさまでした！", file=stream)
+
+    controller = TimerController(on_phase_start=_phase_start, on_tick=_tick, on_complete=_complete)
+    controller.load_menu(menu)
+    print(f"総時間: {format_time(controller.total_seconds)}", file=stream)
+    print(f"\n=== {menu.name} を開始 ===", file=stream)
+    clock = VirtualClock()
+    controller.start()
+    drift = run_until_complete(controller, TickSchedule(clock=clock), clock.sleep)
+    print(file=stream)
+    print(drift.summary(), file=stream)
+
+
+def measure(menu: TrainingMenu, tty: Optional[bool]) -> CountingStream:
+    """``tty=None`` runs the legacy output; otherwise ``run_timer`` on that kind of stream."""
+
+    stream = CountingStream(bool(tty))
+    if tty is None:
+        legacy_run(menu, stream)
+    else:
+        clock = VirtualClock()
+        run_timer(menu, stream=stream, schedule=TickSchedule(clock=clock), sleep=clock.sleep)
+    return stream
+
+
+def run(sets: int, set_seconds: int, rest_seconds: int) -> dict:
+    menu = TrainingMenu.from_seconds(name="bench", set_seconds=set_seconds, rest_seconds=rest_seconds, sets=sets)
+    result = {}
+    for label, tty in (("legacy", None), ("terminal", True), ("log", False)):
+        stream = measure(menu, tty)
+        result[label] = {"bytes": stream.bytes, "writes": stream.writes, "flushes": stream.flushes}
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sets", type=int, default=10)
+    parser.add_argument("--set-seconds", type=int, default=45)
+    parser.add_argument("--rest-seconds", type=int, default=15)
+    parser.add_argument("--max-ratio", type=float, default=0.5, help="端末出力のバイト数の許容上限 (従来比)")
+    args = parser.parse_args()
+
+    result = run(args.sets, args.set_seconds, args.rest_seconds)
+    legacy = result["legacy"]["bytes"]
+    for label, counts in result.items():
+        print(
+            f"{label:>8}: {counts['bytes']:>7} bytes ({counts['bytes'] / legacy:6.1%}), "
+            f"write {counts['writes']:>5} 回, flush {counts['flushes']:>5} 回"
+        )
+    if result["terminal"]["bytes"] > legacy * args.max_ratio:
+        raise SystemExit(f"端末出力が従来の {args.max_ratio:.0%} を超えました。")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""Benchmark: cost of updating the timer widgets, 1 Hz full refresh vs 10 Hz dirty-checked frames.
+
+Widgets are stood in for by Tcl variables of a ``tkinter.Tcl()`` interpreter
+(no display needed), so each push costs a real Tcl call, but not the
+redraw it would cause. The pushes are therefore also counted per widget:
+only the small tenths label may change every frame, and every other
+widget must be pushed no more often than before.
+
+The CPU time of the frames path must stay within ``--max-ratio`` of the
+1 Hz path's. Ten tenths pushes a second cost more than a whole 1 Hz
+refresh, so tenths for the whole phase cannot match it; the default
+ratio is the budget for that, and ``--tenths-seconds 3`` (tenths only in
+the last seconds of each phase) stays within 1.0.
+Run from the ``python`` directory::
+
+    python -m benchmarks.bench_view --sets 10 --set-seconds 45 --rest-seconds 15 --hz 10
+    python -m benchmarks.bench_view --tenths-seconds 3 --max-ratio 1
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from functools import partial
+from typing import Callable, Dict, Optional, Tuple
+
+from circuit_timer_pkg.domain.controller import TICK_MS
+from circuit_timer_pkg.domain.menu import MS_PER_SECOND, TrainingMenu, ceil_seconds, format_time
+from circuit_timer_pkg.domain.scheduler import DriftStats
+from circuit_timer_pkg.domain.sequence import build_sequence
+from circuit_timer_pkg.domain.view_model import DirtyView, TimerFrames
+
+FIELDS = ("timer", "detail", "clock", "tenths", "progress", "jitter")
+
+
+# Updated every frame by design: two characters in a small font.
+FAST_FIELDS = ("tenths",)
+
+# Tenths at 10 Hz for the whole phase measure about 2.25x the 1 Hz path.
+MAX_RATIO = 2.5
+
+
+def tcl_setters(calls: Optional[Dict[str, int]] = None) -> Dict[str, Callable[[object], None]]:
+    """Setters on Tcl variables; with ``calls``, pushes are also counted there per field.
+
+    Uncounted setters are C-level calls, as the UI's tenths setter is, so
+    timed runs measure the paths rather than the counting.
+    """
+
+    import tkinter
+
+    interp = tkinter.Tcl().tk
+    if calls is None:
+        return {name: partial(interp.globalsetvar, name) for name in FIELDS}
+
+    def setter(name: str) -> Callable[[object], None]:
+        def _set(value: object) -> None:
+            calls[name] += 1
+            interp.globalsetvar(name, value)
+
+        return _set
+
+    return {name: setter(name) for name in FIELDS}
+
+
+def seconds_of(menu: TrainingMenu):
+    """``(phase, remaining_ms, elapsed_ms)`` for every tick of the workout, as the controller reports them."""
+
+    elapsed = 0
+    for phase in build_sequence(menu):
+        for remaining in range(phase.duration, 0, -TICK_MS):
+            yield phase, remaining, elapsed
+            elapsed += min(remaining, TICK_MS)
+
+
+def legacy(menu: TrainingMenu, setters: Dict[str, Callable[[object], None]]) -> None:
+    """What ``_handle_tick`` did before: every widget set on every tick."""
+
+    total = ceil_seconds(sum(phase.duration for phase in build_sequence(menu)))
+    for phase, remaining_ms, elapsed_ms in seconds_of(menu):
+        remaining, elapsed = ceil_seconds(remaining_ms), elapsed_ms // MS_PER_SECOND
+        setters["timer"](f"{phase.label} - セット {phase.set_index}/{phase.total_sets}: 残り {remaining:02d} 秒")
+        setters["clock"](format_time(remaining))
+        setters["detail"](f"総時間 {format_time(total or 1)} / 経過 {format_time(elapsed)}")
+        setters["progress"](min(elapsed, total))
+        setters["jitter"](f"ジッター: 最大 {0:.0f} ms / 平均 {0:.0f} ms / まとめ {0} 回")
+
+
+def frames(
+    menu: TrainingMenu, setters: Dict[str, Callable[[object], None]], hz: int, tenths_below_ms: Optional[int] = None
+) -> DirtyView:
+    total = sum(phase.duration for phase in build_sequence(menu))
+    view = DirtyView(setters)
+    builder = TimerFrames(tenths=hz > 1, tenths_below_ms=tenths_below_ms)
+    steps = [index / hz for index in range(1, hz)]
+    stats, jitter_shown = DriftStats(), None
+    for phase, remaining, elapsed in seconds_of(menu):
+        # As in the UI, the jitter text is formatted only when its rounded values change.
+        shown = (round(stats.max_lateness * 1000), round(stats.mean_lateness * 1000), stats.merged)
+        if shown != jitter_shown:
+            jitter_shown = shown
+            view.push("jitter", "ジッター: 最大 {} ms / 平均 {} ms / まとめ {} 回".format(*shown))
+        builder.render(view, phase, remaining, elapsed, total)
+        # As in the UI, frames between ticks run only where they can change something.
+        if builder.sub_second(remaining):
+            for fraction in steps:
+                builder.advance(view, fraction)
+    return view
+
+
+def timed(funcs: Tuple[Callable[[], object], ...], repeat: int) -> Tuple[float, ...]:
+    """Best CPU time of each function; runs are interleaved so load changes hit all of them alike."""
+
+    best = [float("inf")] * len(funcs)
+    for _ in range(repeat):
+        for index, func in enumerate(funcs):
+            start = time.process_time()
+            func()
+            best[index] = min(best[index], time.process_time() - start)
+    return tuple(best)
+
+
+def per_second(calls: Dict[str, int], fields: Tuple[str, ...], runs: int, seconds: int) -> float:
+    return sum(calls[name] for name in fields) / runs / seconds
+
+
+def run(menu: TrainingMenu, hz: int, repeat: int, tenths_seconds: Optional[int] = None) -> dict:
+    seconds = ceil_seconds(sum(phase.duration for phase in build_sequence(menu)))
+    tenths_below_ms = None if tenths_seconds is None else tenths_seconds * MS_PER_SECOND
+    slow = tuple(name for name in FIELDS if name not in FAST_FIELDS)
+    legacy_calls, frame_calls = dict.fromkeys(FIELDS, 0), dict.fromkeys(FIELDS, 0)
+    legacy(menu, tcl_setters(legacy_calls))
+    frames(menu, tcl_setters(frame_calls), hz, tenths_below_ms)
+    legacy_setters, frame_setters = tcl_setters(), tcl_setters()
+    legacy_cpu, frame_cpu = timed(
+        (lambda: legacy(menu, legacy_setters), lambda: frames(menu, frame_setters, hz, tenths_below_ms)), repeat
+    )
+    return {
+        "workout_seconds": seconds,
+        "legacy_us_per_s": legacy_cpu / seconds * 1e6,
+        "legacy_pushes_per_s": per_second(legacy_calls, FIELDS, 1, seconds),
+        "frames_us_per_s": frame_cpu / seconds * 1e6,
+        "frames_pushes_per_s": per_second(frame_calls, FIELDS, 1, seconds),
+        "frames_slow_pushes_per_s": per_second(frame_calls, slow, 1, seconds),
+        "cpu_ratio": frame_cpu / legacy_cpu,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sets", type=int, default=10)
+    parser.add_argument("--set-seconds", type=int, default=45)
+    parser.add_argument("--rest-seconds", type=int, default=15)
+    parser.add_argument("--hz", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=9)
+    parser.add_argument("--tenths-seconds", type=int, help="0.1 秒単位の表示を各フェーズの残り N 秒だけにする")
+    parser.add_argument("--max-ratio", type=float, default=MAX_RATIO, help="従来の 1 Hz 更新に対する CPU 時間の上限比")
+    args = parser.parse_args()
+
+    menu = TrainingMenu.from_seconds(name="bench", set_seconds=args.set_seconds, rest_seconds=args.rest_seconds, sets=args.sets)
+    result = run(menu, args.hz, args.repeat, args.tenths_seconds)
+    for key, value in result.items():
+        print(f"{key:>24}: {value:.2f}" if isinstance(value, float) else f"{key:>24}: {value}")
+    if result["frames_slow_pushes_per_s"] > result["legacy_pushes_per_s"]:
+        raise SystemExit("tenths 以外のウィジェット更新が従来より増えました。")
+    if result["frames_us_per_s"] > result["legacy_us_per_s"] * args.max_ratio:
+        raise SystemExit(f"{args.hz} Hz 表示の CPU 時間が従来の {args.max_ratio:.2f} 倍を超えました。")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""Microbenchmarks for the domain and storage hot paths, with baseline comparison.
+
+Every case reports ops/sec (best of several rounds) and the peak memory
+allocated by a single call. Results can be written as JSON and compared
+against an earlier run; a case slower than the baseline by more than the
+threshold fails the run. Run from the ``python`` directory::
+
+    python -m benchmarks.microbench --json results.json
+    python -m benchmarks.microbench --baseline results.json --threshold 0.2
+    python -m benchmarks.microbench --full   # adds 1M-menu libraries
+"""
+
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import gc
+import json
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+from circuit_timer_pkg.adapters import storage
+from circuit_timer_pkg.domain.controller import TimerController
+from circuit_timer_pkg.domain.menu import TrainingMenu, format_time, parse_duration_ms
+from circuit_timer_pkg.domain.sequence import build_sequence, total_duration
+
+SET_COUNTS = (10, 1_000, 100_000)
+LIBRARY_SIZES = (10, 1_000, 100_000)
+FULL_LIBRARY_SIZES = LIBRARY_SIZES + (1_000_000,)
+DURATION_INPUTS = ("30", "45s", "0.5m", "90s", "2m", " 15 ", "7.5s", "1.25m")
+
+
+@dataclass
+class Case:
+    name: str
+    # Called repeatedly; each call performs ``ops`` operations.
+    func: Callable[[], object]
+    ops: int = 1
+    teardown: Optional[Callable[[], None]] = None
+
+
+def _menu(sets: int) -> TrainingMenu:
+    return TrainingMenu.from_seconds(name=f"sets-{sets}", set_seconds=45, rest_seconds=15, sets=sets)
+
+
+def _library(count: int) -> Dict[str, TrainingMenu]:
+    rng = random.Random(count)
+    return {
+        f"menu-{idx:07d}": TrainingMenu.from_seconds(
+            name=f"menu-{idx:07d}",
+            set_seconds=rng.randint(10, 120),
+            rest_seconds=rng.randint(0, 60),
+            sets=rng.randint(1, 20),
+        )
+        for idx in range(count)
+    }
+
+
+def _tick_case(sets: int) -> Case:
+    controller = TimerController()
+    menu = _menu(sets)
+
+    def tick() -> None:
+        if not controller.running:
+            controller.load_menu(menu)
+            controller.start()
+        controller.tick()
+
+    return Case(f"controller.tick[sets={sets}]", tick)
+
+
+def _storage_cases(size: int, wanted: Callable[[str], bool]) -> Iterator[Case]:
+    names = (f"load_menus[menus={size}]", f"save_menus[menus={size}]")
+    if not any(wanted(name) for name in names):
+        return
+    tmp = tempfile.TemporaryDirectory()
+    path = Path(tmp.name) / "menus.json"
+    menus = _library(size)
+    storage.save_menus(menus, path)
+    # The save case comes last, so its teardown (run even when it is filtered out) removes the files.
+    yield Case(names[0], lambda: storage.load_menus(path))
+    yield Case(names[1], lambda: storage.save_menus(menus, path), teardown=tmp.cleanup)
+
+
+def build_cases(library_sizes: tuple = LIBRARY_SIZES, wanted: Callable[[str], bool] = lambda _name: True) -> Iterator[Case]:
+    """Yield cases lazily so large fixtures exist only while their case runs."""
+
+    for sets in SET_COUNTS:
+        menu = _menu(sets)
+        phases = list(build_sequence(menu))
+        yield Case(f"build_sequence[sets={sets}]", lambda menu=menu: build_sequence(menu))
+        yield Case(f"iterate_sequence[sets={sets}]", lambda menu=menu: sum(1 for _ in build_sequence(menu)))
+        yield Case(f"total_duration[sets={sets}]", lambda phases=phases: total_duration(phases))
+        yield _tick_case(sets)
+    yield Case("parse_duration", lambda: [parse_duration_ms(text) for text in DURATION_INPUTS], ops=len(DURATION_INPUTS))
+    yield Case("format_time", lambda: [format_time(seconds) for seconds in range(0, 7200, 60)], ops=120)
+    for size in library_sizes:
+        yield from _storage_cases(size, wanted)
+
+
+def measure(case: Case, min_time: float, rounds: int) -> Dict[str, float]:
+    # One untimed call warms caches and gives the per-call peak allocation.
+    gc.collect()
+    tracemalloc.start()
+    try:
+        case.func()
+        _current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    best = 0.0
+    for _ in range(rounds):
+        calls = 0
+        start = time.perf_counter()
+        while True:
+            case.func()
+            calls += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time:
+                break
+        best = max(best, calls * case.ops / elapsed)
+    if case.teardown is not None:
+        case.teardown()
+    return {"ops_per_sec": best, "peak_bytes": peak}
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float) -> List[str]:
+    """Names of cases whose throughput dropped more than ``threshold`` below the baseline."""
+
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous and result["ops_per_sec"] < previous["ops_per_sec"] * (1 - threshold):
+            regressions.append(name)
+    return regressions
+
+
+def run(patterns: List[str], full: bool, min_time: float, rounds: int) -> Dict[str, Dict[str, float]]:
+    def wanted(name: str) -> bool:
+        return not patterns or any(fnmatch.fnmatch(name, pattern) for pattern in patterns)
+
+    results: Dict[str, Dict[str, float]] = {}
+    for case in build_cases(FULL_LIBRARY_SIZES if full else LIBRARY_SIZES, wanted):
+        if not wanted(case.name):
+            if case.teardown is not None:
+                case.teardown()
+            continue
+        results[case.name] = measure(case, min_time, rounds)
+        result = results[case.name]
+        print(f"{case.name:<34} {result['ops_per_sec']:>16,.1f} ops/s {result['peak_bytes'] / 1024:>12,.1f} KiB", flush=True)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("patterns", nargs="*", help="実行するケース名の glob (例: 'load_menus*')")
+    parser.add_argument("--json", type=Path, help="結果を書き出す JSON ファイル")
+    parser.add_argument("--baseline", type=Path, help="比較対象の JSON 結果")
+    parser.add_argument("--threshold", type=float, default=0.2, help="許容する ops/sec の低下率")
+    parser.add_argument("--full", action="store_true", help="100万件のライブラリも計測する")
+    parser.add_argument("--min-time", type=float, default=0.2, help="1 ラウンドの最短計測秒数")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    results = run(args.patterns, args.full, args.min_time, args.rounds)
+    if args.json:
+        payload = {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "results": results,
+        }
+        args.json.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for name in regressions:
+            change = results[name]["ops_per_sec"] / baseline[name]["ops_per_sec"] - 1
+            print(f"REGRESSION {name}: {change:+.1%}")
+        if regressions:
+            raise SystemExit(f"{len(regressions)} 件のケースが基準より {args.threshold:.0%} 以上遅くなりました。")
+
+
+if __name__ == "__main__":
+    main()
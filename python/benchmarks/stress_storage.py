@@ -0,0 +1,99 @@
+"""Stress: many processes saving menus concurrently must not lose updates.
+
+Run from the ``python`` directory::
+
+    python -m benchmarks.stress_storage --processes 8 --edits 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from circuit_timer_pkg.adapters import storage
+from circuit_timer_pkg.domain.menu import TrainingMenu
+
+
+def _writer(path: str, worker: int, edits: int) -> None:
+    # Keep compaction busy so it races with the appends of other processes.
+    storage.COMPACT_MIN_BYTES = 4 * 1024
+    file_path = Path(path)
+    for idx in range(edits):
+        name = f"w{worker:02d}-{idx:05d}"
+        storage.upsert_menu(TrainingMenu.from_seconds(name=name, set_seconds=30, rest_seconds=10, sets=idx % 9 + 1), file_path)
+        if idx % 5 == 4:
+            storage.delete_menu(f"w{worker:02d}-{idx - 1:05d}", file_path)
+    for thread in threading.enumerate():
+        if thread.name == "menu-compactor":
+            thread.join()
+
+
+def _expected(processes: int, edits: int) -> set:
+    names = set()
+    for worker in range(processes):
+        for idx in range(edits):
+            if idx % 5 == 3 and idx + 1 < edits:
+                continue
+            names.add(f"w{worker:02d}-{idx:05d}")
+    return names
+
+
+def _single_writer_baseline(path: Path, edits: int) -> float:
+    """Today's behaviour: every edit rewrites the whole file from one process."""
+
+    menus = {}
+    start = time.perf_counter()
+    for idx in range(edits):
+        menu = TrainingMenu.from_seconds(name=f"s-{idx:05d}", set_seconds=30, rest_seconds=10, sets=idx % 9 + 1)
+        menus[menu.name] = menu
+        storage.save_menus(menus, path)
+    return time.perf_counter() - start
+
+
+def run(processes: int, edits: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "menus.json"
+        start = time.perf_counter()
+        workers = [
+            multiprocessing.Process(target=_writer, args=(str(path), worker, edits))
+            for worker in range(processes)
+        ]
+        for proc in workers:
+            proc.start()
+        for proc in workers:
+            proc.join()
+        elapsed = time.perf_counter() - start
+        storage.compact(path)
+        saved = set(storage.load_menus(path))
+
+        baseline = _single_writer_baseline(Path(tmp) / "baseline.json", processes * edits)
+
+    expected = _expected(processes, edits)
+    return {
+        "processes": processes,
+        "edits": processes * edits,
+        "lost": len(expected - saved),
+        "unexpected": len(saved - expected),
+        "concurrent_edits_per_s": processes * edits / elapsed,
+        "single_writer_edits_per_s": processes * edits / baseline,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--edits", type=int, default=200)
+    args = parser.parse_args()
+    result = run(args.processes, args.edits)
+    for key, value in result.items():
+        print(f"{key:>26}: {value:.1f}" if isinstance(value, float) else f"{key:>26}: {value}")
+    if result["lost"] or result["unexpected"]:
+        raise SystemExit("更新が失われました。")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,28 +3,44 @@
 from __future__ import annotations
 
 import argparse
+import math
 import time
-from typing import Dict, List, Optional, Sequence
+from functools import partial
+from itertools import islice
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, Mapping, MutableMapping, Optional, Sequence, TextIO, Tuple
 
 from circuit_timer_pkg.domain.menu import (
+    MS_PER_SECOND,
     TrainingMenu as DomainTrainingMenu,
+    ceil_seconds,
+    format_duration,
     format_time as format_time_core,
-    parse_duration as parse_duration_core,
+    parse_duration_ms as parse_duration_ms_core,
 )
-from circuit_timer_pkg.domain.sequence import Phase as DomainPhase
-from circuit_timer_pkg.domain.controller import TimerController
-from circuit_timer_pkg.adapters.storage import (
-    load_menus as load_menus_core,
-    save_menus as save_menus_core,
-)
-
-try:  # Tkinter is optional so the CLI can still run.
-    import tkinter as tk
-    from tkinter import messagebox, ttk
-except Exception:  # pragma: no cover - helps when Tk is missing.
-    tk = None
-    messagebox = None
-    ttk = None
+from circuit_timer_pkg.domain.sequence import Phase as DomainPhase, build_sequence, total_duration
+from circuit_timer_pkg.domain.controller import TICK_MS, TimerController
+from circuit_timer_pkg.domain.scheduler import TickSchedule, run_until_complete
+
+# Storage, search, metrics and Tkinter are imported where they are first used,
+# so `--cli` shows its prompt without paying for modules it may never touch.
+if TYPE_CHECKING:
+    from circuit_timer_pkg.adapters.audio import CueEngine
+    from circuit_timer_pkg.adapters.broadcast import Transport
+    from circuit_timer_pkg.adapters.storage import MenuChanges
+
+tk = None
+messagebox = None
+ttk = None
+
+# How often the UI checks the menu library for edits made by other processes.
+MENU_POLL_MS = 2000
+# Rows materialized in the Listbox; the rest of the library lives only in the model.
+MENU_LIST_ROWS = 14
+# Timer display refreshes per second; tenths of a second are shown above 1.
+DISPLAY_HZ = 10
+# --audio: cues with a bell fallback, the bell only, or silence.
+AUDIO_MODES = ("auto", "bell", "off")
 
 
 def format_time(seconds: int) -> str:
@@ -33,35 +49,90 @@ def format_time(seconds: int) -> str:
     return format_time_core(seconds)
 
 
+def import_tk() -> bool:
+    """Tkinter を初回のみ読み込む (利用できなければ False)"""
+
+    global tk, messagebox, ttk
+    if tk is None:
+        try:  # Tkinter is optional so the CLI can still run.
+            import tkinter as tk_module
+            from tkinter import messagebox as messagebox_module, ttk as ttk_module
+        except Exception:  # pragma: no cover - helps when Tk is missing.
+            return False
+        tk, messagebox, ttk = tk_module, messagebox_module, ttk_module
+    return True
+
+
 # TrainingMenu is provided by circuit_timer_pkg.domain.menu
 TrainingMenu = DomainTrainingMenu
 
 
-def parse_duration(value: str) -> int:
-    """Parse values like '45', '45s', '1.5m' into seconds."""
+def parse_duration_ms(value: str) -> int:
+    """Parse values like '45', '45s', '7.5s', '1m30s' into milliseconds."""
+
+    return parse_duration_ms_core(value)
+
+
+def load_menus(menu_path: Optional[Path] = None) -> Dict[str, TrainingMenu]:
+    """保存先 (既定は menus.json) からメニュー一覧を読み込む"""
+
+    from circuit_timer_pkg.adapters.storage import load_menus as load_menus_core
+
+    return load_menus_core(menu_path)
+
+
+def save_menus(menus: Dict[str, TrainingMenu], menu_path: Optional[Path] = None) -> None:
+    """メニュー一覧を保存先に書き出す"""
 
-    return parse_duration_core(value)
+    from circuit_timer_pkg.adapters.storage import save_menus as save_menus_core
 
+    save_menus_core(menus, menu_path)
 
-def load_menus() -> Dict[str, TrainingMenu]:
-    """JSON からメニュー一覧を読み込む"""
 
-    return load_menus_core()
+def store_menu(menu: TrainingMenu, menu_path: Optional[Path] = None) -> None:
+    """メニュー1件の作成/上書きを記録 (JSON ではジャーナルに追記、SQLite では1行を更新)"""
 
+    from circuit_timer_pkg.adapters.storage import upsert_menu as upsert_menu_core
 
-def save_menus(menus: Dict[str, TrainingMenu]) -> None:
-    """メニュー一覧を JSON に保存"""
+    upsert_menu_core(menu, menu_path)
 
-    save_menus_core(menus)
 
+def remove_menu(name: str, menu_path: Optional[Path] = None) -> None:
+    """メニュー1件の削除を記録"""
 
-def prompt_seconds(prompt: str) -> int:
-    """s/m の単位付き入力を秒に変換"""
+    from circuit_timer_pkg.adapters.storage import delete_menu as delete_menu_core
+
+    delete_menu_core(name, menu_path)
+
+
+def open_cues(audio: str = "auto", record: Optional[Path] = None) -> Optional["CueEngine"]:
+    """フェーズ切り替えの音声キューを用意する (ベルで通知する場合は None)
+
+    auto で再生手段が見つからなければベルに戻る。record 指定時は鳴らす代わりに WAV ファイルへ書き出す。
+    """
+
+    if record is None and audio == "bell":
+        return None
+    from circuit_timer_pkg.adapters.audio import CueEngine, NullSink, WaveFileSink, default_sink
+
+    if record is not None:
+        sink = WaveFileSink(record)
+    elif audio == "off":
+        sink = NullSink()
+    else:
+        sink = default_sink()
+        if sink is None:
+            return None
+    return CueEngine(sink)
+
+
+def prompt_duration(prompt: str) -> int:
+    """s/m の単位付き入力をミリ秒に変換"""
 
     while True:
         raw = input(prompt).strip()
         try:
-            return parse_duration(raw)
+            return parse_duration_ms(raw)
         except ValueError as exc:
             print(exc)
 
@@ -83,7 +154,7 @@ def prompt_int(prompt: str, min_value: int = 1) -> int:
             print(f"{min_value} 以上の整数で入力してください。")
 
 
-def create_menu(existing: Dict[str, TrainingMenu]) -> TrainingMenu:
+def create_menu(existing: Mapping[str, TrainingMenu]) -> TrainingMenu:
     """ユーザーと対話してメニューを作成"""
 
     print("\n--- 新しいメニューの作成 ---")
@@ -98,14 +169,14 @@ def create_menu(existing: Dict[str, TrainingMenu]) -> TrainingMenu:
                 continue
         break
 
-    set_seconds = prompt_seconds("1セットの時間 (例: 45s, 1.5m): ")
-    rest_seconds = prompt_seconds("休憩時間 (例: 15s, 1m): ")
+    set_ms = prompt_duration("1セットの時間 (例: 45s, 7.5s, 1m30s): ")
+    rest_ms = prompt_duration("休憩時間 (例: 15s, 1m): ")
     sets = prompt_int("セット数: ", min_value=1)
 
-    return TrainingMenu(name=name, set_seconds=set_seconds, rest_seconds=rest_seconds, sets=sets)
+    return TrainingMenu(name=name, set_ms=set_ms, rest_ms=rest_ms, sets=sets)
 
 
-def choose_menu(menus: Dict[str, TrainingMenu]) -> Optional[TrainingMenu]:
+def choose_menu(menus: Mapping[str, TrainingMenu]) -> Optional[TrainingMenu]:
     """保存済みメニューから選択"""
 
     if not menus:
@@ -131,32 +202,105 @@ def choose_menu(menus: Dict[str, TrainingMenu]) -> Optional[TrainingMenu]:
         print("範囲内の番号を選んでください。")
 
 
-def run_timer(menu: TrainingMenu) -> None:
-    """メニューに従ってタイマーを進行"""
+def find_menu(menus: Dict[str, TrainingMenu], query_text: str, page_size: int = 20) -> Optional[TrainingMenu]:
+    """条件で検索し、結果をページ単位で表示して選択"""
+
+    from circuit_timer_pkg.domain.menu_index import parse_query, scan
+
+    try:
+        query = parse_query(query_text)
+    except ValueError as exc:
+        print(exc)
+        return None
+
+    # Matches are pulled lazily, one page (plus a look-ahead hit) at a time.
+    matches = scan(menus.values(), query)
+    found: List[TrainingMenu] = []
+    page = 0
+    while True:
+        end = (page + 1) * page_size
+        found.extend(islice(matches, max(0, end + 1 - len(found))))
+        hits, has_more = found[page * page_size : end], len(found) > end
+        if not hits:
+            print("該当するメニューがありません。")
+            return None
+        print(f"\n--- 検索結果 (ページ {page + 1}) ---")
+        for idx, menu in enumerate(hits, start=1):
+            total = format_duration(total_duration(build_sequence(menu)))
+            print(f"{idx}. {menu.name} | セット: {menu.sets}, 作業: {menu.set_seconds}s, 休憩: {menu.rest_seconds}s, 合計: {total}")
+
+        options = ["番号で選択"]
+        if has_more:
+            options.append("n: 次へ")
+        if page:
+            options.append("p: 前へ")
+        choice = input(f"{' / '.join(options)} (キャンセルは Enter): ").strip().lower()
+        if not choice:
+            return None
+        if choice == "n" and has_more:
+            page += 1
+        elif choice == "p" and page:
+            page -= 1
+        elif choice.isdigit() and 1 <= int(choice) <= len(hits):
+            return hits[int(choice) - 1]
+        else:
+            print("入力を確認してください。")
+
+
+def _status_line(phase: DomainPhase, remaining_ms: int, elapsed_ms: int, total_ms: int) -> str:
+    detail = f"{format_time(elapsed_ms // MS_PER_SECOND)} / {format_time(ceil_seconds(total_ms) or 1)}"
+    return f"{phase.label}: 残り {ceil_seconds(max(0, remaining_ms)):02d} 秒 | {detail}"
+
+
+def run_timer(
+    menu: TrainingMenu,
+    metrics_path: Optional[Path] = None,
+    stream: Optional[TextIO] = None,
+    schedule: Optional[TickSchedule] = None,
+    sleep: Callable[[float], None] = time.sleep,
+    cues: Optional["CueEngine"] = None,
+    broadcast: Optional["Transport"] = None,
+) -> int:
+    """メニューに従ってタイマーを進行し、出力したバイト数を返す
+
+    端末では状態行の変化した文字だけを書き換え、パイプやファイルへはフェーズごとに1行だけ出力する。
+    cues 指定時はベルの代わりに音声キューを鳴らす。broadcast 指定時は状態の変化を購読者へ配信する。
+    metrics_path 指定時は計測結果を Prometheus 形式で出力する。
+    """
+
+    from circuit_timer_pkg.adapters.terminal import open_renderer
 
     controller: TimerController
+    out = open_renderer(stream)
+    schedule = schedule or TickSchedule()
 
     def _describe_phase(phase: DomainPhase) -> str:
         return f"{phase.label} (セット {phase.set_index}/{phase.total_sets})"
 
     def _phase_start(phase: DomainPhase) -> None:
-        print("\a", end="")  # simple console notification
-        print(f"\n--- {_describe_phase(phase)} ---")
         next_phase = _next_phase()
-        if next_phase:
-            print(f"次: {_describe_phase(next_phase)}")
-
-    def _tick(phase: DomainPhase, remaining: int, elapsed: int) -> None:
-        total = controller.total_seconds or 1
-        detail = f"{format_time(elapsed)} / {format_time(total)}"
-        print(
-            f"{phase.label}: 残り {max(0, remaining):02d} 秒 | {detail}",
-            end="\r",
-            flush=True,
-        )
+        if cues is not None:
+            cues.cue_phase(phase, schedule.time_at(controller.phase_start_ms))
+        if out.interactive:
+            if cues is None:
+                out.bell()  # simple console notification
+            out.line(f"\n--- {_describe_phase(phase)} ---")
+            if next_phase:
+                out.line(f"次: {_describe_phase(next_phase)}")
+        else:
+            upcoming = f" / 次: {_describe_phase(next_phase)}" if next_phase else ""
+            out.line(f"[{format_duration(controller.phase_start_ms)}] {_describe_phase(phase)}{upcoming}")
+
+    def _tick(phase: DomainPhase, remaining_ms: int, elapsed_ms: int) -> None:
+        out.status(_status_line(phase, remaining_ms, elapsed_ms, controller.total_ms))
+        # The phase start of the same tick is buffered too, so this is one write per second.
+        out.flush()
 
     def _complete() -> None:
-        print("\nおつかれさまでした！")
+        if cues is not None:
+            cues.cue_finish(schedule.time_at(controller.elapsed_ms))
+        out.line("\nおつかれさまでした！" if out.interactive else "おつかれさまでした！")
+        out.flush()
 
     def _next_phase() -> Optional[DomainPhase]:
         idx = controller.current_index + 1
@@ -167,50 +311,163 @@ def run_timer(menu: TrainingMenu) -> None:
     controller = TimerController(on_phase_start=_phase_start, on_tick=_tick, on_complete=_complete)
     controller.load_menu(menu)
     if not controller.sequence:
-        print("フェーズがありません。メニューを確認してください。")
-        return
-    print(f"総時間: {format_time(controller.total_seconds)}")
-
-    print(f"\n=== {menu.name} を開始 ===")
+        out.line("フェーズがありません。メニューを確認してください。")
+        out.close()
+        return out.bytes_written
+    out.line(f"総時間: {format_duration(controller.total_ms)}")
+
+    if metrics_path:
+        from circuit_timer_pkg.domain.metrics import ControllerInstrumentation
+
+        instrumentation = ControllerInstrumentation(controller)
+        instrumentation.enable()
+    if broadcast is not None:
+        from circuit_timer_pkg.domain.broadcast import Publisher
+
+        Publisher(controller, schedule, broadcast, broadcast.keyframe_every).attach()
+        # Subscribers are served while the timer waits for its next tick.
+        sleep = broadcast.wait
+    out.line(f"\n=== {menu.name} を開始 ===" if out.interactive else f"=== {menu.name} を開始 ===")
+    # Anchored first, so the times of the first phase start are on the schedule too.
+    schedule.start()
     controller.start()
-    while controller.running:
-        time.sleep(1)
-        controller.tick()
-    print()
-
-
-def run_cli() -> None:
+    drift = run_until_complete(controller, schedule, sleep, restart=False)
+    out.line(drift.summary())
+    if cues is not None:
+        cues.wait()
+        out.line(cues.summary())
+    if metrics_path:
+        instrumentation.metrics.write_prometheus(metrics_path)
+        out.line(f"メトリクスを {metrics_path} に書き出しました。")
+    out.close()
+    return out.bytes_written
+
+
+def run_mirror(endpoint: str, stream: Optional[TextIO] = None, display_hz: int = DISPLAY_HZ) -> int:
+    """配信中のタイマーを受信し、手元の時計で残り時間を描画する (出力したバイト数を返す)
+
+    受信したタイムスタンプから次のメッセージまでの残り時間を補間するため、どの画面も同じ時刻を指す。
+    TCP ではサーバーが切断するまで、マルチキャストでは中断されるまで続ける。
+    """
+
+    from circuit_timer_pkg.adapters.broadcast import open_subscriber, parse_endpoint
+    from circuit_timer_pkg.adapters.terminal import open_renderer
+    from circuit_timer_pkg.domain.broadcast import MirrorState
+
+    subscriber = open_subscriber(parse_endpoint(endpoint))
+    out = open_renderer(stream)
+    state = MirrorState()
+    frame = 1 / max(1, display_hz)
+    shown = None
+    out.line(f"=== {endpoint} を受信中 ===")
+    out.flush()
+    try:
+        while not subscriber.closed:
+            for message in subscriber.receive(frame):
+                state.apply(message, time.monotonic())
+            phase = state.phase
+            if phase is None or not state.synced:
+                continue
+            key = (state.index, state.phase_start_ms, state.complete)
+            if key != shown:
+                shown = key
+                if state.complete:
+                    out.line("\nおつかれさまでした！" if out.interactive else "おつかれさまでした！")
+                    out.flush()
+                    continue
+                described = f"{phase.label} (セット {phase.set_index}/{phase.total_sets})"
+                if out.interactive:
+                    out.line(f"\n--- {described} ---")
+                else:
+                    out.line(f"[{format_duration(state.phase_start_ms)}] {described}")
+            if not state.complete:
+                now = time.monotonic()
+                out.status(_status_line(phase, state.remaining_at(now), state.elapsed_at(now), state.total_ms))
+            out.flush()
+        out.line("\n配信が終了しました。" if out.interactive else "配信が終了しました。")
+    finally:
+        subscriber.close()
+        out.close()
+    return out.bytes_written
+
+
+def open_broadcast(endpoint: str) -> "Transport":
+    """tcp://HOST:PORT なら TCP サーバー、udp://GROUP:PORT ならマルチキャストで配信を始める"""
+
+    from circuit_timer_pkg.adapters.broadcast import open_publisher, parse_endpoint
+
+    parsed = parse_endpoint(endpoint)
+    transport = open_publisher(parsed)
+    host, port = transport.address
+    print(f"配信中: {parsed.scheme}://{host or '0.0.0.0'}:{port}")
+    return transport
+
+
+def run_cli(
+    metrics_path: Optional[Path] = None,
+    audio: str = "auto",
+    audio_record: Optional[Path] = None,
+    broadcast: Optional["Transport"] = None,
+    menu_path: Optional[Path] = None,
+) -> None:
     """アプリのメインループ (CLI)"""
 
-    menus = load_menus()
-
-    while True:
-        print("\n=== サーキットタイマー ===")
-        print("1. メニュー作成/上書き")
-        print("2. メニュー一覧")
-        print("3. メニューを選んでタイマー開始")
-        print("4. 終了")
-        choice = input("選択肢: ").strip()
-
-        if choice == "1":
-            menu = create_menu(menus)
-            menus[menu.name] = menu
-            save_menus(menus)
-            print(f"'{menu.name}' を保存しました。")
-        elif choice == "2":
-            if menus:
-                choose_menu(menus)
+    cache = None
+
+    def _menus() -> MutableMapping[str, TrainingMenu]:
+        # The library is read on first use, not before the first prompt.
+        nonlocal cache
+        if cache is None:
+            from circuit_timer_pkg.adapters.storage import open_cache
+
+            cache = open_cache(menu_path)
+        cache.refresh()
+        return cache.menus
+
+    opened = False
+    cues: Optional["CueEngine"] = None
+
+    def _cues() -> Optional["CueEngine"]:
+        # Cues are rendered when the first timer starts.
+        nonlocal cues, opened
+        if not opened:
+            cues = open_cues(audio, audio_record)
+            opened = True
+        return cues
+
+    try:
+        while True:
+            print("\n=== サーキットタイマー ===")
+            print("1. メニュー作成/上書き")
+            print("2. メニュー一覧")
+            print("3. メニューを選んでタイマー開始")
+            print("4. 終了")
+            choice = input("選択肢: ").strip()
+
+            if choice == "1":
+                menus = _menus()
+                menu = create_menu(menus)
+                menus[menu.name] = menu
+                store_menu(menu, menu_path)
+                print(f"'{menu.name}' を保存しました。")
+            elif choice == "2":
+                menus = _menus()
+                if menus:
+                    choose_menu(menus)
+                else:
+                    print("保存済みメニューがありません。")
+            elif choice == "3":
+                menu = choose_menu(_menus())
+                if menu:
+                    run_timer(menu, metrics_path, cues=_cues(), broadcast=broadcast)
+            elif choice == "4":
+                print("終了します。")
+                break
             else:
-                print("保存済みメニューがありません。")
-        elif choice == "3":
-            menu = choose_menu(menus)
-            if menu:
-                run_timer(menu)
-        elif choice == "4":
-            print("終了します。")
-            break
-        else:
-            print("1-4の数字を入力してください。")
+                print("1-4の数字を入力してください。")
+    finally:
+        if cues is not None:
+            cues.close()
 
 
 Phase = DomainPhase
@@ -219,7 +476,15 @@ Phase = DomainPhase
 class CircuitTimerApp:
     """Tkinter UI to manage menus and run the timer."""
 
-    def __init__(self, root: tk.Tk):
+    def __init__(
+        self,
+        root: tk.Tk,
+        metrics_path: Optional[Path] = None,
+        display_hz: int = DISPLAY_HZ,
+        cues: Optional["CueEngine"] = None,
+        tenths_seconds: Optional[int] = None,
+        menu_path: Optional[Path] = None,
+    ):
         self.root = root
         self.root.title("サーキットタイマー")
         self.root.geometry("760x450")
@@ -242,19 +507,39 @@ class CircuitTimerApp:
         self.root.configure(background=self.colors["bg"])
         self._configure_styles()
 
-        self.menus: Dict[str, TrainingMenu] = load_menus()
-        self.current_names: List[str] = []
+        from circuit_timer_pkg.adapters.storage import open_cache
+        from circuit_timer_pkg.domain.menu_list import MenuListModel
+        from circuit_timer_pkg.domain.metrics import ControllerInstrumentation
+        from circuit_timer_pkg.domain.view_model import DirtyView, TimerFrames
+
+        # A SQLite library lists every name up front but fetches menus as rows are shown.
+        self.menu_path = menu_path
+        self.menu_cache = open_cache(menu_path)
+        self.menu_cache.refresh()
+        self.menus: MutableMapping[str, TrainingMenu] = self.menu_cache.menus
+        self.menu_model = MenuListModel(self.menus)
+        self.selected_name: Optional[str] = None
+        self.list_top = 0
+        self.rendered_rows: List[str] = []
+        self.filter_var = tk.StringVar()
 
         self.name_var = tk.StringVar()
         self.set_var = tk.StringVar(value="45")
         self.rest_var = tk.StringVar(value="15")
         self.sets_var = tk.StringVar(value="3")
+        # Form contents as last filled from a menu, to tell the user's edits from stale values.
+        self.form_values: Optional[Tuple[str, str, str, str]] = None
 
         self.status_var = tk.StringVar(value="メニューを選択してください。")
         self.timer_var = tk.StringVar(value="タイマー停止中")
         self.phase_detail_var = tk.StringVar(value="フェーズ未開始")
         self.next_phase_var = tk.StringVar(value="次: -")
         self.total_detail_var = tk.StringVar(value="総時間 00:00 / 経過 00:00")
+        self.jitter_var = tk.StringVar(value="ジッター: -")
+        # Set up to 10 times a second, so the label reads a variable set without a Python frame.
+        self.tenths_var = tk.StringVar(value="")
+        # Rounded (max ms, mean ms, merged) last shown; the text is formatted only when they change.
+        self.jitter_shown: Optional[Tuple[int, int, int]] = None
 
         self.timer_running = False
         self.controller = TimerController(
@@ -263,14 +548,42 @@ class CircuitTimerApp:
             on_complete=self._handle_complete,
         )
         self.current_phase: Optional[Phase] = None
+        # Milliseconds, as reported by the controller.
         self.remaining = 0
         self.total_duration = 0
         self.elapsed_total = 0
         self.active_menu_name: Optional[str] = None
         self.after_id: Optional[str] = None
+        self.tick_schedule = TickSchedule()
+        # Frames run on their own deadlines; every tick deadline is also a frame deadline.
+        self.frame_schedule = TickSchedule(interval=1 / max(1, display_hz))
+        # Tenths for the whole phase unless limited to its last ``tenths_seconds``.
+        self.frames = TimerFrames(
+            tenths=display_hz > 1,
+            tenths_below_ms=None if tenths_seconds is None else tenths_seconds * MS_PER_SECOND,
+        )
+        # Off unless --metrics is given; F9 toggles it at runtime.
+        self.metrics_path = metrics_path
+        self.instrumentation = ControllerInstrumentation(self.controller)
+        self.instrumentation.set_enabled(metrics_path is not None)
+        # Played on a worker thread; without it phase changes ring the Tk bell.
+        self.cues = cues
 
         self._build_layout()
+        self.view = DirtyView(
+            {
+                "timer": self.timer_var.set,
+                "detail": self.total_detail_var.set,
+                "clock": lambda text: self.timer_display.configure(text=text),
+                "tenths": partial(self.root.tk.globalsetvar, str(self.tenths_var)),
+                "progress": lambda value: self.progress.configure(value=value),
+                "jitter": self.jitter_var.set,
+            }
+        )
         self.refresh_menu_list()
+        self.filter_var.trace_add("write", lambda *_args: self._apply_filter())
+        self.root.after(MENU_POLL_MS, self._poll_menus)
+        self.root.bind("<F9>", lambda _event: self._toggle_metrics())
 
     def _configure_styles(self) -> None:
         bg = self.colors["bg"]
@@ -327,6 +640,12 @@ class CircuitTimerApp:
             foreground=text,
             font=("Montserrat", 36, "bold"),
         )
+        self.style.configure(
+            "Tenths.TLabel",
+            background=card,
+            foreground=muted,
+            font=("Montserrat", 18, "bold"),
+        )
         self.style.configure(
             "Accent.Horizontal.TProgressbar",
             troughcolor="#0b1220",
@@ -346,9 +665,14 @@ class CircuitTimerApp:
         list_frame.grid(row=0, column=0, sticky="ns")
 
         ttk.Label(list_frame, text="メニュー一覧", style="Heading.TLabel").pack(anchor="w")
+        ttk.Entry(list_frame, textvariable=self.filter_var, font=("Segoe UI", 11)).pack(fill="x", pady=(4, 0))
+        rows_frame = ttk.Frame(list_frame, style="Side.TFrame")
+        rows_frame.pack(fill="both", expand=True, pady=(4, 6))
+        self.menu_scroll = ttk.Scrollbar(rows_frame, orient="vertical", command=self._on_scrollbar)
+        self.menu_scroll.pack(side="right", fill="y")
         self.menu_list = tk.Listbox(
-            list_frame,
-            height=14,
+            rows_frame,
+            height=MENU_LIST_ROWS,
             width=32,
             exportselection=False,
             bg=self.colors["card"],
@@ -359,8 +683,11 @@ class CircuitTimerApp:
             selectforeground=self.colors["text"],
             font=("Segoe UI", 11),
         )
-        self.menu_list.pack(fill="both", expand=True, pady=(4, 6))
+        self.menu_list.pack(side="left", fill="both", expand=True)
         self.menu_list.bind("<<ListboxSelect>>", lambda _event: self.on_select_menu())
+        self.menu_list.bind("<MouseWheel>", self._on_mousewheel)
+        self.menu_list.bind("<Button-4>", lambda _event: self._scroll_rows(-1))
+        self.menu_list.bind("<Button-5>", lambda _event: self._scroll_rows(1))
 
         btn_frame = ttk.Frame(list_frame)
         btn_frame.pack(fill="x")
@@ -400,38 +727,140 @@ class CircuitTimerApp:
         ).pack(anchor="w")
         ttk.Label(timer_frame, textvariable=self.next_phase_var, style="Body.TLabel").pack(anchor="w")
         ttk.Label(timer_frame, textvariable=self.total_detail_var, style="Status.TLabel").pack(anchor="w", pady=(0, 6))
-        self.timer_display = ttk.Label(timer_frame, text="00:00", style="Timer.TLabel")
-        self.timer_display.pack(anchor="center", pady=(4, 8))
+        clock_row = ttk.Frame(timer_frame, style="Side.TFrame")
+        clock_row.pack(anchor="center", pady=(4, 8))
+        self.timer_display = ttk.Label(clock_row, text="00:00", style="Timer.TLabel")
+        self.timer_display.pack(side="left")
+        # Tenths get their own small label so the large digits redraw only once per second.
+        self.timer_tenths = ttk.Label(clock_row, textvariable=self.tenths_var, style="Tenths.TLabel")
+        self.timer_tenths.pack(side="left", anchor="s", pady=(0, 6))
         self.progress = ttk.Progressbar(timer_frame, style="Accent.Horizontal.TProgressbar", mode="determinate", maximum=1, value=0)
         self.progress.pack(fill="x")
+        ttk.Label(timer_frame, textvariable=self.jitter_var, style="Status.TLabel").pack(anchor="e", pady=(4, 0))
 
     def refresh_menu_list(self, select_name: Optional[str] = None) -> None:
-        self.menu_list.delete(0, tk.END)
-        self.current_names = sorted(self.menus.keys())
-        for name in self.current_names:
-            menu = self.menus[name]
-            summary = f"{name} | {menu.sets}セット ({menu.set_seconds}s / {menu.rest_seconds}s)"
-            self.menu_list.insert(tk.END, summary)
+        self.menu_model.reset(self.menus)
         if select_name and select_name in self.menus:
-            idx = self.current_names.index(select_name)
-            self.menu_list.selection_clear(0, tk.END)
-            self.menu_list.selection_set(idx)
-            self.menu_list.see(idx)
+            self._select(select_name)
             self.on_select_menu()
-        elif not self.current_names:
-            self.clear_form()
+        else:
+            if self.selected_name not in self.menus:
+                self.selected_name = None
+            if not self.menus:
+                self.clear_form()
+            self._render_rows()
+
+    def _menu_summary(self, name: str) -> str:
+        menu = self.menus[name]
+        return f"{name} | {menu.sets}セット ({menu.set_seconds}s / {menu.rest_seconds}s)"
+
+    def _poll_menus(self) -> None:
+        try:
+            changes = self.menu_cache.refresh()
+        except (OSError, ValueError):
+            changes = None
+        if changes:
+            self._apply_menu_changes(changes)
+        self.root.after(MENU_POLL_MS, self._poll_menus)
+
+    def _apply_menu_changes(self, changes: MenuChanges) -> None:
+        """Patch the model with ``changes``; only rows in the visible window are redrawn."""
+
+        for name in changes.removed:
+            self.menu_model.remove(name)
+            if name == self.selected_name:
+                self.selected_name = None
+        for name in changes.added:
+            self.menu_model.insert(name)
+        if self.selected_name in changes.modified:
+            self._reload_form(self.selected_name)
+        self._render_rows()
+
+    def _reload_form(self, name: str) -> None:
+        """Show another process's edit of the selected menu, unless the form holds unsaved edits."""
+
+        if self._form_values() != self.form_values:
+            self.status_var.set(f"'{name}' が他で更新されました。保存すると上書きします。")
+            return
+        self._fill_form(self.menus[name])
+        self.status_var.set(f"'{name}' が他で更新されたため読み直しました。")
+
+    def _apply_filter(self) -> None:
+        self.menu_model.set_filter(self.filter_var.get().strip())
+        self.list_top = 0
+        self._render_rows()
+
+    def _select(self, name: str) -> None:
+        if not self.menu_model.matches(name):
+            self.filter_var.set("")
+        self.selected_name = name
+        row = self.menu_model.index(name)
+        if row is not None and not self.list_top <= row < self.list_top + MENU_LIST_ROWS:
+            self.list_top = row - MENU_LIST_ROWS // 2
+        self._render_rows()
+
+    def _render_rows(self) -> None:
+        """Show rows ``list_top`` .. ``list_top + MENU_LIST_ROWS`` of the model, rewriting only lines that differ."""
+
+        total = len(self.menu_model)
+        self.list_top = max(0, min(self.list_top, total - MENU_LIST_ROWS))
+        names = self.menu_model.window(self.list_top, MENU_LIST_ROWS)
+        rows = [self._menu_summary(name) for name in names]
+        for idx, summary in enumerate(rows):
+            if idx < len(self.rendered_rows):
+                if self.rendered_rows[idx] == summary:
+                    continue
+                self.menu_list.delete(idx)
+            self.menu_list.insert(idx, summary)
+        if len(self.rendered_rows) > len(rows):
+            self.menu_list.delete(len(rows), tk.END)
+        self.rendered_rows = rows
+        self.menu_list.selection_clear(0, tk.END)
+        if self.selected_name in names:
+            self.menu_list.selection_set(names.index(self.selected_name))
+        if total:
+            self.menu_scroll.set(self.list_top / total, min(1.0, (self.list_top + MENU_LIST_ROWS) / total))
+        else:
+            self.menu_scroll.set(0.0, 1.0)
+
+    def _scroll_rows(self, delta: int) -> None:
+        self.list_top += delta
+        self._render_rows()
+
+    def _on_scrollbar(self, action: str, value: str, unit: Optional[str] = None) -> None:
+        if action == "moveto":
+            self.list_top = int(float(value) * len(self.menu_model))
+            self._render_rows()
+        elif action == "scroll":
+            step = MENU_LIST_ROWS if unit == "pages" else 1
+            self._scroll_rows(int(value) * step)
+
+    def _on_mousewheel(self, event: "tk.Event") -> str:
+        self._scroll_rows(-1 if event.delta > 0 else 1)
+        return "break"
 
     def on_select_menu(self) -> None:
-        index = self._selected_index()
-        if index is None:
+        selection = self.menu_list.curselection()
+        if selection:
+            row = self.list_top + selection[0]
+            if row < len(self.menu_model):
+                self.selected_name = self.menu_model[row]
+        name = self._selected_name()
+        if name is None:
             return
-        name = self.current_names[index]
         menu = self.menus[name]
+        self._fill_form(menu)
+        self.status_var.set(f"選択中: {menu.name}")
+
+    def _fill_form(self, menu: TrainingMenu) -> None:
         self.name_var.set(menu.name)
-        self.set_var.set(str(menu.set_seconds))
-        self.rest_var.set(str(menu.rest_seconds))
+        self.set_var.set(f"{menu.set_seconds}s")
+        self.rest_var.set(f"{menu.rest_seconds}s")
         self.sets_var.set(str(menu.sets))
-        self.status_var.set(f"選択中: {menu.name}")
+        self.form_values = self._form_values()
+
+    def _form_values(self) -> Tuple[str, str, str, str]:
+        return (self.name_var.get(), self.set_var.get(), self.rest_var.get(), self.sets_var.get())
 
     def save_menu(self) -> None:
         name = self.name_var.get().strip()
@@ -439,87 +868,141 @@ class CircuitTimerApp:
             messagebox.showerror("エラー", "メニュー名を入力してください。")
             return
         try:
-            set_seconds = parse_duration(self.set_var.get())
-            rest_seconds = parse_duration(self.rest_var.get())
+            set_ms = parse_duration_ms(self.set_var.get())
+            rest_ms = parse_duration_ms(self.rest_var.get())
             sets = int(self.sets_var.get())
             if sets < 1:
                 raise ValueError
         except ValueError:
-            messagebox.showerror("エラー", "時間は数値 (例: 45 / 45s / 1.5m)、セット数は1以上の整数で入力してください。")
+            messagebox.showerror("エラー", "時間は数値 (例: 45 / 7.5s / 1m30s)、セット数は1以上の整数で入力してください。")
             return
 
-        menu = TrainingMenu(name=name, set_seconds=set_seconds, rest_seconds=rest_seconds, sets=sets)
+        menu = TrainingMenu(name=name, set_ms=set_ms, rest_ms=rest_ms, sets=sets)
         self.menus[name] = menu
-        save_menus(self.menus)
-        self.refresh_menu_list(select_name=name)
+        store_menu(menu, self.menu_path)
+        self.menu_model.insert(name)
+        self._select(name)
+        self.on_select_menu()
         messagebox.showinfo("保存", f"'{name}' を保存しました。")
 
     def delete_menu(self) -> None:
-        index = self._selected_index()
-        if index is None:
+        name = self._selected_name()
+        if name is None:
             messagebox.showwarning("削除", "メニューを選択してください。")
             return
-        name = self.current_names[index]
         if not messagebox.askyesno("確認", f"'{name}' を削除しますか？"):
             return
         self.menus.pop(name, None)
-        save_menus(self.menus)
-        self.refresh_menu_list()
+        remove_menu(name, self.menu_path)
+        self.menu_model.remove(name)
+        self.selected_name = None
+        if not self.menus:
+            self.clear_form()
+        self._render_rows()
         messagebox.showinfo("削除", f"'{name}' を削除しました。")
 
     def start_timer(self) -> None:
         if self.timer_running:
             messagebox.showinfo("タイマー", "すでにタイマーが動作しています。")
             return
-        index = self._selected_index()
-        if index is None:
+        name = self._selected_name()
+        if name is None:
             messagebox.showwarning("タイマー", "メニューを選択してください。")
             return
-        name = self.current_names[index]
         menu = self.menus[name]
         self.controller.load_menu(menu)
         if not self.controller.sequence:
             messagebox.showwarning("タイマー", "有効なシーケンスがありません。")
             return
         self.active_menu_name = menu.name
-        self.total_duration = self.controller.total_seconds
+        self.total_duration = self.controller.total_ms
         self.progress.configure(maximum=max(1, self.total_duration))
         self.elapsed_total = 0
-        self.progress.configure(value=0)
+        self.view.push("progress", 0)
         self.timer_running = True
         self.status_var.set(f"{menu.name} を開始")
+        self.view.push("jitter", "ジッター: -")
+        self.jitter_shown = None
+        self.frames.reset()
+        now = self.tick_schedule.clock()
+        self.tick_schedule.start(now)
+        self.frame_schedule.start(now)
         self.controller.start()
+        self._render_frame()
         self._schedule_tick()
 
     def _schedule_tick(self) -> None:
         if not self.timer_running:
             return
-        self.after_id = self.root.after(1000, self._tick)
+        # Delay is measured from the start anchor, so callback time does not push later frames back.
+        # Frames between ticks are skipped while they could not change the display.
+        schedule = self.frame_schedule if self.frames.sub_second(self.remaining) else self.tick_schedule
+        delay_ms = math.ceil(schedule.delay_until_next() * 1000)
+        self.after_id = self.root.after(delay_ms, self._tick)
 
     def _tick(self) -> None:
         if not self.timer_running:
             return
-        self.controller.tick()
+        frames = self.frame_schedule.due()
+        count = self.tick_schedule.due()
+        if count:
+            self.controller.tick(count * TICK_MS)
+            self._update_jitter_label()
         if self.timer_running:
+            if count:
+                self._render_frame()
+            elif frames:
+                self.frames.advance(self.view, self.tick_schedule.fraction())
             self._schedule_tick()
 
+    def _render_frame(self) -> None:
+        if self.current_phase is None:
+            return
+        self.frames.render(
+            self.view,
+            self.current_phase,
+            self.remaining,
+            self.elapsed_total,
+            self.total_duration,
+            self.tick_schedule.fraction() if self.frames.tenths else 0.0,
+        )
+
+    def _update_jitter_label(self) -> None:
+        stats = self.tick_schedule.stats
+        shown = (round(stats.max_lateness * 1000), round(stats.mean_lateness * 1000), stats.merged)
+        if shown == self.jitter_shown:
+            return
+        self.jitter_shown = shown
+        self.view.push("jitter", "ジッター: 最大 {} ms / 平均 {} ms / まとめ {} 回".format(*shown))
+
+    def _toggle_metrics(self) -> None:
+        self.instrumentation.set_enabled(not self.instrumentation.enabled)
+        state = "ON" if self.instrumentation.enabled else "OFF"
+        self.status_var.set(f"計測 {state}")
+        if not self.instrumentation.enabled:
+            self._export_metrics()
+
+    def _export_metrics(self) -> None:
+        if self.metrics_path is None or not self.instrumentation.metrics.ticks:
+            return
+        try:
+            self.instrumentation.metrics.write_prometheus(self.metrics_path)
+        except OSError as exc:
+            self.status_var.set(f"メトリクスを書き出せませんでした: {exc}")
+
     def _handle_phase_start(self, phase: Phase) -> None:
         self.current_phase = phase
         self.remaining = phase.duration
         self.status_var.set(f"{phase.label} - セット {phase.set_index}/{phase.total_sets}")
         self.phase_detail_var.set(f"現在: {phase.label} / {phase.set_index}セット目")
         self._update_next_phase_label()
-        self._play_notification()
+        self._play_notification(phase)
 
-    def _handle_tick(self, phase: Phase, remaining: int, elapsed_total: int) -> None:
+    def _handle_tick(self, phase: Phase, remaining_ms: int, elapsed_ms: int) -> None:
+        # Widgets are updated by the next frame, and only where the text changed.
         self.current_phase = phase
-        self.remaining = max(0, remaining)
-        self.elapsed_total = elapsed_total
-        self.timer_var.set(f"{phase.label} - セット {phase.set_index}/{phase.total_sets}: 残り {self.remaining:02d} 秒")
-        self.timer_display.configure(text=format_time(self.remaining))
-        total = self.total_duration or 1
-        self.total_detail_var.set(f"総時間 {format_time(total)} / 経過 {format_time(self.elapsed_total)}")
-        self._update_progress()
+        self.remaining = max(0, remaining_ms)
+        self.elapsed_total = elapsed_ms
 
     def _handle_complete(self) -> None:
         self.timer_running = False
@@ -527,17 +1010,16 @@ class CircuitTimerApp:
         self.current_phase = None
         self.remaining = 0
         self.elapsed_total = 0
-        self.timer_var.set("完了！")
+        self.view.push("timer", "完了！")
+        if self.cues is not None:
+            self.cues.cue_finish(self.tick_schedule.time_at(self.controller.elapsed_ms))
         if self.active_menu_name:
             self.status_var.set(f"{self.active_menu_name} 完了！")
         if messagebox:
             messagebox.showinfo("タイマー", "おつかれさまでした！")
         self.active_menu_name = None
-        self.timer_display.configure(text="00:00")
-        self.progress.configure(value=self.total_duration if self.total_duration else 0)
-        self.phase_detail_var.set("フェーズ未開始")
-        self.next_phase_var.set("次: -")
-        self.total_detail_var.set("総時間 00:00 / 経過 00:00")
+        self._export_metrics()
+        self._reset_display(self.total_duration if self.total_duration else 0)
 
     def _update_next_phase_label(self) -> None:
         idx = self.controller.current_index + 1
@@ -547,7 +1029,11 @@ class CircuitTimerApp:
         else:
             self.next_phase_var.set("次: フィニッシュ！")
 
-    def _play_notification(self) -> None:
+    def _play_notification(self, phase: Phase) -> None:
+        if self.cues is not None:
+            # Latency is measured from the boundary, which may lie between two ticks.
+            self.cues.cue_phase(phase, self.tick_schedule.time_at(self.controller.phase_start_ms))
+            return
         try:
             self.root.bell()
         except Exception:
@@ -555,7 +1041,7 @@ class CircuitTimerApp:
 
     def stop_timer(self) -> None:
         if not self.timer_running:
-            self.timer_var.set("タイマー停止中")
+            self.view.push("timer", "タイマー停止中")
             return
         if self.after_id:
             self.root.after_cancel(self.after_id)
@@ -563,21 +1049,19 @@ class CircuitTimerApp:
         self.controller.stop()
         self.timer_running = False
         self.current_phase = None
-        self.timer_var.set("停止しました")
+        self.view.push("timer", "停止しました")
         self.status_var.set("タイマーを停止しました。")
+        self._export_metrics()
         self.elapsed_total = 0
-        self.timer_display.configure(text="00:00")
-        self.progress.configure(value=0)
+        self._reset_display(0)
+
+    def _reset_display(self, progress: float) -> None:
+        self.view.push("clock", "00:00")
+        self.view.push("tenths", "")
+        self.view.push("progress", progress)
         self.phase_detail_var.set("フェーズ未開始")
         self.next_phase_var.set("次: -")
-        self.total_detail_var.set("総時間 00:00 / 経過 00:00")
-
-    def _update_progress(self) -> None:
-        if self.total_duration <= 0:
-            self.progress.configure(value=0)
-            return
-        value = min(self.elapsed_total, self.total_duration)
-        self.progress.configure(value=value)
+        self.view.push("detail", "総時間 00:00 / 経過 00:00")
 
     def clear_form(self) -> None:
         self.name_var.set("")
@@ -586,38 +1070,114 @@ class CircuitTimerApp:
         self.sets_var.set("3")
         self.status_var.set("メニューを選択してください。")
 
-    def _selected_index(self) -> Optional[int]:
-        if not self.current_names:
-            return None
-        selection = self.menu_list.curselection()
-        if not selection:
+    def _selected_name(self) -> Optional[str]:
+        if self.selected_name is None or self.selected_name not in self.menus:
             return None
-        index = selection[0]
-        if index >= len(self.current_names):
-            return None
-        return index
-
-
-def run_ui() -> None:
-    if tk is None or messagebox is None or ttk is None:
+        return self.selected_name
+
+
+def run_ui(
+    metrics_path: Optional[Path] = None,
+    display_hz: int = DISPLAY_HZ,
+    audio: str = "auto",
+    audio_record: Optional[Path] = None,
+    tenths_seconds: Optional[int] = None,
+    menu_path: Optional[Path] = None,
+) -> None:
+    if not import_tk():
         raise RuntimeError("Tkinter が利用できないため、UI モードを開始できません。Python を 'tk' サポート付きでインストールしてください。")
     root = tk.Tk()
-    CircuitTimerApp(root)
-    root.mainloop()
+    cues = open_cues(audio, audio_record)
+    try:
+        CircuitTimerApp(root, metrics_path, display_hz, cues, tenths_seconds, menu_path)
+        root.mainloop()
+    finally:
+        if cues is not None:
+            cues.close()
 
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Circuit training timer")
     parser.add_argument("--cli", action="store_true", help="CLI モードで起動")
-    return parser.parse_args()
+    parser.add_argument(
+        "--menus",
+        type=Path,
+        metavar="FILE",
+        help="メニューの保存先 (拡張子で形式を選ぶ: .json / .ctm バイナリ / .sqlite3 SQLite。既定: menus.json)",
+    )
+    parser.add_argument(
+        "--find",
+        metavar="QUERY",
+        help='条件でメニューを検索してタイマー開始 (例: "total<20m sets>=5 name:hiit")',
+    )
+    parser.add_argument("--page-size", type=int, default=20, help="検索結果の1ページの件数")
+    parser.add_argument(
+        "--metrics",
+        type=Path,
+        metavar="FILE",
+        help="tick/コールバックの遅延を計測し Prometheus テキスト形式で書き出す",
+    )
+    parser.add_argument(
+        "--display-hz",
+        type=int,
+        default=DISPLAY_HZ,
+        help="UI のタイマー表示の更新頻度 (1 で秒単位表示、それより大きいと 0.1 秒単位)",
+    )
+    parser.add_argument(
+        "--tenths-seconds",
+        type=int,
+        metavar="N",
+        help="0.1 秒単位の表示を各フェーズの残り N 秒だけにして CPU 使用を抑える (既定: フェーズ全体)",
+    )
+    parser.add_argument(
+        "--audio",
+        choices=AUDIO_MODES,
+        default="auto",
+        help="フェーズ切り替えの通知 (auto: 音声キュー、再生できなければベル / bell: ベルのみ / off: 鳴らさない)",
+    )
+    parser.add_argument("--audio-record", type=Path, metavar="WAV", help="音声キューを鳴らす代わりに WAV ファイルへ書き出す")
+    parser.add_argument(
+        "--serve",
+        metavar="ENDPOINT",
+        help="タイマーの状態を配信する (例: tcp://0.0.0.0:8765, udp://239.255.42.99:8765)。--cli か --find と併用",
+    )
+    parser.add_argument("--mirror", metavar="ENDPOINT", help="配信中のタイマーを受信して表示する (例: tcp://192.168.1.10:8765)")
+    args = parser.parse_args()
+    if args.serve and not (args.cli or args.find):
+        parser.error("--serve は --cli か --find と一緒に指定してください。")
+    return args
 
 
 if __name__ == "__main__":
     args = parse_args()
-    if args.cli:
+    broadcast = open_broadcast(args.serve) if args.serve else None
+    if args.mirror:
+        try:
+            run_mirror(args.mirror, display_hz=args.display_hz)
+        except KeyboardInterrupt:
+            print("\n中断しました。")
+    elif args.find:
+        try:
+            found = find_menu(load_menus(args.menus), args.find, args.page_size)
+            if found:
+                cues = open_cues(args.audio, args.audio_record)
+                try:
+                    run_timer(found, args.metrics, cues=cues, broadcast=broadcast)
+                finally:
+                    if cues is not None:
+                        cues.close()
+        except (KeyboardInterrupt, EOFError):
+            print("\n中断しました。")
+        finally:
+            if broadcast is not None:
+                broadcast.close()
+    elif args.cli:
         try:
-            run_cli()
+            run_cli(args.metrics, args.audio, args.audio_record, broadcast, args.menus)
         except KeyboardInterrupt:
             print("\n中断しました。")
+        finally:
+            if broadcast is not None:
+                broadcast.close()
     else:
-        run_ui()
+        run_ui(args.metrics, args.display_hz, args.audio, args.audio_record, args.tenths_seconds, args.menus)
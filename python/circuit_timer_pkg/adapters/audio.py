@@ -0,0 +1,298 @@
+﻿"""Audio cues for phase changes, pre-rendered once and played off the caller's thread.
+
+Cues are short tone sequences rendered with ``array``/``wave`` when the
+engine is built, so playing one never synthesizes anything. ``CueEngine.cue``
+only puts the buffer on a bounded queue; a worker thread hands it to the
+sink, so a slow or blocking sound device cannot stall the Tk loop or the
+CLI countdown. When the queue is full the oldest cue is dropped: a late
+cue for a phase that has already moved on is worse than none.
+"""
+
+from __future__ import annotations
+
+import abc
+import io
+import math
+import queue
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import wave
+from array import array
+from pathlib import Path
+from typing import Callable, Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+from ..domain.metrics import Histogram
+from ..domain.sequence import REST_LABEL, Phase
+
+SAMPLE_RATE = 22050
+VOLUME = 0.4
+# Fade in and out so tones start and stop without a click.
+FADE_MS = 5
+
+WORK = "work"
+REST = "rest"
+FINISH = "finish"
+# (frequency in Hz, milliseconds); a frequency of 0 is silence.
+CUE_TONES: Dict[str, Tuple[Tuple[float, int], ...]] = {
+    WORK: ((880.0, 120), (0.0, 40), (1320.0, 180)),
+    REST: ((660.0, 250),),
+    FINISH: ((880.0, 150), (1100.0, 150), (1320.0, 300)),
+}
+# External players tried in order when no sink is given; each takes a WAV path.
+PLAYERS: Tuple[Tuple[str, ...], ...] = (("aplay", "-q"), ("paplay",), ("pw-play",), ("afplay",))
+
+
+class Cue(NamedTuple):
+    name: str
+    frames: bytes  # 16-bit little-endian mono PCM
+    rate: int
+    wav: bytes  # the same samples as a complete WAV file
+
+    @property
+    def duration(self) -> float:
+        return len(self.frames) / 2 / self.rate
+
+
+def render_tones(tones: Sequence[Tuple[float, int]], rate: int = SAMPLE_RATE, volume: float = VOLUME) -> bytes:
+    samples = array("h")
+    amplitude = volume * 32767
+    fade = max(1, rate * FADE_MS // 1000)
+    sin = math.sin
+    for frequency, ms in tones:
+        count = rate * ms // 1000
+        if not frequency:
+            samples.frombytes(bytes(2 * count))
+            continue
+        step = 2 * math.pi * frequency / rate
+        tone = [amplitude * sin(step * index) for index in range(count)]
+        edge = min(fade, count // 2)
+        for index in range(edge):
+            gain = index / edge
+            tone[index] *= gain
+            tone[count - 1 - index] *= gain
+        samples.extend(map(int, tone))
+    if sys.byteorder == "big":
+        samples.byteswap()
+    return samples.tobytes()
+
+
+def encode_wav(frames: bytes, rate: int = SAMPLE_RATE) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as writer:
+        writer.setnchannels(1)
+        writer.setsampwidth(2)
+        writer.setframerate(rate)
+        writer.writeframes(frames)
+    return buffer.getvalue()
+
+
+def render_cues(
+    tones: Mapping[str, Sequence[Tuple[float, int]]] = CUE_TONES,
+    rate: int = SAMPLE_RATE,
+    volume: float = VOLUME,
+) -> Dict[str, Cue]:
+    cues = {}
+    for name, spec in tones.items():
+        frames = render_tones(spec, rate, volume)
+        cues[name] = Cue(name, frames, rate, encode_wav(frames, rate))
+    return cues
+
+
+def phase_cue(phase: Phase) -> str:
+    return REST if phase.label == REST_LABEL else WORK
+
+
+class AudioSink(abc.ABC):
+    """Where cues end up. ``play`` runs on the engine's worker thread and may block."""
+
+    @abc.abstractmethod
+    def play(self, cue: Cue) -> None:
+        ...
+
+    def close(self) -> None:
+        pass
+
+
+class NullSink(AudioSink):
+    """Discards cues, remembering their names; for headless runs and tests."""
+
+    def __init__(self) -> None:
+        self.played: List[str] = []
+
+    def play(self, cue: Cue) -> None:
+        self.played.append(cue.name)
+
+
+class WaveFileSink(AudioSink):
+    """Appends every cue to one WAV file, back to back, to check what would have sounded."""
+
+    def __init__(self, path: Path, rate: int = SAMPLE_RATE):
+        self.path = path
+        self._writer = wave.open(str(path), "wb")
+        self._writer.setnchannels(1)
+        self._writer.setsampwidth(2)
+        self._writer.setframerate(rate)
+
+    def play(self, cue: Cue) -> None:
+        self._writer.writeframes(cue.frames)
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+class CommandSink(AudioSink):
+    """Plays cues with an external player, from WAV files written on first use."""
+
+    def __init__(self, argv: Sequence[str]):
+        self.argv = list(argv)
+        self._dir: Optional[tempfile.TemporaryDirectory] = None
+        self._files: Dict[str, str] = {}
+
+    def _file(self, cue: Cue) -> str:
+        path = self._files.get(cue.name)
+        if path is None:
+            if self._dir is None:
+                self._dir = tempfile.TemporaryDirectory(prefix="circuit-timer-cues-")
+            path = str(Path(self._dir.name) / f"{cue.name}.wav")
+            Path(path).write_bytes(cue.wav)
+            self._files[cue.name] = path
+        return path
+
+    def play(self, cue: Cue) -> None:
+        subprocess.run(
+            [*self.argv, self._file(cue)],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=True,
+            timeout=cue.duration + 5,
+        )
+
+    def close(self) -> None:
+        if self._dir is not None:
+            self._dir.cleanup()
+            self._dir = None
+            self._files.clear()
+
+
+class WinSoundSink(AudioSink):
+    def __init__(self) -> None:
+        import winsound
+
+        self._winsound = winsound
+
+    def play(self, cue: Cue) -> None:
+        self._winsound.PlaySound(cue.wav, self._winsound.SND_MEMORY)
+
+
+def default_sink() -> Optional[AudioSink]:
+    """The platform's sound output, or ``None`` when there is none to use."""
+
+    if sys.platform == "win32":
+        try:
+            return WinSoundSink()
+        except ImportError:  # pragma: no cover - depends on the build
+            return None
+    for argv in PLAYERS:
+        if shutil.which(argv[0]):
+            return CommandSink(argv)
+    return None
+
+
+class CueEngine:
+    """Plays pre-rendered cues on a worker thread behind a bounded queue.
+
+    ``cue(name, due)`` returns immediately. ``due`` is the clock time the
+    cue belongs to, normally the phase boundary; the delay from it to the
+    moment the sink starts playing is recorded in ``latency`` (seconds).
+    ``clock`` must be the clock ``due`` was taken from.
+    """
+
+    def __init__(
+        self,
+        sink: AudioSink,
+        cues: Optional[Mapping[str, Cue]] = None,
+        maxsize: int = 4,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.sink = sink
+        self.cues = dict(cues) if cues is not None else render_cues()
+        self.clock = clock
+        self.latency = Histogram()
+        self.played = 0
+        self.dropped = 0
+        self.errors = 0
+        self._queue: "queue.Queue[Optional[Tuple[Cue, float]]]" = queue.Queue(maxsize)
+        self._thread = threading.Thread(target=self._run, name="audio-cues", daemon=True)
+        self._thread.start()
+
+    def cue(self, name: str, due: Optional[float] = None) -> None:
+        self._put((self.cues[name], self.clock() if due is None else due))
+
+    def cue_phase(self, phase: Phase, due: Optional[float] = None) -> None:
+        self.cue(phase_cue(phase), due)
+
+    def cue_finish(self, due: Optional[float] = None) -> None:
+        self.cue(FINISH, due)
+
+    def _put(self, item: Optional[Tuple[Cue, float]]) -> None:
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    continue
+                self._queue.task_done()
+                self.dropped += 1
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                cue, due = item
+                self.latency.observe(max(0.0, self.clock() - due))
+                try:
+                    self.sink.play(cue)
+                except Exception:  # A broken sound device must not take the timer down.
+                    self.errors += 1
+                else:
+                    self.played += 1
+            finally:
+                self._queue.task_done()
+
+    def wait(self, timeout: float = 5.0) -> bool:
+        """Block until every queued cue has been handed to the sink; ``False`` on timeout."""
+
+        deadline = time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(left)
+        return True
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Play what is queued, stop the worker and close the sink."""
+
+        if self._thread.is_alive():
+            self._put(None)
+            self._thread.join(timeout)
+        self.sink.close()
+
+    def summary(self) -> str:
+        latency = self.latency
+        mean = latency.total / latency.count if latency.count else 0.0
+        return (
+            f"音声キュー: 再生 {self.played} 回 / 開始遅延 最大 {latency.max * 1000:.1f} ms"
+            f" / 平均 {mean * 1000:.1f} ms (破棄 {self.dropped} 回, エラー {self.errors} 回)"
+        )
@@ -0,0 +1,319 @@
+﻿"""Compact binary menu snapshots read through mmap.
+
+Layout (little endian)::
+
+    header   magic "CTMB", version, count, offsets of the three sections
+    records  count x (name offset, name length, set_ms, rest_ms, sets)
+    strings  UTF-8 names, back to back
+    index    count x record number, ordered by name
+
+Records keep the insertion order of the saved dict, so converting to JSON and
+back is lossless. UTF-8 preserves code point order, so the name index is
+searched by comparing raw bytes and a lookup decodes only the record found.
+The journal that ``storage`` appends next to the snapshot is applied on read.
+"""
+
+from __future__ import annotations
+
+import argparse
+import mmap
+import os
+import struct
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Iterator, List, Mapping, NamedTuple, Optional, Set
+
+from ..circuit_paths import MENU_BIN_FILE, MENU_FILE
+from ..domain.menu import TrainingMenu
+from .filelock import FileLock
+from .journal import DELETE, UPSERT, Identity, MenuJournal, file_identity, journal_path, record_menu, record_name
+
+MAGIC = b"CTMB"
+VERSION = 2
+BINARY_SUFFIX = MENU_BIN_FILE.suffix
+
+_HEADER = struct.Struct("<4sHHIQQQQ")
+_RECORD = struct.Struct("<IIiii")
+_INDEX = struct.Struct("<I")
+
+
+def is_binary_snapshot(path: Path) -> bool:
+    return path.suffix == BINARY_SUFFIX
+
+
+class _Layout(NamedTuple):
+    """Where the journal changes the snapshot's name order."""
+
+    keys: List[bytes]  # names added by the journal, sorted as UTF-8
+    added: List[TrainingMenu]
+    hidden: Set[int]  # sorted positions of snapshot names the journal deleted
+    hidden_sorted: List[int]
+
+
+class MenuSnapshot:
+    """Read-only view of a binary snapshot; menus are decoded one at a time on demand.
+
+    The upserts and deletes journaled since the last compaction are laid
+    over the snapshot. Every access first picks up records appended since
+    the previous one (or a compacted replacement of the file) for the price
+    of two ``stat`` calls. ``journal=False`` reads the snapshot alone.
+    """
+
+    def __init__(self, path: Path | None = None, journal: bool = True):
+        self.path = path or MENU_BIN_FILE
+        self._journal = MenuJournal(journal_path(self.path)) if journal else None
+        self._snapshot_id: Identity = None
+        self._journal_id: Identity = None
+        self._journal_offset = 0
+        # Journaled state by name; None marks a delete.
+        self._overlay: Dict[str, Optional[TrainingMenu]] = {}
+        self._layout: Optional[_Layout] = None
+        self._map_file()
+        self._sync()
+
+    def _map_file(self) -> None:
+        with self.path.open("rb") as handle:
+            stat = os.fstat(handle.fileno())
+            # mmap refuses an empty file, and a shorter one has no header to unpack.
+            if stat.st_size < _HEADER.size:
+                raise ValueError(f"バイナリスナップショットが壊れています: {self.path}")
+            mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _flags, count, records, strings, _strings_size, index = _HEADER.unpack_from(mapped, 0)
+        if magic != MAGIC or version != VERSION:
+            mapped.close()
+            raise ValueError(f"対応していない形式です: {self.path}")
+        previous = getattr(self, "_map", None)
+        if previous is not None:
+            previous.close()
+        self._map = mapped
+        self._snapshot_id = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        self._count = count
+        self._records = records
+        self._strings = strings
+        self._index = index
+
+    def _sync(self) -> None:
+        journal = self._journal
+        if journal is None:
+            return
+        snapshot_id, journal_id = file_identity(self.path), file_identity(journal.path)
+        if snapshot_id == self._snapshot_id and journal_id == self._journal_id:
+            return
+        # Shared lock: a concurrent compaction cannot swap the snapshot between the two reads.
+        with FileLock(self.path, shared=True):
+            snapshot_id, journal_id = file_identity(self.path), file_identity(journal.path)
+            start = self._journal_offset
+            if snapshot_id != self._snapshot_id:
+                self._map_file()
+                start = 0
+            elif journal_id is None or self._journal_id is None or journal_id[0] != self._journal_id[0]:
+                start = 0
+            elif journal_id[2] < start:
+                start = 0
+            records, self._journal_offset = journal.read(start)
+        self._journal_id = journal_id
+        if not start:
+            self._overlay = {}
+        for record in records:
+            if record.get("op") in (UPSERT, DELETE):
+                self._overlay[record_name(record)] = record_menu(record)
+        self._layout = None
+
+    def __enter__(self) -> "MenuSnapshot":
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._map.close()
+
+    def __len__(self) -> int:
+        self._sync()
+        if not self._overlay:
+            return self._count
+        layout = self._current_layout()
+        return self._count + len(layout.added) - len(layout.hidden)
+
+    def __iter__(self) -> Iterator[TrainingMenu]:
+        """Menus in the order they were saved; menus the journal added come last."""
+
+        self._sync()
+        overlay = self._overlay
+        strings = self._map[self._strings : self._index]
+        table = self._map[self._records : self._strings]
+        journaled = set()
+        for offset, length, set_ms, rest_ms, sets in _RECORD.iter_unpack(table):
+            name = strings[offset : offset + length].decode("utf-8")
+            if name in overlay:
+                journaled.add(name)
+                menu = overlay[name]
+                if menu is not None:
+                    yield menu
+                continue
+            yield TrainingMenu(name, set_ms, rest_ms, sets)
+        for name, menu in overlay.items():
+            if menu is not None and name not in journaled:
+                yield menu
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and self.get(name) is not None
+
+    def get(self, name: str) -> Optional[TrainingMenu]:
+        self._sync()
+        if name in self._overlay:
+            return self._overlay[name]
+        number = self._find(name.encode("utf-8"))
+        return None if number is None else self._menu(number)
+
+    def page(self, start: int = 0, count: int = 50) -> List[TrainingMenu]:
+        """Menus ``start .. start+count`` in name order."""
+
+        self._sync()
+        start = max(0, start)
+        if not self._overlay:
+            stop = min(self._count, start + count)
+            return [self._menu(self._sorted(position)) for position in range(start, stop)]
+        layout = self._current_layout()
+        keys, hidden = layout.keys, layout.hidden
+
+        def before(position: int) -> int:
+            # Menus sorting before the snapshot's ``position``-th name: its visible predecessors plus added names.
+            return position - bisect_left(layout.hidden_sorted, position) + bisect_left(keys, self._key(position))
+
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if before(mid) <= start:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo:
+            position = lo - 1
+            added = bisect_left(keys, self._key(position))
+            skip = start - before(position)
+        else:
+            position = added = 0
+            skip = start
+        menus: List[TrainingMenu] = []
+        while len(menus) < skip + count:
+            while position < self._count and position in hidden:
+                position += 1
+            key = self._key(position) if position < self._count else None
+            if added < len(keys) and (key is None or keys[added] < key):
+                menus.append(layout.added[added])
+                added += 1
+            elif key is not None:
+                name = key.decode("utf-8")
+                menus.append(self._overlay.get(name) or self._menu(self._sorted(position)))
+                position += 1
+            else:
+                break
+        return menus[skip:]
+
+    def load_all(self) -> Dict[str, TrainingMenu]:
+        return {menu.name: menu for menu in self}
+
+    def _current_layout(self) -> _Layout:
+        if self._layout is None:
+            added = []
+            hidden = []
+            for name, menu in self._overlay.items():
+                key = name.encode("utf-8")
+                position = self._position(key)
+                if position < self._count and self._key(position) == key:
+                    if menu is None:
+                        hidden.append(position)
+                elif menu is not None:
+                    added.append((key, menu))
+            added.sort(key=lambda item: item[0])
+            hidden.sort()
+            self._layout = _Layout([key for key, _ in added], [menu for _, menu in added], set(hidden), hidden)
+        return self._layout
+
+    def _sorted(self, position: int) -> int:
+        return _INDEX.unpack_from(self._map, self._index + position * _INDEX.size)[0]
+
+    def _key(self, position: int) -> bytes:
+        return self._name_bytes(self._sorted(position))
+
+    def _name_bytes(self, number: int) -> bytes:
+        offset, length = struct.unpack_from("<II", self._map, self._records + number * _RECORD.size)
+        start = self._strings + offset
+        return self._map[start : start + length]
+
+    def _position(self, key: bytes) -> int:
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _find(self, key: bytes) -> Optional[int]:
+        position = self._position(key)
+        if position < self._count:
+            number = self._sorted(position)
+            if self._name_bytes(number) == key:
+                return number
+        return None
+
+    def _menu(self, number: int) -> TrainingMenu:
+        offset, length, set_ms, rest_ms, sets = _RECORD.unpack_from(self._map, self._records + number * _RECORD.size)
+        start = self._strings + offset
+        name = self._map[start : start + length].decode("utf-8")
+        return TrainingMenu(name, set_ms, rest_ms, sets)
+
+
+def encode_snapshot(menus: Mapping[str, TrainingMenu]) -> bytes:
+    names = [menu.name.encode("utf-8") for menu in menus.values()]
+    records = bytearray()
+    offset = 0
+    try:
+        for menu, name in zip(menus.values(), names):
+            records += _RECORD.pack(offset, len(name), menu.set_ms, menu.rest_ms, menu.sets)
+            offset += len(name)
+    except struct.error as exc:
+        raise ValueError(f"バイナリ形式で表せない値です: {menu.name}") from exc
+    strings = b"".join(names)
+    order = sorted(range(len(names)), key=names.__getitem__)
+    index = b"".join(_INDEX.pack(number) for number in order)
+    records_at = _HEADER.size
+    strings_at = records_at + len(records)
+    index_at = strings_at + len(strings)
+    header = _HEADER.pack(MAGIC, VERSION, 0, len(names), records_at, strings_at, len(strings), index_at)
+    return header + bytes(records) + strings + index
+
+
+def load_menus(file_path: Path | None = None) -> Dict[str, TrainingMenu]:
+    path = file_path or MENU_BIN_FILE
+    if not path.exists():
+        return {}
+    # The journal is replayed by storage.load_menus, over either snapshot format.
+    with MenuSnapshot(path, journal=False) as snapshot:
+        return snapshot.load_all()
+
+
+def convert(source: Path, target: Path) -> int:
+    """Copy menus between JSON (snapshot + journal) and binary, chosen by file suffix."""
+
+    from . import storage
+
+    menus = storage.load_menus(source)
+    storage.save_menus(menus, target)
+    return len(menus)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="menus.json とバイナリスナップショットを相互変換します")
+    parser.add_argument("source", type=Path, nargs="?", default=MENU_FILE)
+    parser.add_argument("target", type=Path, nargs="?", default=MENU_BIN_FILE)
+    args = parser.parse_args()
+    count = convert(args.source, args.target)
+    print(f"{count} 件のメニューを {args.target} に書き出しました。")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+﻿"""Transports for mirroring a timer: a TCP fan-out server, UDP multicast, and their subscribers."""
+
+from __future__ import annotations
+
+import select
+import selectors
+import socket
+import struct
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+
+from ..domain.broadcast import FrameDecoder, Message, decode_all
+
+DEFAULT_PORT = 8765
+MULTICAST_GROUP = "239.255.42.99"
+# Lost datagrams are not resent; a STATE frame every few ticks resynchronizes late or unlucky subscribers.
+MULTICAST_KEYFRAME_EVERY = 5
+_RECV_SIZE = 65536
+
+
+class Endpoint(NamedTuple):
+    scheme: str
+    host: str
+    port: int
+
+
+def parse_endpoint(text: str) -> Endpoint:
+    """``tcp://host:port``, ``udp://group:port`` or just ``host:port`` / ``port`` for TCP."""
+
+    scheme, sep, rest = text.strip().partition("://")
+    if not sep:
+        scheme, rest = "tcp", text.strip()
+    scheme = scheme.lower()
+    if scheme not in ("tcp", "udp"):
+        raise ValueError(f"tcp:// か udp:// で指定してください: {text}")
+    host, colon, port = rest.rpartition(":")
+    if not colon:
+        host, port = ("", rest) if rest.isdigit() else (rest, str(DEFAULT_PORT))
+    if not port.isdigit() or not 0 <= int(port) <= 65535:
+        raise ValueError(f"ポート番号が正しくありません: {text}")
+    return Endpoint(scheme, host.strip("[]"), int(port))
+
+
+class TcpBroadcastServer:
+    """Fans frames out to every connected subscriber without blocking the timer.
+
+    Sockets are non-blocking and serviced from ``wait``, which stands in for
+    ``time.sleep`` in ``run_until_complete``: while the timer sleeps, the
+    server accepts subscribers, sends each the current snapshot, and
+    flushes whatever a slow one could not take at once. A subscriber whose
+    backlog grows past ``max_backlog`` bytes is disconnected.
+    """
+
+    keyframe_every = 0
+
+    def __init__(self, host: str = "", port: int = DEFAULT_PORT, max_backlog: int = 64 * 1024, backlog: int = 1024):
+        self._listener = socket.create_server((host, port), backlog=backlog)
+        self._listener.setblocking(False)
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._listener, selectors.EVENT_READ)
+        self._clients: Dict[socket.socket, bytearray] = {}
+        self.max_backlog = max_backlog
+        self.snapshot: Optional[Callable[[], Optional[bytes]]] = None
+        self.frames = 0
+        self.bytes_sent = 0
+        self.dropped = 0
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._listener.getsockname()[:2]
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def send(self, frame: bytes) -> None:
+        self.frames += 1
+        for sock, pending in list(self._clients.items()):
+            if pending:
+                pending += frame
+                if len(pending) > self.max_backlog:
+                    self._drop(sock, slow=True)
+            else:
+                self._write(sock, frame)
+
+    def wait(self, seconds: float) -> None:
+        deadline = time.monotonic() + seconds
+        while True:
+            for key, events in self._selector.select(max(0.0, deadline - time.monotonic())):
+                sock = key.fileobj
+                if sock is self._listener:
+                    self._accept()
+                    continue
+                if events & selectors.EVENT_READ:
+                    self._read(sock)  # type: ignore[arg-type]
+                if events & selectors.EVENT_WRITE and sock in self._clients:
+                    self._flush(sock)  # type: ignore[arg-type]
+            if time.monotonic() >= deadline:
+                return
+
+    def close(self) -> None:
+        for sock in list(self._clients):
+            self._drop(sock)
+        self._selector.close()
+        self._listener.close()
+
+    def _accept(self) -> None:
+        while True:
+            try:
+                sock, _addr = self._listener.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            sock.setblocking(False)
+            # Every frame is a deadline; do not let Nagle hold it back.
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._clients[sock] = bytearray()
+            self._selector.register(sock, selectors.EVENT_READ)
+            snapshot = self.snapshot() if self.snapshot else None
+            if snapshot:
+                self._write(sock, snapshot)
+
+    def _write(self, sock: socket.socket, data: bytes) -> None:
+        try:
+            sent = sock.send(data)
+        except (BlockingIOError, InterruptedError):
+            sent = 0
+        except OSError:
+            self._drop(sock)
+            return
+        self.bytes_sent += sent
+        if sent < len(data):
+            self._clients[sock] += data[sent:]
+            self._selector.modify(sock, selectors.EVENT_READ | selectors.EVENT_WRITE)
+
+    def _flush(self, sock: socket.socket) -> None:
+        pending = self._clients[sock]
+        try:
+            sent = sock.send(pending)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            self._drop(sock)
+            return
+        self.bytes_sent += sent
+        del pending[:sent]
+        if not pending:
+            self._selector.modify(sock, selectors.EVENT_READ)
+
+    def _read(self, sock: socket.socket) -> None:
+        # Subscribers never send; readable means closed (or noise to discard).
+        try:
+            data = sock.recv(_RECV_SIZE)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self._drop(sock)
+
+    def _drop(self, sock: socket.socket, slow: bool = False) -> None:
+        if self._clients.pop(sock, None) is None:
+            return
+        if slow:
+            self.dropped += 1
+        self._selector.unregister(sock)
+        sock.close()
+
+
+class MulticastPublisher:
+    """Sends every frame once, as a datagram to a multicast group."""
+
+    keyframe_every = MULTICAST_KEYFRAME_EVERY
+
+    def __init__(self, group: str = MULTICAST_GROUP, port: int = DEFAULT_PORT, ttl: int = 1, interface: str = ""):
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, ttl)
+        if interface:
+            self._sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton(interface))
+        self._target = (group, port)
+        self.snapshot: Optional[Callable[[], Optional[bytes]]] = None
+        self.frames = 0
+        self.bytes_sent = 0
+        self.errors = 0
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._target
+
+    def send(self, frame: bytes) -> None:
+        self.frames += 1
+        try:
+            self.bytes_sent += self._sock.sendto(frame, self._target)
+        except OSError:  # No route yet (network down); the next keyframe catches up.
+            self.errors += 1
+
+    def wait(self, seconds: float) -> None:
+        time.sleep(seconds)
+
+    def close(self) -> None:
+        self._sock.close()
+
+
+class TcpSubscriber:
+    def __init__(self, host: str = "", port: int = DEFAULT_PORT, timeout: float = 5.0):
+        self._sock = socket.create_connection((host or "127.0.0.1", port), timeout=timeout)
+        self._sock.setblocking(False)
+        self._decoder = FrameDecoder()
+        self.closed = False
+        self.bytes_received = 0
+
+    def fileno(self) -> int:
+        return self._sock.fileno()
+
+    def receive(self, timeout: float = 0.0) -> List[Message]:
+        """Messages that arrived within ``timeout`` seconds; sets ``closed`` when the server hangs up.
+
+        With ``timeout=0`` only what is already there is read, without polling first.
+        """
+
+        if self.closed or (timeout > 0 and not select.select([self._sock], [], [], timeout)[0]):
+            return []
+        try:
+            data = self._sock.recv(_RECV_SIZE)
+        except (BlockingIOError, InterruptedError):
+            return []
+        except OSError:
+            data = b""
+        if not data:
+            self.closed = True
+            return []
+        self.bytes_received += len(data)
+        return self._decoder.feed(data)
+
+    def close(self) -> None:
+        self.closed = True
+        self._sock.close()
+
+
+class MulticastSubscriber:
+    closed = False
+
+    def __init__(self, group: str = MULTICAST_GROUP, port: int = DEFAULT_PORT, interface: str = ""):
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if hasattr(socket, "SO_REUSEPORT"):
+            self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        self._sock.bind(("", port))
+        membership = struct.pack("4s4s", socket.inet_aton(group), socket.inet_aton(interface or "0.0.0.0"))
+        self._sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, membership)
+        self._sock.setblocking(False)
+        self.bytes_received = 0
+
+    def fileno(self) -> int:
+        return self._sock.fileno()
+
+    def receive(self, timeout: float = 0.0) -> List[Message]:
+        if timeout > 0 and not select.select([self._sock], [], [], timeout)[0]:
+            return []
+        messages: List[Message] = []
+        while True:
+            try:
+                data = self._sock.recv(_RECV_SIZE)
+            except (BlockingIOError, InterruptedError):
+                return messages
+            self.bytes_received += len(data)
+            try:
+                messages += decode_all(data)
+            except ValueError:  # Not ours; the group and port are shared.
+                continue
+
+    def close(self) -> None:
+        self._sock.close()
+
+
+Transport = Union[TcpBroadcastServer, MulticastPublisher]
+Subscriber = Union[TcpSubscriber, MulticastSubscriber]
+
+
+def open_publisher(endpoint: Endpoint, interface: str = "") -> Transport:
+    if endpoint.scheme == "udp":
+        return MulticastPublisher(endpoint.host or MULTICAST_GROUP, endpoint.port, interface=interface)
+    return TcpBroadcastServer(endpoint.host, endpoint.port)
+
+
+def open_subscriber(endpoint: Endpoint, interface: str = "") -> Subscriber:
+    if endpoint.scheme == "udp":
+        return MulticastSubscriber(endpoint.host or MULTICAST_GROUP, endpoint.port, interface=interface)
+    return TcpSubscriber(endpoint.host, endpoint.port)
@@ -0,0 +1,74 @@
+﻿"""Advisory inter-process file locks (fcntl on POSIX, msvcrt on Windows)."""
+
+from __future__ import annotations
+
+import errno
+import os
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+    import msvcrt
+
+# Errors meaning the lock file cannot be created or opened for writing here.
+_UNWRITABLE = (errno.EACCES, errno.EROFS)
+
+
+class FileLock:
+    """Context manager holding a lock on ``<path>.lock`` for the duration of the block.
+
+    ``shared=True`` lets readers overlap each other; Windows has no shared
+    mode, so it falls back to an exclusive lock there. A shared lock in a
+    directory the process cannot write to (read-only media, someone else's
+    library) uses an existing lock file read-only, or else proceeds
+    unlocked: readers must still be able to load, and torn journal tails
+    are caught by the record checksums.
+    """
+
+    def __init__(self, path: Path, shared: bool = False):
+        self.path = path.with_name(path.name + ".lock")
+        self.shared = shared
+        self._fd: int | None = None
+
+    def __enter__(self) -> "FileLock":
+        try:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        except OSError as exc:
+            if not self.shared or exc.errno not in _UNWRITABLE:
+                raise
+            fd = self._open_read_only()
+            if fd is None:
+                return self
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_SH if self.shared else fcntl.LOCK_EX)
+            else:  # pragma: no cover - Windows
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+        except BaseException:
+            os.close(fd)
+            raise
+        self._fd = fd
+        return self
+
+    def _open_read_only(self) -> int | None:
+        if fcntl is None:  # pragma: no cover - msvcrt locks need write access
+            return None
+        try:
+            return os.open(self.path, os.O_RDONLY)
+        except OSError:
+            return None
+
+    def __exit__(self, *_exc: object) -> None:
+        fd, self._fd = self._fd, None
+        if fd is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:  # pragma: no cover - Windows
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(fd)
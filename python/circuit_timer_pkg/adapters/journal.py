@@ -0,0 +1,159 @@
+﻿"""Append-only journal of menu upserts/deletes layered over the JSON snapshot."""
+
+from __future__ import annotations
+
+import json
+import os
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ..domain.menu import TrainingMenu
+
+UPSERT = "upsert"
+DELETE = "delete"
+
+Record = Dict[str, object]
+# (inode, mtime, size) of a file, or None when it does not exist.
+Identity = Optional[Tuple[int, int, int]]
+
+
+def journal_path(snapshot_path: Path) -> Path:
+    return snapshot_path.with_name(snapshot_path.name + ".journal")
+
+
+def file_identity(path: Path) -> Identity:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+def upsert_record(menu: TrainingMenu) -> Record:
+    return {"op": UPSERT, "menu": menu.to_dict()}
+
+
+def delete_record(name: str) -> Record:
+    return {"op": DELETE, "name": name}
+
+
+def encode_record(record: Record) -> bytes:
+    body = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    # A checksum per line lets replay tell a torn or garbled tail from a valid record.
+    return b"%08x %s\n" % (zlib.crc32(body), body)
+
+
+def decode_line(line: bytes) -> Optional[Record]:
+    if len(line) < 10 or line[8:9] != b" ":
+        return None
+    body = line[9:]
+    try:
+        if int(line[:8], 16) != zlib.crc32(body):
+            return None
+        record = json.loads(body.decode("utf-8"))
+    except ValueError:
+        return None
+    return record if isinstance(record, dict) else None
+
+
+def record_name(record: Record) -> str:
+    if record.get("op") == UPSERT:
+        return str(record["menu"]["name"])  # type: ignore[index]
+    return str(record["name"])
+
+
+def record_menu(record: Record) -> Optional[TrainingMenu]:
+    """The menu an upsert stores; ``None`` for a delete."""
+
+    if record.get("op") == UPSERT:
+        return TrainingMenu.from_dict(record["menu"])  # type: ignore[arg-type]
+    return None
+
+
+def apply_record(menus: Dict[str, TrainingMenu], record: Record) -> None:
+    op = record.get("op")
+    if op == UPSERT:
+        menu = TrainingMenu.from_dict(record["menu"])  # type: ignore[arg-type]
+        menus[menu.name] = menu
+    elif op == DELETE:
+        menus.pop(str(record["name"]), None)
+
+
+class MenuJournal:
+    def __init__(self, path: Path):
+        self.path = path
+
+    def size(self) -> int:
+        try:
+            return self.path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def append(self, records: Iterable[Record]) -> int:
+        """Append records durably and return the new journal size."""
+
+        data = b"".join(encode_record(record) for record in records)
+        with self.path.open("a+b") as handle:
+            end = handle.seek(0, os.SEEK_END)
+            if end:
+                handle.seek(end - 1)
+                if handle.read(1) != b"\n":
+                    # Seal a torn tail so it is skipped instead of swallowing this record.
+                    data = b"\n" + data
+            handle.write(data)
+            handle.flush()
+            os.fsync(handle.fileno())
+            return handle.tell()
+
+    def read(self, start: int = 0) -> Tuple[List[Record], int]:
+        """Return valid records from ``start`` and the offset where they end.
+
+        Corrupt lines are skipped. An unterminated last line is the tail of
+        an interrupted append and is left out of the returned offset.
+        """
+
+        try:
+            with self.path.open("rb") as handle:
+                handle.seek(start)
+                data = handle.read()
+        except FileNotFoundError:
+            return [], 0
+        records: List[Record] = []
+        offset = 0
+        while offset < len(data):
+            end = data.find(b"\n", offset)
+            if end < 0:
+                break
+            record = decode_line(data[offset:end])
+            if record is not None:
+                records.append(record)
+            offset = end + 1
+        return records, start + offset
+
+    def replay(self, menus: Dict[str, TrainingMenu]) -> int:
+        """Apply the journal to ``menus``; a torn tail is ignored and sealed by the next append."""
+
+        records, end = self.read()
+        for record in records:
+            apply_record(menus, record)
+        return end
+
+    def drop_prefix(self, offset: int) -> None:
+        """Remove records up to ``offset`` once they are folded into the snapshot."""
+
+        try:
+            with self.path.open("rb") as handle:
+                handle.seek(offset)
+                tail = handle.read()
+        except FileNotFoundError:
+            return
+        if not tail:
+            self.path.unlink(missing_ok=True)
+            return
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with tmp.open("wb") as handle:
+            handle.write(tail)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp, self.path)
@@ -0,0 +1,399 @@
+﻿"""Streaming reader and validator for large menus.json files.
+
+The top-level array is decoded one element at a time with
+``JSONDecoder.raw_decode`` over a sliding buffer, so memory stays bounded by
+the chunk size plus the largest record. A malformed record is reported with
+its line and column and skipped; the reader resynchronises on the next
+element instead of aborting the whole file.
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import math
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator, List, Optional, TextIO, Tuple
+
+from ..circuit_paths import MENU_FILE
+from ..domain.menu import MAX_DURATION_MS, TrainingMenu, seconds_to_ms
+
+DEFAULT_CHUNK = 1 << 16
+# A record longer than this is treated as corrupt rather than buffered further.
+MAX_RECORD_CHARS = 1 << 20
+# Parallel validation hands out ranges of roughly this many bytes.
+SPLIT_BYTES = 32 << 20
+
+_NOT_WS = re.compile(r"\S")
+_SEPARATOR = re.compile(r"\s*([,\]])")
+_STRUCTURE = re.compile(r'[\[\]{}",]')
+_STRING_END = re.compile(r'["\\]')
+# "}," followed by a raw newline and "{": a raw newline cannot occur inside a JSON
+# string, so in pretty-printed files this only matches between records.
+_BOUNDARY = re.compile(r"\}\s*,[ \t\r]*\n\s*\{")
+_BYTE_BOUNDARY = re.compile(rb"\}\s*,[ \t\r]*\n\s*\{")
+# Durations are seconds in the file (int or float); the minimum is in milliseconds.
+_DURATION_FIELDS = (("set_seconds", 1, "0 より大きく"), ("rest_seconds", 0, "0 以上に"))
+_FIELDS = ("name", "set_seconds", "rest_seconds", "sets")
+
+# (element index, buffer offset, decoded value, error message). The offset is
+# turned into a line and column only for errors, via ``position`` before the
+# reader is resumed.
+_Element = Tuple[int, int, object, Optional[str]]
+
+
+@dataclass(frozen=True)
+class RecordError:
+    index: int
+    line: int
+    column: int
+    message: str
+
+    def __str__(self) -> str:
+        return f"{self.line}:{self.column} (#{self.index}): {self.message}"
+
+
+class MenuFormatError(ValueError):
+    def __init__(self, error: RecordError):
+        super().__init__(str(error))
+        self.error = error
+
+
+@dataclass
+class ValidationReport:
+    valid: int = 0
+    errors: List[RecordError] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+def menu_from_record(item: object) -> TrainingMenu:
+    """Build a menu, rejecting values ``TrainingMenu.from_dict`` would silently coerce."""
+
+    if not isinstance(item, dict):
+        raise ValueError("オブジェクトではありません。")
+    missing = [key for key in _FIELDS if key not in item]
+    if missing:
+        raise ValueError(f"項目がありません: {', '.join(missing)}")
+    name = item["name"]
+    if not isinstance(name, str) or not name.strip():
+        raise ValueError("name が空か文字列ではありません。")
+    durations = []
+    for key, minimum, requirement in _DURATION_FIELDS:
+        value = item[key]
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+            raise ValueError(f"{key} が数値ではありません: {value!r}")
+        ms = seconds_to_ms(value)
+        if ms < minimum:
+            raise ValueError(f"{key} は {requirement}してください: {value}")
+        if ms > MAX_DURATION_MS:
+            raise ValueError(f"{key} が大きすぎます: {value}")
+        durations.append(ms)
+    sets = item["sets"]
+    if isinstance(sets, bool) or not isinstance(sets, int):
+        raise ValueError(f"sets が整数ではありません: {sets!r}")
+    if sets < 1:
+        raise ValueError(f"sets は 1 以上にしてください: {sets}")
+    return TrainingMenu(name, durations[0], durations[1], sets)
+
+
+class _ElementReader:
+    """Yields every element of a JSON array read incrementally from ``stream``.
+
+    ``opened``/``closed`` say whether the text includes the array's ``[`` and
+    ``]``; parallel validation reads slices that start or end mid-array.
+    """
+
+    def __init__(
+        self,
+        stream: TextIO,
+        chunk_size: int = DEFAULT_CHUNK,
+        opened: bool = True,
+        closed: bool = True,
+        line: int = 1,
+        column: int = 1,
+    ):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.opened = opened
+        self.closed = closed
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        # Line and column of buf[mark]; positions are asked for in increasing order.
+        self.mark = 0
+        self.line = line
+        self.column = column
+        self.count = 0
+        self._decoder = json.JSONDecoder()
+
+    def __iter__(self) -> Iterator[_Element]:
+        if self.opened:
+            if self._skip_ws() != "[":
+                yield 0, self.pos, None, "トップレベルが配列ではありません。"
+                return
+            self.pos += 1
+            if self._skip_ws() == "]":
+                yield from self._after_close()
+                return
+        raw_decode = self._decoder.raw_decode
+        while True:
+            if self.pos > self.chunk_size:
+                self._trim()
+            char = self._skip_ws()
+            if char is None:
+                if self.closed:
+                    yield self.count, self.pos, None, "']' がありません (ファイルが途中で切れています)。"
+                return
+            start = self.pos
+            # Fast path: the whole element is in the buffer and decodes cleanly.
+            try:
+                value, end = raw_decode(self.buf, start)
+            except json.JSONDecodeError:
+                end = len(self.buf)
+            if end < len(self.buf):
+                self.pos = end
+                yield self.count, start, value, None
+            else:
+                value, error = self._decode()
+                yield self.count, start, value, error
+            self.count += 1
+            match = _SEPARATOR.match(self.buf, self.pos)
+            char = match.group(1) if match else self._skip_ws()
+            if char == ",":
+                self.pos = match.end() if match else self.pos + 1
+            elif char == "]" and self.closed:
+                if match:
+                    self.pos = match.start(1)
+                yield from self._after_close()
+                return
+            elif char is not None:
+                yield self.count, self.pos, None, "',' または ']' がありません。"
+
+    def _after_close(self) -> Iterator[_Element]:
+        # Called with pos on the closing "]"; only whitespace may follow it.
+        self.pos += 1
+        if self._skip_ws() is not None:
+            yield self.count, self.pos, None, "']' の後に余分な内容があります。"
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        data = self.stream.read(self.chunk_size)
+        if not data:
+            self.eof = True
+            return False
+        self.buf += data
+        return True
+
+    def _trim(self) -> None:
+        # Only called between elements, so no caller holds a buffer offset.
+        self.position(self.pos)
+        self.buf = self.buf[self.pos :]
+        self.pos = self.mark = 0
+
+    def position(self, pos: int) -> Tuple[int, int]:
+        newlines = self.buf.count("\n", self.mark, pos)
+        if newlines:
+            self.line += newlines
+            self.column = pos - self.buf.rfind("\n", self.mark, pos)
+        else:
+            self.column += pos - self.mark
+        self.mark = pos
+        return self.line, self.column
+
+    def _skip_ws(self) -> Optional[str]:
+        while True:
+            match = _NOT_WS.search(self.buf, self.pos)
+            if match:
+                self.pos = match.start()
+                return self.buf[self.pos]
+            self.pos = len(self.buf)
+            if not self._fill():
+                return None
+
+    def _decode(self) -> Tuple[object, Optional[str]]:
+        start = self.pos
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buf, start)
+            except json.JSONDecodeError as exc:
+                if self._maybe_truncated(exc, start) and self._fill():
+                    continue
+                self.pos = self._element_end(start)
+                return None, f"JSON として解釈できません: {exc.msg}"
+            # A number at the very end of the buffer may continue in the next chunk.
+            if end == len(self.buf) and self._fill():
+                continue
+            self.pos = end
+            return value, None
+
+    def _maybe_truncated(self, exc: json.JSONDecodeError, start: int) -> bool:
+        if self.eof or len(self.buf) - start >= MAX_RECORD_CHARS:
+            return False
+        return exc.pos >= len(self.buf) - 1 or exc.msg.startswith("Unterminated string")
+
+    def _element_end(self, start: int) -> int:
+        """End of a malformed element, found by bracket matching outside strings."""
+
+        depth = 0
+        pos = start
+        in_string = False
+        while True:
+            match = (_STRING_END if in_string else _STRUCTURE).search(self.buf, pos)
+            if match is None:
+                if len(self.buf) - start < MAX_RECORD_CHARS and self._fill():
+                    continue
+                return self._resync(start)
+            char, pos = match.group(), match.end()
+            if in_string:
+                if char == "\\":
+                    pos += 1
+                else:
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char in "[{":
+                depth += 1
+            elif char in "]}":
+                if depth == 0:
+                    return match.start()
+                depth -= 1
+                if depth == 0:
+                    return pos
+            elif depth == 0:
+                return match.start()
+
+    def _resync(self, start: int) -> int:
+        # Brackets never balanced (e.g. an unterminated string); skip to the next record boundary.
+        match = _BOUNDARY.search(self.buf, start + 1)
+        if match:
+            return match.start() + 1
+        tail = self.buf.rstrip()
+        if self.eof and self.closed and tail.endswith("]"):
+            return len(tail) - 1
+        return len(self.buf)
+
+
+def _elements_to_menus(
+    reader: _ElementReader, errors: Optional[List[RecordError]], validate: bool
+) -> Iterator[TrainingMenu]:
+    for index, offset, value, error in reader:
+        if error is None:
+            try:
+                menu = menu_from_record(value) if validate else TrainingMenu.from_dict(value)  # type: ignore[arg-type]
+            except (KeyError, TypeError, ValueError) as exc:
+                error = str(exc) if isinstance(exc, ValueError) else f"項目を読み取れません: {exc!r}"
+            else:
+                yield menu
+                continue
+        problem = RecordError(index, *reader.position(offset), error)
+        if errors is None:
+            raise MenuFormatError(problem)
+        errors.append(problem)
+
+
+def iter_menus(
+    file_path: Path | None = None,
+    errors: Optional[List[RecordError]] = None,
+    validate: bool = True,
+    chunk_size: int = DEFAULT_CHUNK,
+) -> Iterator[TrainingMenu]:
+    """Yield menus one by one.
+
+    Problems are appended to ``errors`` and the offending record skipped;
+    without a list the first problem raises :class:`MenuFormatError`.
+    ``validate=False`` accepts whatever ``TrainingMenu.from_dict`` accepts.
+    """
+
+    with (file_path or MENU_FILE).open("r", encoding="utf-8") as handle:
+        yield from _elements_to_menus(_ElementReader(handle, chunk_size), errors, validate)
+
+
+def validate_file(file_path: Path | None = None, workers: int = 1, split_bytes: int = SPLIT_BYTES) -> ValidationReport:
+    """Validate every record; with ``workers > 1`` byte ranges are checked in parallel processes."""
+
+    path = file_path or MENU_FILE
+    report = ValidationReport()
+    ranges = _split_points(path, split_bytes) if workers > 1 else []
+    if len(ranges) <= 1:
+        for _menu in iter_menus(path, report.errors):
+            report.valid += 1
+        return report
+
+    size = path.stat().st_size
+    starts = [start for start, _column in ranges]
+    ends = starts[1:] + [size]
+    columns = [column for _start, column in ranges]
+    lines_before = 0
+    index_before = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for count, valid, newlines, errors in pool.map(_validate_range, [path] * len(starts), starts, ends, columns):
+            report.valid += valid
+            report.errors.extend(
+                RecordError(index + index_before, line + lines_before, column, message)
+                for index, line, column, message in errors
+            )
+            lines_before += newlines
+            index_before += count
+    return report
+
+
+def _split_points(path: Path, split_bytes: int) -> List[Tuple[int, int]]:
+    """Record boundaries near every ``split_bytes``, as (byte offset of "{", its column)."""
+
+    points = [(0, 1)]
+    size = path.stat().st_size
+    with path.open("rb") as handle:
+        for target in range(split_bytes, size, split_bytes):
+            if target <= points[-1][0]:
+                continue
+            handle.seek(target)
+            window = handle.read(1 << 16)
+            match = _BYTE_BOUNDARY.search(window)
+            if match is None:
+                # No newline-separated boundary nearby (e.g. a compact file): keep the range whole.
+                continue
+            brace = match.end() - 1
+            column = brace - window.rfind(b"\n", 0, brace)
+            points.append((target + brace, column))
+    return points
+
+
+def _validate_range(path: Path, start: int, end: int, column: int) -> Tuple[int, int, int, List[Tuple[int, int, int, str]]]:
+    with path.open("rb") as handle:
+        handle.seek(start)
+        data = handle.read(end - start)
+    # Ranges begin at a "{" and end before one, so they are whole UTF-8 sequences.
+    text = data.decode("utf-8")
+    reader = _ElementReader(io.StringIO(text), opened=start == 0, closed=end >= path.stat().st_size, column=column)
+    errors: List[RecordError] = []
+    valid = sum(1 for _menu in _elements_to_menus(reader, errors, validate=True))
+    # Lines and indexes are relative to the range; the parent offsets them by the earlier ranges.
+    relative = [(error.index, error.line, error.column, error.message) for error in errors]
+    return reader.count, valid, text.count("\n"), relative
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="menus.json を検証し、不正なレコードを位置付きで表示します")
+    parser.add_argument("path", type=Path, nargs="?", default=MENU_FILE)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--max-errors", type=int, default=50, help="表示するエラーの最大件数")
+    args = parser.parse_args()
+    report = validate_file(args.path, args.workers)
+    for error in report.errors[: args.max_errors]:
+        print(error)
+    print(f"有効なレコード: {report.valid} 件 / エラー: {len(report.errors)} 件")
+    if not report.ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
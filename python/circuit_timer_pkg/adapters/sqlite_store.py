@@ -0,0 +1,258 @@
+﻿"""SQLite-backed menu repository with indexed point lookups and paging.
+
+:mod:`.storage` hands a ``.sqlite3`` path to this module, so the app and
+the CLI use it when started with ``--menus menus.sqlite3``. Fill it from
+``menus.json`` with the one-shot migrator below.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+from pathlib import Path
+from collections.abc import MutableMapping
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..circuit_paths import MENU_DB_FILE, MENU_FILE
+from ..domain.menu import TrainingMenu
+from ..domain.sequence import build_sequence, total_duration
+from .journal import Record, record_menu, record_name
+from .storage import MenuChanges, load_menus as load_json_menus
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS menus (
+    name TEXT PRIMARY KEY,
+    set_ms INTEGER NOT NULL,
+    rest_ms INTEGER NOT NULL,
+    sets INTEGER NOT NULL,
+    total_ms INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_menus_set_ms ON menus (set_ms);
+CREATE INDEX IF NOT EXISTS idx_menus_rest_ms ON menus (rest_ms);
+CREATE INDEX IF NOT EXISTS idx_menus_total_ms ON menus (total_ms);
+"""
+
+_COLUMNS = "name, set_ms, rest_ms, sets"
+_UPSERT = "INSERT OR REPLACE INTO menus (name, set_ms, rest_ms, sets, total_ms) VALUES (?, ?, ?, ?, ?)"
+_DELETE = "DELETE FROM menus WHERE name = ?"
+
+Row = Tuple[str, int, int, int]
+
+
+def _to_row(menu: TrainingMenu) -> Tuple[str, int, int, int, int]:
+    return (menu.name, menu.set_ms, menu.rest_ms, menu.sets, total_duration(build_sequence(menu)))
+
+
+def _from_row(row: Row) -> TrainingMenu:
+    return TrainingMenu(*row)
+
+
+class MenuRepository:
+    """Menus stored one row each, so the app can page and look up without loading the library."""
+
+    def __init__(self, db_path: Path | None = None):
+        self.path = db_path or MENU_DB_FILE
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(_SCHEMA)
+
+    def __enter__(self) -> "MenuRepository":
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM menus").fetchone()[0]
+
+    def names(self) -> List[str]:
+        return [row[0] for row in self.conn.execute("SELECT name FROM menus")]
+
+    def data_version(self) -> int:
+        """Changes whenever another connection commits to the database."""
+
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def get(self, name: str) -> Optional[TrainingMenu]:
+        row = self.conn.execute(f"SELECT {_COLUMNS} FROM menus WHERE name = ?", (name,)).fetchone()
+        return _from_row(row) if row else None
+
+    def list_page(self, limit: int = 50, after: Optional[str] = None, prefix: Optional[str] = None) -> List[TrainingMenu]:
+        """Return up to ``limit`` menus ordered by name, starting after ``after``.
+
+        Keyset paging keeps every page an index range scan, however deep.
+        """
+
+        clauses: List[str] = []
+        params: List[object] = []
+        if after is not None:
+            clauses.append("name > ?")
+            params.append(after)
+        if prefix:
+            clauses.append("name >= ? AND name < ?")
+            params.extend([prefix, prefix + "\U0010ffff"])
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        params.append(limit)
+        rows = self.conn.execute(f"SELECT {_COLUMNS} FROM menus {where} ORDER BY name LIMIT ?", params)
+        return [_from_row(row) for row in rows]
+
+    def list_by_total(
+        self,
+        min_ms: Optional[int] = None,
+        max_ms: Optional[int] = None,
+        limit: int = 50,
+        offset: int = 0,
+    ) -> List[TrainingMenu]:
+        clauses: List[str] = []
+        params: List[object] = []
+        if min_ms is not None:
+            clauses.append("total_ms >= ?")
+            params.append(min_ms)
+        if max_ms is not None:
+            clauses.append("total_ms <= ?")
+            params.append(max_ms)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        params.extend([limit, offset])
+        rows = self.conn.execute(
+            f"SELECT {_COLUMNS} FROM menus {where} ORDER BY total_ms, name LIMIT ? OFFSET ?",
+            params,
+        )
+        return [_from_row(row) for row in rows]
+
+    def upsert(self, menu: TrainingMenu) -> None:
+        self.upsert_many([menu])
+
+    def upsert_many(self, menus: Iterable[TrainingMenu]) -> None:
+        with self.conn:
+            self.conn.executemany(_UPSERT, (_to_row(menu) for menu in menus))
+
+    def delete(self, name: str) -> None:
+        with self.conn:
+            self.conn.execute(_DELETE, (name,))
+
+    def replace_all(self, menus: Iterable[TrainingMenu]) -> None:
+        with self.conn:
+            self.conn.execute("DELETE FROM menus")
+            self.conn.executemany(_UPSERT, (_to_row(menu) for menu in menus))
+
+    def apply(self, records: Iterable[Record]) -> None:
+        """Apply journal-style upsert/delete records in one transaction."""
+
+        with self.conn:
+            for record in records:
+                menu = record_menu(record)
+                if menu is None:
+                    self.conn.execute(_DELETE, (record_name(record),))
+                else:
+                    self.conn.execute(_UPSERT, _to_row(menu))
+
+    def load_all(self) -> Dict[str, TrainingMenu]:
+        rows = self.conn.execute(f"SELECT {_COLUMNS} FROM menus ORDER BY name")
+        return {row[0]: _from_row(row) for row in rows}
+
+
+class _LazyMenus(MutableMapping):
+    """Every menu name, with each menu fetched by point lookup the first time it is read."""
+
+    def __init__(self, repo: MenuRepository):
+        self._repo = repo
+        # None until the menu has been fetched.
+        self._menus: Dict[str, Optional[TrainingMenu]] = {}
+
+    def __getitem__(self, name: str) -> TrainingMenu:
+        menu = self._menus[name]
+        if menu is None:
+            menu = self._repo.get(name)
+            if menu is None:
+                raise KeyError(name)
+            self._menus[name] = menu
+        return menu
+
+    def __setitem__(self, name: str, menu: TrainingMenu) -> None:
+        self._menus[name] = menu
+
+    def __delitem__(self, name: str) -> None:
+        del self._menus[name]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._menus
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._menus)
+
+    def __len__(self) -> int:
+        return len(self._menus)
+
+
+class RepositoryCache:
+    """:class:`.storage.MenuCache` for a SQLite library, without loading it.
+
+    ``menus`` holds every name but only the menus read so far. ``refresh``
+    costs one ``PRAGMA data_version`` while no other connection has
+    committed; after a commit it re-lists the names and re-reads the menus
+    already fetched, so removals, additions and edits of those are reported.
+    """
+
+    def __init__(self, db_path: Path | None = None):
+        self.repo = MenuRepository(db_path)
+        self.path = self.repo.path
+        self.menus = _LazyMenus(self.repo)
+        self._version: Optional[int] = None
+
+    def close(self) -> None:
+        self.repo.close()
+
+    def refresh(self) -> MenuChanges:
+        version = self.repo.data_version()
+        if version == self._version:
+            return MenuChanges()
+        self._version = version
+        fetched = self.menus._menus
+        names = self.repo.names()
+        changes = MenuChanges(removed=list(fetched.keys() - set(names)))
+        for name in changes.removed:
+            del fetched[name]
+        for name in names:
+            if name not in fetched:
+                fetched[name] = None
+                changes.added.append(name)
+            elif fetched[name] is not None:
+                menu = self.repo.get(name)
+                if menu != fetched[name]:
+                    fetched[name] = menu
+                    changes.modified.append(name)
+        return changes
+
+
+def load_menus(file_path: Path | None = None) -> Dict[str, TrainingMenu]:
+    with MenuRepository(file_path) as repo:
+        return repo.load_all()
+
+
+def save_menus(menus: Dict[str, TrainingMenu], file_path: Path | None = None) -> None:
+    with MenuRepository(file_path) as repo:
+        repo.replace_all(menus.values())
+
+
+def migrate_from_json(json_path: Path | None = None, db_path: Path | None = None) -> int:
+    """Copy every menu from ``menus.json`` (snapshot + journal) into SQLite."""
+
+    menus = load_json_menus(json_path or MENU_FILE)
+    save_menus(menus, db_path)
+    return len(menus)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="menus.json を SQLite に移行します")
+    parser.add_argument("--json", type=Path, default=MENU_FILE)
+    parser.add_argument("--db", type=Path, default=MENU_DB_FILE)
+    args = parser.parse_args()
+    count = migrate_from_json(args.json, args.db)
+    print(f"{count} 件のメニューを {args.db} に移行しました。")
+
+
+if __name__ == "__main__":
+    main()
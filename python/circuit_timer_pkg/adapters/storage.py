@@ -3,26 +3,292 @@
 from __future__ import annotations
 
 import json
+import os
+import threading
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict
+from typing import TYPE_CHECKING, Dict, List, Mapping, Optional, Set, Tuple, Union
 
-from ..circuit_paths import MENU_FILE
+from ..circuit_paths import MENU_DB_FILE, MENU_FILE
 from ..domain.menu import TrainingMenu
+from .binary_store import encode_snapshot, is_binary_snapshot, load_menus as load_binary_menus
+from .filelock import FileLock
+from .json_stream import iter_menus
+from .journal import (
+    Identity,
+    MenuJournal,
+    Record,
+    apply_record,
+    delete_record,
+    file_identity,
+    journal_path,
+    record_name,
+    upsert_record,
+)
+
+if TYPE_CHECKING:
+    from .sqlite_store import RepositoryCache
+
+# Compact once the journal outgrows this many bytes or half the snapshot, whichever is larger.
+COMPACT_MIN_BYTES = 64 * 1024
+
+_compact_lock = threading.Lock()
+_compacting: Set[Path] = set()
+
+
+def is_sqlite_store(path: Path) -> bool:
+    return path.suffix == MENU_DB_FILE.suffix
 
 
 def load_menus(file_path: Path | None = None) -> Dict[str, TrainingMenu]:
     path = file_path or MENU_FILE
-    if not path.exists():
-        return {}
-    data = json.loads(path.read_text(encoding="utf-8"))
-    menus: Dict[str, TrainingMenu] = {}
-    for item in data:
-        menu = TrainingMenu.from_dict(item)
-        menus[menu.name] = menu
+    # A ".sqlite3" path is a MenuRepository; it is imported only when used.
+    if is_sqlite_store(path):
+        from .sqlite_store import load_menus as load_sqlite_menus
+
+        return load_sqlite_menus(path)
+    # Shared lock: a concurrent compaction cannot swap the snapshot between the two reads.
+    with FileLock(path, shared=True):
+        menus = _read_snapshot(path)
+        MenuJournal(journal_path(path)).replay(menus)
     return menus
 
 
-def save_menus(menus: Dict[str, TrainingMenu], file_path: Path | None = None) -> None:
+def save_menus(
+    menus: Mapping[str, TrainingMenu],
+    file_path: Path | None = None,
+    base: Optional[Mapping[str, TrainingMenu]] = None,
+) -> None:
+    """Persist ``menus``.
+
+    With ``base`` (the dict as it was loaded) only the entries that differ
+    from it are written, merged into whatever other processes saved in the
+    meantime. Without it the library is replaced wholesale.
+    """
+
+    path = file_path or MENU_FILE
+    if base is not None:
+        _append(path, diff_records(base, menus))
+        return
+    if is_sqlite_store(path):
+        from .sqlite_store import save_menus as save_sqlite_menus
+
+        save_sqlite_menus(menus, path)
+        return
+    tmp = _write_temp(menus, path)
+    with FileLock(path):
+        _replace(tmp, path)
+        journal_path(path).unlink(missing_ok=True)
+
+
+def upsert_menu(menu: TrainingMenu, file_path: Path | None = None) -> None:
+    """Record a single create/overwrite without rewriting the whole library."""
+
+    _append(file_path or MENU_FILE, [upsert_record(menu)])
+
+
+def delete_menu(name: str, file_path: Path | None = None) -> None:
+    _append(file_path or MENU_FILE, [delete_record(name)])
+
+
+def diff_records(base: Mapping[str, TrainingMenu], menus: Mapping[str, TrainingMenu]) -> List[Record]:
+    records = [upsert_record(menu) for name, menu in menus.items() if base.get(name) != menu]
+    records.extend(delete_record(name) for name in base if name not in menus)
+    return records
+
+
+def compact(file_path: Path | None = None) -> bool:
+    """Fold the journal into the snapshot and drop the folded records.
+
+    Serialisation happens outside the lock so writers are not blocked; the
+    result is discarded if another process replaced the snapshot meanwhile.
+    """
+
+    path = file_path or MENU_FILE
+    if is_sqlite_store(path):
+        return False
+    journal = MenuJournal(journal_path(path))
+    with FileLock(path, shared=True):
+        identity = file_identity(path)
+        menus = _read_snapshot(path)
+        offset = journal.replay(menus)
+    tmp = _write_temp(menus, path)
+    with FileLock(path):
+        if file_identity(path) != identity:
+            tmp.unlink(missing_ok=True)
+            return False
+        _replace(tmp, path)
+        # Records appended while the snapshot was being written survive in the tail.
+        journal.drop_prefix(offset)
+    return True
+
+
+@dataclass
+class MenuChanges:
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    modified: List[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.modified)
+
+
+class MenuCache:
+    """Keeps ``menus`` in sync with the files, re-reading only when their identity changes.
+
+    ``refresh`` costs two ``stat`` calls when nothing changed. If only the
+    journal grew, just the new tail is read; otherwise snapshot and journal
+    are re-parsed. ``menus`` is updated in place and the affected names are
+    reported.
+    """
+
+    def __init__(self, file_path: Path | None = None):
+        self.path = file_path or MENU_FILE
+        self.menus: Dict[str, TrainingMenu] = {}
+        self._journal = MenuJournal(journal_path(self.path))
+        self._snapshot_id: Identity = None
+        self._journal_id: Identity = None
+        self._journal_offset = 0
+        self._loaded = False
+
+    def refresh(self) -> MenuChanges:
+        if self._loaded and self._current_ids() == (self._snapshot_id, self._journal_id):
+            return MenuChanges()
+        with FileLock(self.path, shared=True):
+            snapshot_id, journal_id = self._current_ids()
+            if self._loaded and snapshot_id == self._snapshot_id and self._journal_grew(journal_id):
+                changes = self._apply_tail()
+            else:
+                changes = self._reload()
+        self._snapshot_id, self._journal_id = snapshot_id, journal_id
+        self._loaded = True
+        return changes
+
+    def _current_ids(self) -> Tuple[Identity, Identity]:
+        return file_identity(self.path), file_identity(self._journal.path)
+
+    def _journal_grew(self, journal_id: Identity) -> bool:
+        if journal_id is None or self._journal_id is None:
+            return journal_id is None and self._journal_id is None
+        return journal_id[0] == self._journal_id[0] and journal_id[2] >= self._journal_offset
+
+    def _apply_tail(self) -> MenuChanges:
+        records, self._journal_offset = self._journal.read(self._journal_offset)
+        before: Dict[str, Optional[TrainingMenu]] = {}
+        for record in records:
+            name = record_name(record)
+            before.setdefault(name, self.menus.get(name))
+            apply_record(self.menus, record)
+        changes = MenuChanges()
+        for name, old in before.items():
+            _classify(changes, name, old, self.menus.get(name))
+        return changes
+
+    def _reload(self) -> MenuChanges:
+        fresh = _read_snapshot(self.path)
+        self._journal_offset = self._journal.replay(fresh)
+        changes = MenuChanges()
+        for name in self.menus.keys() - fresh.keys():
+            _classify(changes, name, self.menus.pop(name), None)
+        for name, menu in fresh.items():
+            old = self.menus.get(name)
+            if old != menu:
+                self.menus[name] = menu
+            _classify(changes, name, old, menu)
+        return changes
+
+
+def open_cache(file_path: Path | None = None) -> Union[MenuCache, "RepositoryCache"]:
+    """The cache for the library at ``file_path``; SQLite libraries are read lazily."""
+
+    path = file_path or MENU_FILE
+    if is_sqlite_store(path):
+        from .sqlite_store import RepositoryCache
+
+        return RepositoryCache(path)
+    return MenuCache(path)
+
+
+def _classify(changes: MenuChanges, name: str, old: Optional[TrainingMenu], new: Optional[TrainingMenu]) -> None:
+    if old is None and new is not None:
+        changes.added.append(name)
+    elif old is not None and new is None:
+        changes.removed.append(name)
+    elif old != new:
+        changes.modified.append(name)
+
+
+def compact_in_background(file_path: Path | None = None) -> Optional[threading.Thread]:
     path = file_path or MENU_FILE
-    payload = [menu.to_dict() for menu in menus.values()]
-    path.write_text(json.dumps(payload, indent=2, ensure_ascii=False), encoding="utf-8")
+    with _compact_lock:
+        if path in _compacting:
+            return None
+        _compacting.add(path)
+
+    def _run() -> None:
+        try:
+            compact(path)
+        finally:
+            with _compact_lock:
+                _compacting.discard(path)
+
+    thread = threading.Thread(target=_run, name="menu-compactor", daemon=True)
+    thread.start()
+    return thread
+
+
+def _append(path: Path, records: List[Record]) -> None:
+    if not records:
+        return
+    if is_sqlite_store(path):
+        from .sqlite_store import MenuRepository
+
+        with MenuRepository(path) as repo:
+            repo.apply(records)
+        return
+    with FileLock(path):
+        size = MenuJournal(journal_path(path)).append(records)
+    _maybe_compact(path, size)
+
+
+def _maybe_compact(path: Path, journal_size: int) -> None:
+    try:
+        snapshot_size = path.stat().st_size
+    except FileNotFoundError:
+        snapshot_size = 0
+    if journal_size > max(COMPACT_MIN_BYTES, snapshot_size // 2):
+        compact_in_background(path)
+
+
+def _read_snapshot(path: Path) -> Dict[str, TrainingMenu]:
+    # A ".ctm" snapshot is the binary format; the journal layers over either format.
+    if is_binary_snapshot(path):
+        return load_binary_menus(path)
+    if not path.exists():
+        return {}
+    # Streamed, so the raw text and the decoded list are never held alongside the menus.
+    return {menu.name: menu for menu in iter_menus(path, validate=False)}
+
+
+def _write_temp(menus: Mapping[str, TrainingMenu], path: Path) -> Path:
+    if is_binary_snapshot(path):
+        data = encode_snapshot(menus)
+    else:
+        data = json.dumps([menu.to_dict() for menu in menus.values()], indent=2, ensure_ascii=False).encode("utf-8")
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with tmp.open("wb") as handle:
+        handle.write(data)
+        handle.flush()
+        os.fsync(handle.fileno())
+    return tmp
+
+
+def _replace(tmp: Path, path: Path) -> None:
+    os.replace(tmp, path)
+    if hasattr(os, "O_DIRECTORY"):
+        # Persist the rename itself, otherwise a crash can resurrect the old file.
+        fd = os.open(path.parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
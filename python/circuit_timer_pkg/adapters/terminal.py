@@ -0,0 +1,157 @@
+﻿"""Console output for the CLI countdown: a diffing status line on terminals, plain lines elsewhere."""
+
+from __future__ import annotations
+
+import sys
+import unicodedata
+from typing import List, Optional, TextIO, Union
+
+_ERASE_TO_END = "\x1b[K"
+
+
+def _cell_width(char: str) -> int:
+    if unicodedata.combining(char):
+        return 0
+    return 2 if unicodedata.east_asian_width(char) in ("W", "F") else 1
+
+
+def _cost(text: str) -> int:
+    return len(text.encode("utf-8"))
+
+
+class _Output:
+    """Buffers writes between frames and counts the bytes that reach the stream."""
+
+    interactive = False
+
+    def __init__(self, stream: Optional[TextIO] = None):
+        self.stream = stream if stream is not None else sys.stdout
+        self.bytes_written = 0
+        self._pending: List[str] = []
+
+    def _write(self, text: str) -> None:
+        if text:
+            self._pending.append(text)
+
+    def flush(self) -> None:
+        """End the frame: one write and one flush for everything buffered since the last frame."""
+
+        if not self._pending:
+            return
+        data = "".join(self._pending)
+        self._pending.clear()
+        self.bytes_written += _cost(data)
+        self.stream.write(data)
+        self.stream.flush()
+
+    def line(self, text: str = "") -> None:
+        self._write(text + "\n")
+
+    def status(self, text: str) -> None:
+        """Replace the transient status line; ignored when the output is a log."""
+
+    def bell(self) -> None:
+        """Ring the terminal bell; ignored when the output is a log."""
+
+    def close(self) -> None:
+        self.flush()
+
+
+class LineRenderer(_Output):
+    """For pipes and files: permanent lines only, no control characters."""
+
+
+class StatusRenderer(_Output):
+    """Keeps one status line at the bottom and rewrites only the cells that changed.
+
+    The cursor position is tracked so each change is reached by the
+    cheapest of backspaces, a cursor escape or re-emitting the characters
+    already on screen. Wide (East Asian) characters count as two cells.
+    """
+
+    interactive = True
+
+    def __init__(self, stream: Optional[TextIO] = None):
+        super().__init__(stream)
+        self._shown = ""
+        self._widths: List[int] = []
+        self._cursor = 0  # index into ``_shown``
+
+    def status(self, text: str) -> None:
+        if text == self._shown:
+            return
+        widths = [_cell_width(char) for char in text]
+        old = self._shown
+        if widths == self._widths:
+            # Same layout: rewrite each run of changed characters in place.
+            index, size = 0, len(text)
+            while index < size:
+                if text[index] == old[index]:
+                    index += 1
+                    continue
+                end = index + 1
+                while end < size and text[end] != old[end]:
+                    end += 1
+                self._move(index, text, widths)
+                self._write(text[index:end])
+                self._cursor = index = end
+        else:
+            start = 0
+            limit = min(len(text), len(old))
+            while start < limit and text[start] == old[start] and widths[start] == self._widths[start]:
+                start += 1
+            self._move(start, old, self._widths)
+            self._write(text[start:])
+            if sum(widths) < sum(self._widths):
+                self._write(_ERASE_TO_END)
+            self._cursor = len(text)
+        self._shown = text
+        self._widths = widths
+
+    def _move(self, target: int, text: str, widths: List[int]) -> None:
+        """Move the cursor to ``target``; the characters before it are already on screen as ``text``."""
+
+        cursor = self._cursor
+        if target == cursor:
+            return
+        if target > cursor:
+            cells = sum(widths[cursor:target])
+            options = [text[cursor:target], f"\x1b[{cells}C"]
+        else:
+            cells = sum(widths[target:cursor])
+            options = ["\b" * cells, f"\x1b[{cells}D", "\r" + text[:target]]
+        self._write(min(options, key=_cost))
+        self._cursor = target
+
+    def _end_status(self) -> None:
+        if self._shown:
+            self._write("\n")
+            self._shown = ""
+            self._widths = []
+            self._cursor = 0
+
+    def line(self, text: str = "") -> None:
+        """Print a permanent line; the current status stays on screen above it."""
+
+        self._end_status()
+        super().line(text)
+
+    def bell(self) -> None:
+        self._write("\a")
+
+    def close(self) -> None:
+        self._end_status()
+        self.flush()
+
+
+Renderer = Union[StatusRenderer, LineRenderer]
+
+
+def open_renderer(stream: Optional[TextIO] = None, interactive: Optional[bool] = None) -> Renderer:
+    """A :class:`StatusRenderer` when ``stream`` is a terminal, else a :class:`LineRenderer`."""
+
+    stream = stream if stream is not None else sys.stdout
+    if interactive is None:
+        isatty = getattr(stream, "isatty", None)
+        interactive = bool(isatty and isatty())
+    return StatusRenderer(stream) if interactive else LineRenderer(stream)
@@ -3,3 +3,5 @@
 from pathlib import Path
 
 MENU_FILE = Path(__file__).resolve().parent.parent / "menus.json"
+MENU_DB_FILE = MENU_FILE.with_suffix(".sqlite3")
+MENU_BIN_FILE = MENU_FILE.with_suffix(".ctm")
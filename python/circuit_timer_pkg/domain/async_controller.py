@@ -0,0 +1,178 @@
+﻿"""asyncio variant of the timer controller with awaitable phase events."""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Union
+
+from .controller import TICK_MS, TimerController
+from .menu import TrainingMenu
+from .scheduler import TickSchedule
+from .sequence import Phase
+
+PHASE_START = "phase_start"
+TICK = "tick"
+COMPLETE = "complete"
+
+AsyncTickCallback = Callable[[Phase, int, int], Union[None, Awaitable[None]]]
+AsyncEventCallback = Callable[[Phase], Union[None, Awaitable[None]]]
+AsyncCompleteCallback = Callable[[], Union[None, Awaitable[None]]]
+
+
+@dataclass(frozen=True)
+class TimerEvent:
+    kind: str
+    phase: Optional[Phase]
+    remaining: int  # milliseconds
+    elapsed: int  # milliseconds
+
+
+class AsyncTimerController:
+    """Runs a ``TimerController`` as an asyncio task scheduled on ``loop.time()``.
+
+    Callbacks may be plain functions or coroutines. Every event is also
+    published to the iterators returned by :meth:`events`. Cancel the task
+    (or call :meth:`cancel`) to stop; :meth:`pause`/:meth:`resume` keep the
+    position inside the current second.
+    """
+
+    def __init__(
+        self,
+        on_phase_start: Optional[AsyncEventCallback] = None,
+        on_tick: Optional[AsyncTickCallback] = None,
+        on_complete: Optional[AsyncCompleteCallback] = None,
+        interval: float = 1.0,
+    ):
+        self.on_phase_start = on_phase_start
+        self.on_tick = on_tick
+        self.on_complete = on_complete
+        self.interval = interval
+        self.controller = TimerController(
+            on_phase_start=self._queue_phase_start,
+            on_tick=self._queue_tick,
+            on_complete=self._queue_complete,
+        )
+        self.task: Optional[asyncio.Task] = None
+        self._pending: List[TimerEvent] = []
+        self._subscribers: List[asyncio.Queue] = []
+        self._resumed = asyncio.Event()
+        self._resumed.set()
+        self._schedule: Optional[TickSchedule] = None
+        # The COMPLETE event of the last run, replayed to subscribers that attach after it.
+        self._completed: Optional[TimerEvent] = None
+
+    @property
+    def running(self) -> bool:
+        return self.controller.running
+
+    @property
+    def paused(self) -> bool:
+        return not self._resumed.is_set()
+
+    def load_menu(self, menu: TrainingMenu) -> None:
+        self.controller.load_menu(menu)
+
+    def start(self, elapsed_ms: int = 0) -> asyncio.Task:
+        if self.task is not None and not self.task.done():
+            raise RuntimeError("タイマーはすでに動作しています。")
+        self.task = asyncio.get_running_loop().create_task(self.run(elapsed_ms))
+        return self.task
+
+    def cancel(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+
+    def pause(self) -> None:
+        if self.paused:
+            return
+        self._resumed.clear()
+        if self._schedule is not None:
+            self._schedule.pause()
+
+    def resume(self) -> None:
+        if not self.paused:
+            return
+        if self._schedule is not None:
+            self._schedule.resume()
+        self._resumed.set()
+
+    async def run(self, elapsed_ms: int = 0) -> None:
+        loop = asyncio.get_running_loop()
+        schedule = TickSchedule(interval=self.interval, clock=loop.time)
+        schedule.start()
+        if self.paused:
+            schedule.pause()
+        self._schedule = schedule
+        self._completed = None
+        try:
+            if elapsed_ms:
+                self.controller.start_at(elapsed_ms)
+            else:
+                self.controller.start()
+            await self._dispatch()
+            while self.controller.running:
+                if self.paused:
+                    await self._resumed.wait()
+                    continue
+                await asyncio.sleep(schedule.delay_until_next())
+                if self.paused:
+                    continue
+                count = schedule.due()
+                if count:
+                    self.controller.tick(count * TICK_MS)
+                    await self._dispatch()
+        finally:
+            self._schedule = None
+            if self.controller.running:
+                self.controller.stop()
+            for queue in self._subscribers:
+                queue.put_nowait(None)
+
+    async def events(self) -> AsyncIterator[TimerEvent]:
+        """Yield every event from now until the run completes or is cancelled.
+
+        Once a run has ended this returns at once, after yielding its
+        COMPLETE event if it completed.
+        """
+
+        if self.task is not None and self.task.done():
+            if self._completed is not None:
+                yield self._completed
+            return
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.append(queue)
+        try:
+            while True:
+                event = await queue.get()
+                if event is None:
+                    return
+                yield event
+        finally:
+            self._subscribers.remove(queue)
+
+    async def _dispatch(self) -> None:
+        pending, self._pending = self._pending, []
+        for event in pending:
+            if event.kind == PHASE_START:
+                result = self.on_phase_start(event.phase) if self.on_phase_start else None
+            elif event.kind == TICK:
+                result = self.on_tick(event.phase, event.remaining, event.elapsed) if self.on_tick else None
+            else:
+                result = self.on_complete() if self.on_complete else None
+            if inspect.isawaitable(result):
+                await result
+            for queue in self._subscribers:
+                queue.put_nowait(event)
+
+    def _queue_phase_start(self, phase: Phase) -> None:
+        controller = self.controller
+        self._pending.append(TimerEvent(PHASE_START, phase, controller.remaining_ms, controller.elapsed_ms))
+
+    def _queue_tick(self, phase: Phase, remaining: int, elapsed: int) -> None:
+        self._pending.append(TimerEvent(TICK, phase, remaining, elapsed))
+
+    def _queue_complete(self) -> None:
+        self._completed = TimerEvent(COMPLETE, None, 0, self.controller.elapsed_ms)
+        self._pending.append(self._completed)
@@ -0,0 +1,347 @@
+﻿"""Wire protocol for mirroring one timer onto many displays.
+
+The publisher sends a message only when the controller reports a change:
+a STATE frame when a phase starts (and as a snapshot for new subscribers),
+a TICK frame per tick and a COMPLETE frame at the end. Every frame carries
+the publisher's monotonic time at which the timer reached the elapsed time
+in it, so a subscriber extrapolates the countdown between frames from its
+own clock instead of waiting for the next one.
+
+Frames are ``length, version, type, body`` with a one-byte length (which
+counts the version and type bytes too), little endian::
+
+    STATE     seq, at, scale, total, elapsed, phase start, duration,
+              index, count, set index, total sets, flags, label (UTF-8)
+    TICK      seq, at, elapsed, index
+    COMPLETE  seq, at, elapsed
+
+Times in the timer are milliseconds; ``at`` is seconds on the publisher's
+clock and ``scale`` is timer milliseconds per second of it. Indices, counts
+and set numbers are 32-bit, so templates with tens of thousands of sets
+fit.
+"""
+
+from __future__ import annotations
+
+import struct
+from collections import deque
+from typing import Callable, Deque, List, NamedTuple, Optional, Union
+
+from .controller import TICK_MS, TimerController
+from .scheduler import TickSchedule
+from .sequence import Phase
+
+VERSION = 2
+STATE = ord("S")
+TICK = ord("T")
+COMPLETE = ord("C")
+
+_STATE = struct.Struct("<IdfIIIIIIIIB")
+_TICK = struct.Struct("<IdII")
+_COMPLETE = struct.Struct("<IdI")
+_RUNNING = 1
+_DONE = 2
+# The frame length is one byte and counts the version and type bytes too.
+_MAX_LABEL = 255 - 2 - _STATE.size
+
+
+class StateMessage(NamedTuple):
+    seq: int
+    at: float
+    scale: float
+    total_ms: int
+    elapsed_ms: int
+    phase_start_ms: int
+    phase: Phase
+    index: int
+    count: int
+    running: bool
+    complete: bool
+
+
+class TickMessage(NamedTuple):
+    seq: int
+    at: float
+    elapsed_ms: int
+    index: int
+
+
+class CompleteMessage(NamedTuple):
+    seq: int
+    at: float
+    elapsed_ms: int
+
+
+Message = Union[StateMessage, TickMessage, CompleteMessage]
+
+
+def _frame(kind: int, body: bytes) -> bytes:
+    return bytes((len(body) + 2, VERSION, kind)) + body
+
+
+def encode_state(message: StateMessage) -> bytes:
+    phase = message.phase
+    flags = (_RUNNING if message.running else 0) | (_DONE if message.complete else 0)
+    label = phase.label.encode("utf-8")[:_MAX_LABEL]
+    body = _STATE.pack(
+        message.seq,
+        message.at,
+        message.scale,
+        message.total_ms,
+        message.elapsed_ms,
+        message.phase_start_ms,
+        phase.duration,
+        message.index,
+        message.count,
+        phase.set_index,
+        phase.total_sets,
+        flags,
+    )
+    return _frame(STATE, body + label)
+
+
+def encode_tick(seq: int, at: float, elapsed_ms: int, index: int) -> bytes:
+    return _frame(TICK, _TICK.pack(seq, at, elapsed_ms, index))
+
+
+def encode_complete(seq: int, at: float, elapsed_ms: int) -> bytes:
+    return _frame(COMPLETE, _COMPLETE.pack(seq, at, elapsed_ms))
+
+
+def decode(frame: Union[bytes, memoryview]) -> Message:
+    """Decode one frame without its length byte."""
+
+    if len(frame) < 2:
+        raise ValueError("フレームが短すぎます。")
+    if frame[0] != VERSION:
+        raise ValueError(f"対応していないフレームの版です: {frame[0]}")
+    kind = frame[1]
+    try:
+        if kind == TICK:
+            return TickMessage(*_TICK.unpack_from(frame, 2))
+        if kind == COMPLETE:
+            return CompleteMessage(*_COMPLETE.unpack_from(frame, 2))
+        if kind == STATE:
+            seq, at, scale, total, elapsed, start, duration, index, count, set_index, total_sets, flags = (
+                _STATE.unpack_from(frame, 2)
+            )
+            label = bytes(frame[2 + _STATE.size :]).decode("utf-8", errors="replace")
+            phase = Phase(label, duration, set_index, total_sets)
+            return StateMessage(
+                seq, at, scale, total, elapsed, start, phase, index, count, bool(flags & _RUNNING), bool(flags & _DONE)
+            )
+    except struct.error as exc:
+        raise ValueError("フレームが短すぎます。") from exc
+    raise ValueError(f"不明なフレームです: {kind!r}")
+
+
+class FrameDecoder:
+    """Splits a byte stream into messages; partial frames wait for the next ``feed``."""
+
+    __slots__ = ("_buffer",)
+
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+
+    def feed(self, data: bytes) -> List[Message]:
+        buffer = self._buffer
+        buffer += data
+        messages = []
+        view = memoryview(buffer)
+        pos = 0
+        try:
+            while pos < len(buffer):
+                end = pos + 1 + buffer[pos]
+                if end > len(buffer):
+                    break
+                messages.append(decode(view[pos + 1 : end]))
+                pos = end
+        finally:
+            view.release()
+            del buffer[:pos]
+        return messages
+
+
+def decode_all(data: bytes) -> List[Message]:
+    """Messages of a datagram, which always holds whole frames."""
+
+    return FrameDecoder().feed(data)
+
+
+class Publisher:
+    """Publishes a controller's phase starts, ticks and completion to a transport.
+
+    ``transport`` needs ``send(frame)``; the publisher sets its ``snapshot``
+    attribute to a callable returning the current state for new subscribers.
+    With ``keyframe_every`` set (for lossy transports) every n-th tick is
+    sent as a full STATE frame instead.
+    """
+
+    def __init__(self, controller: TimerController, schedule: TickSchedule, transport: object, keyframe_every: int = 0):
+        self.controller = controller
+        self.schedule = schedule
+        self.transport = transport
+        self.keyframe_every = keyframe_every
+        self.seq = 0
+        self._ticks = 0
+        self._sent_elapsed: Optional[int] = None
+        self._complete: Optional[bytes] = None
+
+    def attach(self) -> None:
+        """Publish before the callbacks already set on the controller run."""
+
+        controller = self.controller
+        controller.on_phase_start = _chain(self._phase_start, controller.on_phase_start)
+        controller.on_tick = _chain(self._tick, controller.on_tick)
+        controller.on_complete = _chain(self._finish, controller.on_complete)
+        self.transport.snapshot = self.snapshot  # type: ignore[attr-defined]
+
+    @property
+    def scale(self) -> float:
+        return TICK_MS / self.schedule.interval
+
+    def _next_seq(self) -> int:
+        self.seq = (self.seq + 1) & 0xFFFFFFFF
+        return self.seq
+
+    def _state(self, elapsed_ms: int, seq: int) -> Optional[bytes]:
+        controller = self.controller
+        phase = controller.current_phase()
+        if phase is None:
+            return None
+        return encode_state(
+            StateMessage(
+                seq,
+                self.schedule.time_at(elapsed_ms),
+                self.scale,
+                controller.total_ms,
+                elapsed_ms,
+                controller.phase_start_ms,
+                phase,
+                controller.current_index,
+                len(controller.sequence),
+                controller.running,
+                False,
+            )
+        )
+
+    def snapshot(self) -> Optional[bytes]:
+        if self._complete is not None:
+            return self._complete
+        # Numbered like the last frame sent, so other subscribers see no gap.
+        return self._state(self.controller.elapsed_ms, self.seq)
+
+    def _phase_start(self, phase: Phase) -> None:
+        self._complete = None
+        start = self.controller.phase_start_ms
+        frame = self._state(start, self._next_seq())
+        if frame is not None:
+            self._sent_elapsed = start
+            self._ticks = 0
+            self.transport.send(frame)  # type: ignore[attr-defined]
+
+    def _tick(self, phase: Phase, remaining_ms: int, elapsed_ms: int) -> None:
+        # The tick reported right after a phase start repeats its STATE frame.
+        if elapsed_ms == self._sent_elapsed:
+            return
+        self._sent_elapsed = elapsed_ms
+        self._ticks += 1
+        if self.keyframe_every and self._ticks % self.keyframe_every == 0:
+            frame = self._state(elapsed_ms, self._next_seq())
+        else:
+            index = self.controller.current_index
+            frame = encode_tick(self._next_seq(), self.schedule.time_at(elapsed_ms), elapsed_ms, index)
+        if frame is not None:
+            self.transport.send(frame)  # type: ignore[attr-defined]
+
+    def _finish(self) -> None:
+        elapsed = self.controller.elapsed_ms
+        self._complete = encode_complete(self._next_seq(), self.schedule.time_at(elapsed), elapsed)
+        self.transport.send(self._complete)  # type: ignore[attr-defined]
+
+
+def _chain(first: Callable, then: Optional[Callable]) -> Callable:
+    if then is None:
+        return first
+
+    def chained(*args: object) -> None:
+        first(*args)
+        then(*args)
+
+    return chained
+
+
+class MirrorState:
+    """A subscriber's copy of the published timer, extrapolated between frames.
+
+    The publisher's clock is mapped onto the local one through the smallest
+    ``received - at`` of the last ``window`` frames, which is the clock
+    offset plus the fastest delivery seen. Extrapolation stops one tick past
+    the last frame and at the end of the phase, so a stalled publisher
+    freezes the display rather than letting it run ahead.
+    """
+
+    def __init__(self, window: int = 32):
+        self.phase: Optional[Phase] = None
+        self.index = -1
+        self.count = 0
+        self.total_ms = 0
+        self.scale = float(TICK_MS)
+        self.at = 0.0
+        self.elapsed_ms = 0
+        self.phase_start_ms = 0
+        self.running = False
+        self.complete = False
+        # False while ticks refer to a phase whose STATE frame was lost.
+        self.synced = False
+        self.seq: Optional[int] = None
+        self.lost = 0
+        self._offsets: Deque[float] = deque(maxlen=window)
+
+    @property
+    def offset(self) -> float:
+        return min(self._offsets) if self._offsets else 0.0
+
+    def apply(self, message: Message, received_at: float) -> bool:
+        """Fold one message in; ``False`` for a stale or duplicate one."""
+
+        if self.seq is not None:
+            ahead = (message.seq - self.seq) & 0xFFFFFFFF
+            if not ahead or ahead >= 0x80000000:
+                return False
+            self.lost += ahead - 1
+        self.seq = message.seq
+        self._offsets.append(received_at - message.at)
+        self.at = message.at
+        self.elapsed_ms = message.elapsed_ms
+        if isinstance(message, StateMessage):
+            self.phase = message.phase
+            self.index = message.index
+            self.count = message.count
+            self.total_ms = message.total_ms
+            self.scale = message.scale
+            self.phase_start_ms = message.phase_start_ms
+            self.running = message.running
+            self.complete = message.complete
+            self.synced = True
+        elif isinstance(message, TickMessage):
+            if message.index != self.index:
+                self.synced = False
+        else:
+            self.running = False
+            self.complete = True
+        return True
+
+    def elapsed_at(self, now: float) -> int:
+        """Elapsed timer milliseconds at local time ``now``."""
+
+        if not self.running or not self.synced or self.phase is None:
+            return self.elapsed_ms
+        ahead = (now - self.offset - self.at) * self.scale
+        ahead = min(max(0.0, ahead), TICK_MS)
+        return min(self.elapsed_ms + int(ahead), self.phase_start_ms + self.phase.duration)
+
+    def remaining_at(self, now: float) -> int:
+        if self.phase is None or self.complete:
+            return 0
+        return max(0, self.phase_start_ms + self.phase.duration - self.elapsed_at(now))
@@ -3,75 +3,146 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Callable, List, Optional
+from typing import Callable, Iterable, Optional, Sequence
 
-from .menu import TrainingMenu
-from .sequence import Phase, build_sequence, total_duration
+from .menu import MS_PER_SECOND, TrainingMenu, ceil_seconds
+from .sequence import Phase, build_sequence, compact_sequence, locate, phase_offsets, total_duration
 
+# (phase, remaining ms, elapsed ms)
 TickCallback = Callable[[Phase, int, int], None]
 EventCallback = Callable[[Phase], None]
 
+# What one tick of the drivers (one second of the schedule) advances the timer by.
+TICK_MS = MS_PER_SECOND
+
 
 @dataclass
 class TimerController:
+    """Runs a phase sequence on a millisecond time base.
+
+    ``tick(ms)`` may cross any number of phase boundaries; the overflow is
+    carried into the next phase, so elapsed time stays exact whatever the
+    tick size. Every phase crossed gets ``on_phase_start``, but ``on_tick``
+    fires once per tick, for the phase it lands in. ``remaining``,
+    ``elapsed_seconds`` and ``total_seconds`` are whole-second views for
+    display.
+    """
+
     on_phase_start: Optional[EventCallback] = None
     on_tick: Optional[TickCallback] = None
     on_complete: Optional[Callable[[], None]] = None
 
-    sequence: List[Phase] = field(default_factory=list)
-    total_seconds: int = 0
-    elapsed_seconds: int = 0
+    sequence: Sequence[Phase] = field(default_factory=list)
+    total_ms: int = 0
+    elapsed_ms: int = 0
     current_index: int = 0
-    remaining: int = 0
+    remaining_ms: int = 0
     running: bool = False
+    _offsets: Optional[Sequence[int]] = field(default=None, init=False, repr=False, compare=False)
 
     def load_menu(self, menu: TrainingMenu) -> None:
-        self.sequence = build_sequence(menu)
-        self.total_seconds = total_duration(self.sequence)
-        self.elapsed_seconds = 0
+        self.load_sequence(build_sequence(menu))
+
+    def load_sequence(self, phases: Iterable[Phase]) -> None:
+        """Load any phase list; it is stored in a compact read-only form."""
+
+        self.sequence = compact_sequence(phases)
+        self.total_ms = total_duration(self.sequence)
+        self.elapsed_ms = 0
         self.current_index = 0
-        self.remaining = self.sequence[0].duration if self.sequence else 0
+        self.remaining_ms = self.sequence[0].duration if self.sequence else 0
         self.running = False
+        self._offsets = None
 
     def start(self) -> None:
         if not self.sequence:
             raise ValueError("シーケンスが設定されていません。")
-        self.elapsed_seconds = 0
+        self.elapsed_ms = 0
         self.current_index = 0
-        self.remaining = self.sequence[0].duration
+        self.remaining_ms = self.sequence[0].duration
         self.running = True
         self._emit_phase_start()
 
+    def start_at(self, elapsed_ms: int) -> None:
+        """Start mid-workout, firing a single phase start for the phase landed in."""
+
+        self.seek(elapsed_ms)
+        if not self.running:
+            self.running = True
+            self._emit_phase_start()
+
+    def seek(self, elapsed_ms: int) -> None:
+        if not self.sequence:
+            raise ValueError("シーケンスが設定されていません。")
+        offsets = self._phase_offsets()
+        total = offsets[-1] + self.sequence[-1].duration
+        if not 0 <= elapsed_ms < total:
+            raise ValueError("経過時間は 0 以上、総時間未満で指定してください。")
+        self.current_index, self.remaining_ms = locate(self.sequence, offsets, elapsed_ms)
+        self.elapsed_ms = elapsed_ms
+        if self.running:
+            self._emit_phase_start()
+
     def stop(self) -> None:
         self.running = False
-        self.elapsed_seconds = 0
-        self.remaining = 0
+        self.elapsed_ms = 0
+        self.remaining_ms = 0
         self.current_index = 0
 
-    def tick(self, seconds: int = 1) -> None:
+    def tick(self, ms: int = TICK_MS) -> None:
         if not self.running:
             return
-        self.remaining -= seconds
-        self.elapsed_seconds += seconds
-        if self.remaining <= 0:
+        self.remaining_ms -= ms
+        self.elapsed_ms += ms
+        # A tick may cross several phases (merged ticks, sub-second phases); carry the overflow.
+        while self.remaining_ms <= 0:
+            overflow = -self.remaining_ms
             self.current_index += 1
             if self.current_index >= len(self.sequence):
                 self.running = False
+                self.elapsed_ms -= overflow
+                self.remaining_ms = 0
                 if self.on_complete:
                     self.on_complete()
                 return
-            self.remaining = self.sequence[self.current_index].duration
-            self._emit_phase_start()
+            self.remaining_ms = self.sequence[self.current_index].duration - overflow
+            self._emit_phase_start(tick=False)
         if self.on_tick:
-            self.on_tick(self.sequence[self.current_index], self.remaining, self.elapsed_seconds)
+            self.on_tick(self.sequence[self.current_index], self.remaining_ms, self.elapsed_ms)
+
+    @property
+    def total_seconds(self) -> int:
+        return ceil_seconds(self.total_ms)
+
+    @property
+    def elapsed_seconds(self) -> int:
+        return self.elapsed_ms // MS_PER_SECOND
+
+    @property
+    def remaining(self) -> int:
+        return ceil_seconds(self.remaining_ms)
+
+    @property
+    def phase_start_ms(self) -> int:
+        """Elapsed time at which the current phase began; earlier than ``elapsed_ms`` when it started between ticks."""
+
+        phase = self.current_phase()
+        if phase is None:
+            return self.elapsed_ms
+        return self.elapsed_ms - (phase.duration - self.remaining_ms)
 
     def current_phase(self) -> Optional[Phase]:
         if not self.sequence or self.current_index >= len(self.sequence):
             return None
         return self.sequence[self.current_index]
 
-    def _emit_phase_start(self) -> None:
+    def _phase_offsets(self) -> Sequence[int]:
+        if self._offsets is None or len(self._offsets) != len(self.sequence):
+            self._offsets = phase_offsets(self.sequence)
+        return self._offsets
+
+    def _emit_phase_start(self, tick: bool = True) -> None:
         if self.on_phase_start and self.sequence:
             self.on_phase_start(self.sequence[self.current_index])
-        if self.on_tick:
-            self.on_tick(self.sequence[self.current_index], self.remaining, self.elapsed_seconds)
+        if tick and self.on_tick:
+            self.on_tick(self.sequence[self.current_index], self.remaining_ms, self.elapsed_ms)
@@ -0,0 +1,168 @@
+﻿"""Single-threaded engine driving many timer sessions from one deadline heap."""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .controller import TICK_MS, TimerController
+from .scheduler import Clock, Sleep, TickSchedule
+
+# (deadline, session id, generation); entries whose generation is outdated are skipped.
+_HeapEntry = Tuple[float, int, int]
+
+
+@dataclass
+class _Session:
+    controller: TimerController
+    schedule: TickSchedule
+    generation: int = 0
+    paused: bool = False
+
+
+class TimerEngine:
+    """Owns many ``TimerController`` sessions and wakes only when one is due.
+
+    Adding or resuming a session pushes onto a heap keyed by its next
+    deadline (O(log n)). Removing or pausing only invalidates the heap
+    entry, which is discarded when it surfaces or during compaction.
+
+    ``resolution`` lets one wake-up serve every deadline falling within that
+    window, trading a few milliseconds of lateness for far fewer wake-ups
+    when sessions are spread across the second.
+    """
+
+    def __init__(
+        self,
+        interval: float = 1.0,
+        clock: Clock = time.monotonic,
+        sleep: Sleep = time.sleep,
+        resolution: float = 0.005,
+    ):
+        self.interval = interval
+        self.resolution = resolution
+        self.clock = clock
+        self.sleep = sleep
+        self._sessions: Dict[int, _Session] = {}
+        self._heap: List[_HeapEntry] = []
+        self._ids = itertools.count(1)
+        self._stale = 0
+        # The session run_pending is ticking; its entry is already off the heap.
+        self._ticking: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: int) -> bool:
+        return session_id in self._sessions
+
+    def add(self, controller: TimerController, now: Optional[float] = None) -> int:
+        """Register a controller and start it if it is not running yet."""
+
+        if not controller.running:
+            controller.start()
+        now = self.clock() if now is None else now
+        schedule = TickSchedule(interval=self.interval, clock=self.clock)
+        schedule.start(now)
+        session_id = next(self._ids)
+        session = _Session(controller, schedule)
+        self._sessions[session_id] = session
+        self._push(session_id, session)
+        return session_id
+
+    def remove(self, session_id: int) -> TimerController:
+        session = self._sessions.pop(session_id)
+        if not session.paused:
+            self._invalidate(session_id)
+        return session.controller
+
+    def pause(self, session_id: int, now: Optional[float] = None) -> None:
+        session = self._sessions[session_id]
+        if session.paused:
+            return
+        session.paused = True
+        session.generation += 1
+        session.schedule.pause(self.clock() if now is None else now)
+        self._invalidate(session_id)
+
+    def resume(self, session_id: int, now: Optional[float] = None) -> None:
+        session = self._sessions[session_id]
+        if not session.paused:
+            return
+        session.paused = False
+        session.schedule.resume(self.clock() if now is None else now)
+        self._push(session_id, session)
+
+    def controller(self, session_id: int) -> TimerController:
+        return self._sessions[session_id].controller
+
+    def next_deadline(self) -> Optional[float]:
+        heap = self._heap
+        while heap and not self._is_live(heap[0]):
+            heapq.heappop(heap)
+            self._stale -= 1
+        return heap[0][0] if heap else None
+
+    def run_pending(self, now: Optional[float] = None) -> int:
+        """Tick every session whose deadline has passed; return how many were ticked."""
+
+        now = self.clock() if now is None else now
+        heap = self._heap
+        ticked = 0
+        while heap and heap[0][0] <= now:
+            entry = heapq.heappop(heap)
+            if not self._is_live(entry):
+                self._stale -= 1
+                continue
+            session_id = entry[1]
+            session = self._sessions[session_id]
+            count = session.schedule.due(now)
+            if count:
+                self._ticking = session_id
+                try:
+                    session.controller.tick(count * TICK_MS)
+                finally:
+                    self._ticking = None
+                ticked += 1
+            if self._sessions.get(session_id) is not session or session.paused:
+                # A callback removed or paused the session; its entry is already off the heap.
+                continue
+            if session.controller.running:
+                self._push(session_id, session)
+            else:
+                self._sessions.pop(session_id, None)
+        return ticked
+
+    def run(self, until: Optional[Callable[[], bool]] = None) -> None:
+        """Sleep until the next deadline and tick, until no active session remains."""
+
+        while self._sessions:
+            if until is not None and until():
+                return
+            deadline = self.next_deadline()
+            if deadline is None:
+                return
+            delay = deadline - self.clock()
+            if delay > 0:
+                self.sleep(max(delay, self.resolution))
+            self.run_pending()
+
+    def _push(self, session_id: int, session: _Session) -> None:
+        heapq.heappush(self._heap, (session.schedule.next_deadline(), session_id, session.generation))
+
+    def _is_live(self, entry: _HeapEntry) -> bool:
+        session = self._sessions.get(entry[1])
+        return session is not None and not session.paused and session.generation == entry[2]
+
+    def _invalidate(self, session_id: int) -> None:
+        if session_id == self._ticking:
+            return
+        self._stale += 1
+        if self._stale > 64 and self._stale * 2 > len(self._heap):
+            # In place: run_pending may be iterating the heap when a callback lands here.
+            self._heap[:] = [entry for entry in self._heap if self._is_live(entry)]
+            heapq.heapify(self._heap)
+            self._stale = 0
@@ -1,58 +1,183 @@
-﻿"""Domain objects for training menus and duration parsing."""
+﻿"""Domain objects for training menus and duration parsing.
+
+Durations are whole milliseconds throughout the domain. ``menus.json``
+keeps its ``set_seconds``/``rest_seconds`` keys, written as integers when
+the value is a whole number of seconds so older readers still load it.
+"""
 
 from __future__ import annotations
 
+import re
 from dataclasses import dataclass
-from typing import Dict
+from functools import lru_cache
+from typing import Dict, Optional, Union
+
+MS_PER_SECOND = 1000
+# Durations must fit a signed 32-bit field (about 24 days), as in the binary snapshot.
+MAX_DURATION_MS = 2**31 - 1
+
+Seconds = Union[int, float]
 
 
-@dataclass
+@dataclass(init=False)
 class TrainingMenu:
+    """A circuit: ``sets`` rounds of ``set_ms`` work with ``rest_ms`` rest between them.
+
+    Positional durations are milliseconds. The ``set_seconds`` and
+    ``rest_seconds`` keywords (and attributes) of the seconds-based API are
+    still accepted and converted.
+    """
+
+    # No per-instance __dict__: large libraries keep one of these per menu.
+    __slots__ = ("name", "set_ms", "rest_ms", "sets")
+
     name: str
-    set_seconds: int
-    rest_seconds: int
+    set_ms: int
+    rest_ms: int
     sets: int
 
+    def __init__(
+        self,
+        name: str,
+        set_ms: Optional[int] = None,
+        rest_ms: Optional[int] = None,
+        sets: Optional[int] = None,
+        *,
+        set_seconds: Optional[Seconds] = None,
+        rest_seconds: Optional[Seconds] = None,
+    ) -> None:
+        # Loading a library builds one menu per record, so the millisecond path is checked first.
+        if set_ms is None or set_seconds is not None:
+            set_ms = _either_ms(set_ms, set_seconds, "set")
+        if rest_ms is None or rest_seconds is not None:
+            rest_ms = _either_ms(rest_ms, rest_seconds, "rest")
+        if sets is None:
+            raise TypeError("TrainingMenu() missing required argument: 'sets'")
+        self.name = name
+        self.set_ms = set_ms
+        self.rest_ms = rest_ms
+        self.sets = sets
+
+    @classmethod
+    def from_seconds(cls, name: str, set_seconds: Seconds, rest_seconds: Seconds, sets: int) -> "TrainingMenu":
+        return cls(name, seconds_to_ms(set_seconds), seconds_to_ms(rest_seconds), sets)
+
     @classmethod
     def from_dict(cls, data: Dict[str, object]) -> "TrainingMenu":
         return cls(
             name=str(data["name"]),
-            set_seconds=int(data["set_seconds"]),
-            rest_seconds=int(data["rest_seconds"]),
+            set_ms=_ms_field(data, "set"),
+            rest_ms=_ms_field(data, "rest"),
             sets=int(data["sets"]),
         )
 
-    def to_dict(self) -> Dict[str, int | str]:
+    def to_dict(self) -> Dict[str, Seconds | str]:
         return {
             "name": self.name,
-            "set_seconds": self.set_seconds,
-            "rest_seconds": self.rest_seconds,
+            "set_seconds": ms_to_seconds(self.set_ms),
+            "rest_seconds": ms_to_seconds(self.rest_ms),
             "sets": self.sets,
         }
 
+    @property
+    def set_seconds(self) -> Seconds:
+        return ms_to_seconds(self.set_ms)
+
+    @set_seconds.setter
+    def set_seconds(self, seconds: Seconds) -> None:
+        self.set_ms = seconds_to_ms(seconds)
+
+    @property
+    def rest_seconds(self) -> Seconds:
+        return ms_to_seconds(self.rest_ms)
+
+    @rest_seconds.setter
+    def rest_seconds(self, seconds: Seconds) -> None:
+        self.rest_ms = seconds_to_ms(seconds)
+
+
+def _either_ms(ms: Optional[int], seconds: Optional[Seconds], prefix: str) -> int:
+    if (ms is None) == (seconds is None):
+        raise TypeError(f"TrainingMenu() takes exactly one of '{prefix}_ms' and '{prefix}_seconds'")
+    return seconds_to_ms(seconds) if ms is None else ms  # type: ignore[arg-type]
+
+
+def _ms_field(data: Dict[str, object], prefix: str) -> int:
+    value = data.get(f"{prefix}_ms")
+    if value is not None:
+        return int(value)  # type: ignore[arg-type]
+    return seconds_to_ms(data[f"{prefix}_seconds"])  # type: ignore[arg-type]
+
+
+def seconds_to_ms(seconds: Union[Seconds, str]) -> int:
+    if isinstance(seconds, int):
+        return seconds * MS_PER_SECOND
+    return round(float(seconds) * MS_PER_SECOND)
+
+
+def ms_to_seconds(ms: int) -> Seconds:
+    """Seconds as an ``int`` when whole, else a ``float`` with millisecond precision."""
+
+    seconds, rest = divmod(ms, MS_PER_SECOND)
+    return seconds if not rest else ms / MS_PER_SECOND
+
+
+def ceil_seconds(ms: int) -> int:
+    """Whole seconds left on a countdown: 44.2 s still reads as 45."""
+
+    return -(-ms // MS_PER_SECOND)
+
 
 def format_time(seconds: int) -> str:
     minutes, secs = divmod(max(0, int(seconds)), 60)
     return f"{minutes:02d}:{secs:02d}"
 
 
-def parse_duration(value: str) -> int:
+def format_duration(ms: int) -> str:
+    """``mm:ss``, with the fraction of a second appended when there is one (``00:07.5``)."""
+
+    seconds, rest = divmod(max(0, ms), MS_PER_SECOND)
+    if not rest:
+        return format_time(seconds)
+    return f"{format_time(seconds)}.{rest:03d}".rstrip("0")
+
+
+_UNIT_MS = {"h": 3_600_000, "m": 60_000, "s": 1000, "ms": 1, "": 1000}
+# A number needs a digit on one side of the point: 5, 5., .5 and 5.5 all count.
+_TERM = r"(?=\.?\d)(\d*)(?:\.(\d*))?\s*(ms|h|m|s)?"
+_DURATION = re.compile(rf"(?:{_TERM}\s*)+")
+_TERMS = re.compile(_TERM)
+
+
+@lru_cache(maxsize=4096)
+def parse_duration_ms(value: str) -> int:
+    """Parse ``45``, ``45s``, ``7.5s``, ``1.5m``, ``1m30s``, ``90.25s`` or ``250ms`` into milliseconds.
+
+    A bare number is seconds. Terms are added up, so ``1h 2m 3.5s`` works,
+    but each unit may appear once; fractions (``.5m`` too) are exact to the
+    millisecond and rounded half up below that.
+    """
+
     raw = value.strip().lower()
     if not raw:
         raise ValueError("値を入力してください。")
-
-    def _to_seconds(number: float) -> int:
-        seconds = int(number)
-        if seconds <= 0:
-            raise ValueError
-        return seconds
-
-    try:
-        if raw.endswith("m"):
-            minutes = float(raw[:-1])
-            return _to_seconds(minutes * 60)
-        if raw.endswith("s"):
-            return _to_seconds(float(raw[:-1]))
-        return _to_seconds(float(raw))
-    except ValueError as exc:
-        raise ValueError("数値または 30s / 0.5m 形式で入力してください。") from exc
+    if _DURATION.fullmatch(raw) is None:
+        raise ValueError("数値または 30s / 1m30s / 7.5s 形式で入力してください。")
+    total = 0
+    seen = set()
+    terms = _TERMS.findall(raw)
+    for index, (whole, fraction, unit) in enumerate(terms):
+        if not unit and index != len(terms) - 1:
+            raise ValueError("単位のない数値は最後にだけ書けます (例: 1m30)。")
+        if (unit or "s") in seen:
+            raise ValueError("同じ単位は 1 回だけ書けます (例: 1m30s)。")
+        seen.add(unit or "s")
+        scale = 10 ** len(fraction)
+        numerator = (int(whole or 0) * scale + int(fraction or 0)) * _UNIT_MS[unit]
+        ms, remainder = divmod(numerator, scale)
+        total += ms + (2 * remainder >= scale)
+    if total <= 0:
+        raise ValueError("0 より大きい時間を入力してください。")
+    if total > MAX_DURATION_MS:
+        raise ValueError("時間が長すぎます。")
+    return total
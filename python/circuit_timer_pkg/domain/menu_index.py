@@ -0,0 +1,118 @@
+﻿"""A small query language over training menus and a lazy matcher for it."""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .menu import TrainingMenu, parse_duration_ms
+from .sequence import build_sequence, total_duration
+
+# Durations are compared in milliseconds.
+_FIELD_ALIASES = {
+    "set": "set_ms",
+    "set_seconds": "set_ms",
+    "work": "set_ms",
+    "rest": "rest_ms",
+    "rest_seconds": "rest_ms",
+    "sets": "sets",
+    "total": "total",
+}
+_MENU_VALUES: Dict[str, Callable[[TrainingMenu], int]] = {
+    "set_ms": lambda menu: menu.set_ms,
+    "rest_ms": lambda menu: menu.rest_ms,
+    "sets": lambda menu: menu.sets,
+    "total": lambda menu: total_duration(build_sequence(menu)),
+}
+_TOKEN = re.compile(r"^(?P<field>[a-z_]+)(?P<op><=|>=|<|>|=|:)(?P<value>.+)$")
+
+Bounds = Tuple[Optional[int], Optional[int]]
+
+
+@dataclass
+class MenuQuery:
+    """Inclusive integer bounds per field plus name constraints (all case-insensitive)."""
+
+    ranges: Dict[str, Bounds] = field(default_factory=dict)
+    name_prefix: str = ""
+    name_contains: List[str] = field(default_factory=list)
+
+    def narrow(self, name: str, low: Optional[int], high: Optional[int]) -> None:
+        cur_low, cur_high = self.ranges.get(name, (None, None))
+        if low is not None and (cur_low is None or low > cur_low):
+            cur_low = low
+        if high is not None and (cur_high is None or high < cur_high):
+            cur_high = high
+        self.ranges[name] = (cur_low, cur_high)
+
+
+def parse_query(text: str) -> MenuQuery:
+    """Parse e.g. ``"total<20m sets>=5 name:hiit"``.
+
+    ``name:abc`` matches a substring, ``name:abc*`` a prefix, and a bare word
+    is a substring. Durations accept the same forms as ``parse_duration_ms``.
+    """
+
+    query = MenuQuery()
+    for token in text.split():
+        match = _TOKEN.match(token.lower())
+        if not match:
+            query.name_contains.append(token.casefold())
+            continue
+        key, op, raw = match.group("field"), match.group("op"), match.group("value")
+        if key == "name":
+            if op != ":" and op != "=":
+                raise ValueError(f"name には ':' を使ってください: {token}")
+            if raw.endswith("*"):
+                query.name_prefix = raw[:-1].casefold()
+            else:
+                query.name_contains.append(raw.casefold())
+            continue
+        field_name = _FIELD_ALIASES.get(key)
+        if field_name is None:
+            raise ValueError(f"不明な項目です: {key}")
+        try:
+            value = int(raw) if field_name == "sets" else _duration_ms(raw)
+        except ValueError as exc:
+            raise ValueError(f"値を解釈できません: {token}") from exc
+        if op in ("=", ":"):
+            query.narrow(field_name, value, value)
+        elif op == "<":
+            query.narrow(field_name, None, value - 1)
+        elif op == "<=":
+            query.narrow(field_name, None, value)
+        elif op == ">":
+            query.narrow(field_name, value + 1, None)
+        else:
+            query.narrow(field_name, value, None)
+    return query
+
+
+def _duration_ms(raw: str) -> int:
+    # parse_duration_ms rejects zero, but "rest=0" is a meaningful filter.
+    return 0 if raw.isdigit() and not int(raw) else parse_duration_ms(raw)
+
+
+def scan(menus: Iterable[TrainingMenu], query: MenuQuery | str) -> Iterator[TrainingMenu]:
+    """Match menus in library order.
+
+    Matches are produced lazily, so a page of hits stops the pass early;
+    a query costs one pass over the library at most.
+    """
+
+    if isinstance(query, str):
+        query = parse_query(query)
+    prefix, needles = query.name_prefix, query.name_contains
+    bounds = [(_MENU_VALUES[name], low, high) for name, (low, high) in query.ranges.items()]
+    for menu in menus:
+        if prefix or needles:
+            name = menu.name.casefold()
+            if not name.startswith(prefix) or any(needle not in name for needle in needles):
+                continue
+        for value_of, low, high in bounds:
+            value = value_of(menu)
+            if (low is not None and value < low) or (high is not None and value > high):
+                break
+        else:
+            yield menu
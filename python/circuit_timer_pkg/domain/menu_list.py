@@ -0,0 +1,115 @@
+﻿"""Sorted, prefix-filterable list model for menu names."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Iterable, List, Optional, Tuple
+
+# Sorts after every real character, closing the bisect range of a prefix.
+_PREFIX_END = "\U0010ffff"
+
+_Key = Tuple[str, str]
+
+
+def _key(name: str) -> _Key:
+    return (name.casefold(), name)
+
+
+class MenuListModel:
+    """Menu names kept sorted so a row is found in O(log n).
+
+    Inserting or removing a row is a binary search plus an O(n) shift of
+    the list, which is a ``memmove`` of pointers, not a Python-level loop.
+    The sorted keys double as the prefix index: a filter selects the
+    contiguous range ``[bisect(prefix), bisect(prefix + U+10FFFF))``, so
+    each keystroke is two binary searches rather than a scan. Rows are
+    numbered within the current filter.
+    """
+
+    def __init__(self, names: Iterable[str] = ()):
+        self._keys: List[_Key] = []
+        self._prefix = ""
+        self._lo = 0
+        self._hi = 0
+        self.reset(names)
+
+    def reset(self, names: Iterable[str]) -> None:
+        self._keys = sorted(_key(name) for name in names)
+        self._update_range()
+
+    @property
+    def prefix(self) -> str:
+        return self._prefix
+
+    def set_filter(self, prefix: str) -> None:
+        self._prefix = prefix.casefold()
+        self._update_range()
+
+    def matches(self, name: str) -> bool:
+        return name.casefold().startswith(self._prefix)
+
+    def __len__(self) -> int:
+        return self._hi - self._lo
+
+    def __getitem__(self, row: int) -> str:
+        if not 0 <= row < len(self):
+            raise IndexError("row out of range")
+        return self._keys[self._lo + row][1]
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and self._position(name) is not None
+
+    def window(self, start: int, count: int) -> List[str]:
+        start = max(0, start)
+        lo = self._lo + start
+        hi = min(self._hi, lo + count)
+        return [key[1] for key in self._keys[lo:hi]]
+
+    def index(self, name: str) -> Optional[int]:
+        """Row of ``name`` within the current filter, or ``None`` if hidden or absent."""
+
+        pos = self._position(name)
+        if pos is None or not self._lo <= pos < self._hi:
+            return None
+        return pos - self._lo
+
+    def insert(self, name: str) -> Optional[int]:
+        key = _key(name)
+        pos = bisect_left(self._keys, key)
+        if pos < len(self._keys) and self._keys[pos] == key:
+            return self.index(name)
+        self._keys.insert(pos, key)
+        if self.matches(name):
+            self._hi += 1
+            return pos - self._lo
+        if key < (self._prefix,):
+            self._lo += 1
+            self._hi += 1
+        return None
+
+    def remove(self, name: str) -> Optional[int]:
+        pos = self._position(name)
+        if pos is None:
+            return None
+        row = pos - self._lo if self._lo <= pos < self._hi else None
+        del self._keys[pos]
+        if pos < self._lo:
+            self._lo -= 1
+            self._hi -= 1
+        elif row is not None:
+            self._hi -= 1
+        return row
+
+    def _position(self, name: str) -> Optional[int]:
+        key = _key(name)
+        pos = bisect_left(self._keys, key)
+        if pos < len(self._keys) and self._keys[pos] == key:
+            return pos
+        return None
+
+    def _update_range(self) -> None:
+        if not self._prefix:
+            self._lo, self._hi = 0, len(self._keys)
+            return
+        self._lo = bisect_left(self._keys, (self._prefix,))
+        self._hi = bisect_left(self._keys, (self._prefix + _PREFIX_END,))
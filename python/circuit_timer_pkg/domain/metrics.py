@@ -0,0 +1,231 @@
+﻿"""Opt-in latency and jitter metrics for TimerController."""
+
+from __future__ import annotations
+
+import os
+import time
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .controller import TICK_MS, TimerController
+
+Clock = Callable[[], float]
+
+# Upper bounds in seconds, Prometheus style; an implicit +Inf bucket follows.
+LATENCY_BUCKETS: Tuple[float, ...] = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+JITTER_BUCKETS: Tuple[float, ...] = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0)
+CALLBACKS = ("on_phase_start", "on_tick", "on_complete")
+# Controller methods replaced while instrumentation is attached.
+_WRAPPED_METHODS = ("tick", "_emit_phase_start", "start", "start_at", "stop")
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "count", "total", "max")
+
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        running = 0
+        rows = []
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            running += count
+            rows.append(("+Inf" if bound == float("inf") else repr(bound), running))
+        return rows
+
+    def snapshot(self) -> Dict[str, object]:
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "max": self.max,
+            "mean": self.total / self.count if self.count else 0.0,
+            "buckets": dict(self.cumulative()),
+        }
+
+
+@dataclass
+class TimerMetrics:
+    """Counters and histograms filled in by :class:`ControllerInstrumentation`."""
+
+    ticks: int = 0
+    merged_ticks: int = 0
+    missed_ticks: int = 0
+    phase_starts: int = 0
+    tick_seconds: Histogram = field(default_factory=Histogram)
+    phase_start_seconds: Histogram = field(default_factory=Histogram)
+    tick_jitter_seconds: Histogram = field(default_factory=lambda: Histogram(JITTER_BUCKETS))
+    callback_seconds: Dict[str, Histogram] = field(
+        default_factory=lambda: {name: Histogram() for name in CALLBACKS}
+    )
+
+    def snapshot(self) -> Dict[str, object]:
+        return {
+            "ticks": self.ticks,
+            "merged_ticks": self.merged_ticks,
+            "missed_ticks": self.missed_ticks,
+            "phase_starts": self.phase_starts,
+            "tick_seconds": self.tick_seconds.snapshot(),
+            "phase_start_seconds": self.phase_start_seconds.snapshot(),
+            "tick_jitter_seconds": self.tick_jitter_seconds.snapshot(),
+            "callback_seconds": {name: hist.snapshot() for name, hist in self.callback_seconds.items()},
+        }
+
+    def to_prometheus(self, prefix: str = "circuit_timer") -> str:
+        lines: List[str] = []
+        for name, help_text, value in (
+            ("ticks_total", "Controller tick calls.", self.ticks),
+            ("merged_ticks_total", "Seconds folded into a single tick call.", self.merged_ticks),
+            ("missed_ticks_total", "Tick intervals that elapsed without being delivered.", self.missed_ticks),
+            ("phase_starts_total", "Phase start events emitted.", self.phase_starts),
+        ):
+            lines += [f"# HELP {prefix}_{name} {help_text}", f"# TYPE {prefix}_{name} counter", f"{prefix}_{name} {value}"]
+        for name, help_text, hists in (
+            ("tick_seconds", "Time spent inside TimerController.tick.", {"": self.tick_seconds}),
+            ("phase_start_seconds", "Time spent emitting a phase start.", {"": self.phase_start_seconds}),
+            ("tick_jitter_seconds", "Deviation of the tick interval from its nominal length.", {"": self.tick_jitter_seconds}),
+            ("callback_seconds", "Time spent in user callbacks.", self.callback_seconds),
+        ):
+            metric = f"{prefix}_{name}"
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+            for callback, hist in hists.items():
+                label = f'callback="{callback}",' if callback else ""
+                for bound, count in hist.cumulative():
+                    lines.append(f'{metric}_bucket{{{label}le="{bound}"}} {count}')
+                suffix = f"{{{label.rstrip(',')}}}" if label else ""
+                lines.append(f"{metric}_sum{suffix} {hist.total!r}")
+                lines.append(f"{metric}_count{suffix} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: Path) -> None:
+        """Write the text exposition format atomically (for node_exporter's textfile collector)."""
+
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(self.to_prometheus(), encoding="utf-8")
+        os.replace(tmp, path)
+
+
+class ControllerInstrumentation:
+    """Times a controller's tick, phase starts and callbacks while enabled.
+
+    Enabling shadows the controller's methods and callbacks with timed
+    wrappers on the instance; disabling removes them again, so a disabled
+    controller runs exactly the uninstrumented code. Callbacks assigned
+    while enabled are not timed until the next enable.
+    """
+
+    def __init__(
+        self,
+        controller: TimerController,
+        metrics: Optional[TimerMetrics] = None,
+        interval: float = 1.0,
+        clock: Clock = time.perf_counter,
+    ):
+        self.controller = controller
+        self.metrics = metrics or TimerMetrics()
+        self.interval = interval
+        self.clock = clock
+        self._last_tick: Optional[float] = None
+        self._originals: Dict[str, Callable] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._originals)
+
+    def set_enabled(self, enabled: bool) -> None:
+        if enabled:
+            self.enable()
+        else:
+            self.disable()
+
+    def enable(self) -> None:
+        if self.enabled:
+            return
+        controller = self.controller
+        self._last_tick = None
+        for name in CALLBACKS:
+            callback = getattr(controller, name)
+            self._originals[name] = callback
+            if callback is not None:
+                setattr(controller, name, self._timed(callback, self.metrics.callback_seconds[name]))
+        for name in _WRAPPED_METHODS:
+            self._originals[name] = getattr(controller, name)
+        controller.tick = self._tick  # type: ignore[method-assign]
+        controller._emit_phase_start = self._emit_phase_start  # type: ignore[method-assign]
+        controller.start = self._resetting(self._originals["start"])  # type: ignore[method-assign]
+        controller.start_at = self._resetting(self._originals["start_at"])  # type: ignore[method-assign]
+        controller.stop = self._resetting(self._originals["stop"])  # type: ignore[method-assign]
+
+    def disable(self) -> None:
+        if not self.enabled:
+            return
+        controller = self.controller
+        for name in _WRAPPED_METHODS:
+            vars(controller).pop(name, None)
+        for name in CALLBACKS:
+            current = getattr(controller, name)
+            # Leave callbacks that were replaced while instrumented alone.
+            if getattr(current, "__wrapped__", None) is self._originals[name]:
+                setattr(controller, name, self._originals[name])
+        self._originals.clear()
+
+    def _timed(self, func: Callable, histogram: Histogram) -> Callable:
+        clock = self.clock
+
+        def wrapper(*args: object) -> object:
+            start = clock()
+            try:
+                return func(*args)
+            finally:
+                histogram.observe(clock() - start)
+
+        wrapper.__wrapped__ = func  # type: ignore[attr-defined]
+        return wrapper
+
+    def _resetting(self, func: Callable) -> Callable:
+        def wrapper(*args: object) -> object:
+            self._last_tick = self.clock()
+            return func(*args)
+
+        return wrapper
+
+    def _tick(self, ms: int = TICK_MS) -> None:
+        metrics = self.metrics
+        start = self.clock()
+        # Ticks of the schedule folded into this call; one schedule tick is TICK_MS.
+        count = max(1, ms // TICK_MS)
+        if self._last_tick is not None and self.controller.running:
+            actual = start - self._last_tick
+            expected = count * self.interval
+            metrics.tick_jitter_seconds.observe(abs(actual - expected))
+            delivered = int((actual + self.interval / 2) // self.interval)
+            if delivered > count:
+                metrics.missed_ticks += delivered - count
+        self._last_tick = start
+        metrics.ticks += 1
+        if count > 1:
+            metrics.merged_ticks += count - 1
+        try:
+            self._originals["tick"](ms)
+        finally:
+            metrics.tick_seconds.observe(self.clock() - start)
+
+    def _emit_phase_start(self, tick: bool = True) -> None:
+        start = self.clock()
+        try:
+            self._originals["_emit_phase_start"](tick)
+        finally:
+            self.metrics.phase_starts += 1
+            self.metrics.phase_start_seconds.observe(self.clock() - start)
@@ -0,0 +1,152 @@
+﻿"""Closed-form planning statistics over columns of menus, vectorised with NumPy when available."""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from itertools import accumulate
+from typing import Any, Iterable, List, Optional, Sequence
+
+from .menu import TrainingMenu
+
+try:  # NumPy is optional; every function has a pure-Python path.
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None  # type: ignore[assignment]
+
+# A NumPy int64 array, or a plain list when NumPy is unavailable or disabled.
+Column = Any
+
+
+def _use_numpy(use_numpy: Optional[bool]) -> bool:
+    if use_numpy and np is None:
+        raise RuntimeError("NumPy がインストールされていません。")
+    return np is not None if use_numpy is None else use_numpy
+
+
+@dataclass
+class MenuColumns:
+    """``set_ms``, ``rest_ms`` and ``sets`` of many menus, one column each."""
+
+    set_ms: Column
+    rest_ms: Column
+    sets: Column
+
+    @classmethod
+    def from_menus(cls, menus: Iterable[TrainingMenu], use_numpy: Optional[bool] = None) -> "MenuColumns":
+        menus = list(menus)
+        return cls.from_columns(
+            [menu.set_ms for menu in menus],
+            [menu.rest_ms for menu in menus],
+            [menu.sets for menu in menus],
+            use_numpy,
+        )
+
+    @classmethod
+    def from_columns(
+        cls,
+        set_ms: Sequence[int],
+        rest_ms: Sequence[int],
+        sets: Sequence[int],
+        use_numpy: Optional[bool] = None,
+    ) -> "MenuColumns":
+        if not len(set_ms) == len(rest_ms) == len(sets):
+            raise ValueError("列の長さが一致しません。")
+        if _use_numpy(use_numpy):
+            return cls(*(np.asarray(column, dtype=np.int64) for column in (set_ms, rest_ms, sets)))
+        return cls(list(set_ms), list(rest_ms), list(sets))
+
+    @property
+    def vectorized(self) -> bool:
+        return np is not None and isinstance(self.sets, np.ndarray)
+
+    def __len__(self) -> int:
+        return len(self.sets)
+
+
+@dataclass
+class PlanStats:
+    """Per-menu results matching ``build_sequence``/``total_duration`` exactly.
+
+    Durations are milliseconds; ``work_rest_ratio`` is ``inf`` for menus without rest.
+    """
+
+    total_ms: Column
+    work_ms: Column
+    rest_ms: Column
+    phases: Column
+    work_rest_ratio: Column
+
+    def __len__(self) -> int:
+        return len(self.total_ms)
+
+
+def total_ms(columns: MenuColumns) -> Column:
+    """Only the total durations; a single pass, for slot queries that need nothing else."""
+
+    if columns.vectorized:
+        sets = np.maximum(columns.sets, 0)
+        rests = np.where(columns.rest_ms > 0, np.maximum(sets - 1, 0), 0)
+        return sets * columns.set_ms + rests * columns.rest_ms
+    return [
+        count * work + (count - 1) * rest if count > 0 and rest > 0 else max(0, count) * work
+        for work, rest, count in zip(columns.set_ms, columns.rest_ms, columns.sets)
+    ]
+
+
+def plan_stats(columns: MenuColumns) -> PlanStats:
+    if columns.vectorized:
+        sets = np.maximum(columns.sets, 0)
+        has_rest = columns.rest_ms > 0
+        # The rest after the final set is dropped, as in PhaseTimeline.
+        rests = np.where(has_rest, np.maximum(sets - 1, 0), 0)
+        work = sets * columns.set_ms
+        rest = rests * columns.rest_ms
+        phases = sets + rests
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = np.where(rest > 0, work / np.where(rest > 0, rest, 1), np.inf)
+        return PlanStats(work + rest, work, rest, phases, ratio)
+
+    sets = [max(0, count) for count in columns.sets]
+    rests = [count - 1 if count and rest > 0 else 0 for count, rest in zip(sets, columns.rest_ms)]
+    work = [count * ms for count, ms in zip(sets, columns.set_ms)]
+    rest = [count * ms for count, ms in zip(rests, columns.rest_ms)]
+    return PlanStats(
+        [a + b for a, b in zip(work, rest)],
+        work,
+        rest,
+        [a + b for a, b in zip(sets, rests)],
+        [a / b if b > 0 else float("inf") for a, b in zip(work, rest)],
+    )
+
+
+def fits_in_slot(totals: Column, slot_ms: int) -> List[int]:
+    """Indices of the menus whose total duration is at most ``slot_ms`` milliseconds."""
+
+    if np is not None and isinstance(totals, np.ndarray):
+        return np.flatnonzero(totals <= slot_ms).tolist()
+    return [index for index, total in enumerate(totals) if total <= slot_ms]
+
+
+def end_times(totals: Iterable[int], start: int = 0, gap: int = 0) -> Column:
+    """End time of each menu when run back to back, with ``gap`` milliseconds between them."""
+
+    if np is not None and isinstance(totals, np.ndarray):
+        return start + np.cumsum(totals + gap) - gap
+    return [start + end - gap for end in accumulate(total + gap for total in totals)]
+
+
+def count_pairs_within(totals: Column, slot_ms: int, gap: int = 0) -> int:
+    """Number of unordered pairs of distinct menus that fit one slot back to back."""
+
+    budget = slot_ms - gap
+    if np is not None and isinstance(totals, np.ndarray):
+        ordered = np.sort(totals)
+        partners = np.searchsorted(ordered, budget - ordered, side="right")
+        # Drop each menu paired with itself, then count every pair once.
+        pairs = int(partners.sum()) - int(np.count_nonzero(2 * ordered <= budget))
+        return pairs // 2
+    ordered = sorted(totals)
+    pairs = sum(bisect_right(ordered, budget - total) for total in ordered)
+    pairs -= sum(1 for total in ordered if 2 * total <= budget)
+    return pairs // 2
@@ -0,0 +1,144 @@
+﻿"""Deadline based tick scheduling anchored on a monotonic clock."""
+
+from __future__ import annotations
+
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from .controller import TICK_MS, TimerController
+
+Clock = Callable[[], float]
+Sleep = Callable[[float], None]
+
+# Guards against float rounding when "now" lands exactly on a deadline.
+_EPSILON = 1e-9
+
+
+@dataclass
+class DriftStats:
+    ticks: int = 0
+    merged: int = 0
+    total_lateness: float = 0.0
+    max_lateness: float = 0.0
+
+    def record(self, lateness: float, count: int) -> None:
+        lateness = max(0.0, lateness)
+        self.ticks += 1
+        if count > 1:
+            self.merged += count - 1
+        self.total_lateness += lateness
+        if lateness > self.max_lateness:
+            self.max_lateness = lateness
+
+    @property
+    def mean_lateness(self) -> float:
+        return self.total_lateness / self.ticks if self.ticks else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"ドリフト: 最大 {self.max_lateness * 1000:.1f} ms / "
+            f"平均 {self.mean_lateness * 1000:.1f} ms "
+            f"(tick {self.ticks} 回, まとめ処理 {self.merged} 回)"
+        )
+
+
+@dataclass
+class TickSchedule:
+    """Absolute deadlines ``anchor + n * interval`` so callback time never accumulates."""
+
+    interval: float = 1.0
+    clock: Clock = time.monotonic
+    anchor: float = 0.0
+    ticks_done: int = 0
+    stats: DriftStats = field(default_factory=DriftStats)
+    paused_at: Optional[float] = None
+    # Milliseconds of the current tick already elapsed at ``start``; the first tick covers only the rest.
+    lead_ms: int = 0
+
+    def start(self, now: Optional[float] = None, elapsed_ms: int = 0) -> None:
+        """Anchor the schedule; ``elapsed_ms`` for a timer started mid-workout with ``start_at``."""
+
+        now = self.clock() if now is None else now
+        self.anchor = now - elapsed_ms / TICK_MS * self.interval
+        self.ticks_done, self.lead_ms = divmod(elapsed_ms, TICK_MS)
+        self.stats = DriftStats()
+        self.paused_at = None
+
+    def pause(self, now: Optional[float] = None) -> None:
+        if self.paused_at is None:
+            self.paused_at = self.clock() if now is None else now
+
+    def resume(self, now: Optional[float] = None) -> None:
+        if self.paused_at is None:
+            return
+        now = self.clock() if now is None else now
+        # Shift the anchor so the fraction of a tick left at pause time is preserved.
+        self.anchor += now - self.paused_at
+        self.paused_at = None
+
+    def next_deadline(self) -> float:
+        return self.anchor + (self.ticks_done + 1) * self.interval
+
+    def time_at(self, elapsed_ms: int) -> float:
+        """Clock time at which a timer started with this schedule reaches ``elapsed_ms``."""
+
+        return self.anchor + elapsed_ms / TICK_MS * self.interval
+
+    def delay_until_next(self, now: Optional[float] = None) -> float:
+        now = self.clock() if now is None else now
+        return max(0.0, self.next_deadline() - now)
+
+    def fraction(self, now: Optional[float] = None) -> float:
+        """How far ``now`` is into the interval after the last consumed tick, in ``[0, 1)``."""
+
+        now = self.clock() if now is None else now
+        if self.paused_at is not None:
+            now = self.paused_at
+        return min(max(0.0, (now - self.anchor) / self.interval - self.ticks_done), 1.0 - _EPSILON)
+
+    def due(self, now: Optional[float] = None) -> int:
+        """Return how many ticks are due, marking them as consumed."""
+
+        now = self.clock() if now is None else now
+        target = math.floor((now - self.anchor) / self.interval + _EPSILON)
+        count = target - self.ticks_done
+        if count <= 0:
+            return 0
+        self.stats.record(now - self.next_deadline(), count)
+        self.ticks_done = target
+        return count
+
+    def due_ms(self, now: Optional[float] = None) -> int:
+        """Like :meth:`due`, in timer milliseconds, so a mid-tick start stays on its deadlines."""
+
+        count = self.due(now)
+        if not count:
+            return 0
+        elapsed = count * TICK_MS - self.lead_ms
+        self.lead_ms = 0
+        return elapsed
+
+
+def run_until_complete(
+    controller: TimerController,
+    schedule: Optional[TickSchedule] = None,
+    sleep: Sleep = time.sleep,
+    restart: bool = True,
+) -> DriftStats:
+    """Drive a started ``TimerController`` until it stops, catching up after stalls.
+
+    ``restart=False`` keeps an anchor the caller set before starting the
+    controller, so times reported at the start are on the schedule.
+    """
+
+    schedule = schedule or TickSchedule()
+    if restart:
+        schedule.start()
+    while controller.running:
+        sleep(schedule.delay_until_next())
+        elapsed = schedule.due_ms()
+        if elapsed:
+            controller.tick(elapsed)
+    return schedule.stats
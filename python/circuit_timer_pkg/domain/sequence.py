@@ -2,26 +2,243 @@
 
 from __future__ import annotations
 
-from typing import Iterable, List, NamedTuple
+import sys
+from array import array
+from bisect import bisect_right
+from collections.abc import Sequence
+from enum import IntEnum
+from itertools import accumulate
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Tuple
 
 from .menu import TrainingMenu
 
+WORK_LABEL = sys.intern("作業")
+REST_LABEL = sys.intern("休憩")
+
+
+class PhaseKind(IntEnum):
+    WORK = 0
+    REST = 1
+
+    @property
+    def label(self) -> str:
+        return _KIND_LABELS[self]
+
+
+_KIND_LABELS = (WORK_LABEL, REST_LABEL)
+# PhaseArray stores label codes as unsigned 16-bit ints.
+_MAX_LABEL_CODE = 0xFFFF
+
 
 class Phase(NamedTuple):
     label: str
-    duration: int
+    duration: int  # milliseconds
     set_index: int
     total_sets: int
 
 
-def build_sequence(menu: TrainingMenu) -> List[Phase]:
-    phases: List[Phase] = []
-    for idx in range(1, menu.sets + 1):
-        phases.append(Phase("作業", menu.set_seconds, idx, menu.sets))
-        if idx < menu.sets and menu.rest_seconds > 0:
-            phases.append(Phase("休憩", menu.rest_seconds, idx, menu.sets))
-    return phases
+class PhaseTimeline(Sequence):
+    """Work/rest phases of a menu, computed on demand instead of materialized."""
+
+    __slots__ = ("set_ms", "rest_ms", "sets", "_stride")
+
+    def __init__(self, set_ms: int, rest_ms: int, sets: int):
+        self.set_ms = set_ms
+        self.rest_ms = rest_ms
+        self.sets = max(0, sets)
+        # Each set occupies two slots (work, rest) when rests exist; the last rest is dropped.
+        self._stride = 2 if rest_ms > 0 else 1
+
+    @classmethod
+    def from_menu(cls, menu: TrainingMenu) -> "PhaseTimeline":
+        return cls(menu.set_ms, menu.rest_ms, menu.sets)
+
+    def __len__(self) -> int:
+        if not self.sets:
+            return 0
+        return self.sets * self._stride - (self._stride - 1)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._phase_at(i) for i in range(*index.indices(len(self)))]
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("phase index out of range")
+        return self._phase_at(index)
+
+    def __iter__(self) -> Iterator[Phase]:
+        for idx in range(len(self)):
+            yield self._phase_at(idx)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, PhaseTimeline):
+            return len(self) == len(other) and (not self.sets or self._key() == other._key())
+        if isinstance(other, (list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    # Equal to lists and PhaseArrays holding the same phases, which are not hashable.
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"PhaseTimeline(set_ms={self.set_ms}, rest_ms={self.rest_ms}, sets={self.sets})"
+
+    @property
+    def total_duration(self) -> int:
+        if not self.sets:
+            return 0
+        rests = self.sets - 1 if self.rest_ms > 0 else 0
+        return self.sets * self.set_ms + rests * self.rest_ms
+
+    def start_offset(self, index: int) -> int:
+        set_offset, slot = divmod(index, self._stride)
+        rest = self.rest_ms if self._stride == 2 else 0
+        return set_offset * (self.set_ms + rest) + slot * self.set_ms
+
+    def offsets(self) -> "_TimelineOffsets":
+        return _TimelineOffsets(self)
+
+    def _key(self) -> Tuple[int, int, int]:
+        return (self.set_ms, self.rest_ms if self.rest_ms > 0 else 0, self.sets)
+
+    def _phase_at(self, index: int) -> Phase:
+        set_offset, slot = divmod(index, self._stride)
+        if slot:
+            return Phase(REST_LABEL, self.rest_ms, set_offset + 1, self.sets)
+        return Phase(WORK_LABEL, self.set_ms, set_offset + 1, self.sets)
+
+
+class PhaseArray(Sequence):
+    """Arbitrary phases stored column-wise in ``array`` buffers.
+
+    Used for sequences that do not follow the plain work/rest pattern of
+    :class:`PhaseTimeline`. Each phase costs 14 bytes instead of a tuple
+    plus its boxed ints; labels are 16-bit codes into a shared table that
+    starts with the :class:`PhaseKind` labels.
+    """
+
+    __slots__ = ("durations", "set_indexes", "label_codes", "total_sets", "labels", "_total")
+
+    def __init__(self, phases: Iterable[Phase] = ()):
+        self.durations = array("I")
+        self.set_indexes = array("I")
+        self.label_codes = array("H")
+        self.total_sets = array("I")
+        self.labels: List[str] = list(_KIND_LABELS)
+        self._total = 0
+        codes: Dict[str, int] = {label: code for code, label in enumerate(self.labels)}
+        for phase in phases:
+            code = codes.get(phase.label)
+            if code is None:
+                if len(self.labels) > _MAX_LABEL_CODE:
+                    raise ValueError(f"フェーズ名は {_MAX_LABEL_CODE + 1} 種類までです。")
+                code = codes[phase.label] = len(self.labels)
+                self.labels.append(sys.intern(phase.label))
+            self.durations.append(phase.duration)
+            self.set_indexes.append(phase.set_index)
+            self.label_codes.append(code)
+            self.total_sets.append(phase.total_sets)
+            self._total += phase.duration
+
+    def __len__(self) -> int:
+        return len(self.durations)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._phase_at(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("phase index out of range")
+        return self._phase_at(index)
+
+    def __iter__(self) -> Iterator[Phase]:
+        labels = self.labels
+        for label, duration, set_index, total_sets in zip(
+            self.label_codes, self.durations, self.set_indexes, self.total_sets
+        ):
+            yield Phase(labels[label], duration, set_index, total_sets)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (PhaseArray, PhaseTimeline, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"PhaseArray({len(self)} phases, total_duration={self._total})"
+
+    @property
+    def total_duration(self) -> int:
+        return self._total
+
+    def kind(self, index: int) -> PhaseKind | None:
+        code = self.label_codes[index]
+        return PhaseKind(code) if code < len(_KIND_LABELS) else None
+
+    def _phase_at(self, index: int) -> Phase:
+        return Phase(
+            self.labels[self.label_codes[index]],
+            self.durations[index],
+            self.set_indexes[index],
+            self.total_sets[index],
+        )
+
+
+def compact_sequence(phases: Iterable[Phase]) -> Sequence[Phase]:
+    """Return ``phases`` in the most compact read-only form available."""
+
+    if isinstance(phases, (PhaseTimeline, PhaseArray)):
+        return phases
+    return PhaseArray(phases)
+
+
+class _TimelineOffsets(Sequence):
+    """Prefix sums of a PhaseTimeline, computed per index so bisect needs no list."""
+
+    __slots__ = ("_timeline",)
+
+    def __init__(self, timeline: PhaseTimeline):
+        self._timeline = timeline
+
+    def __len__(self) -> int:
+        return len(self._timeline)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._timeline.start_offset(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("offset index out of range")
+        return self._timeline.start_offset(index)
+
+
+def phase_offsets(phases: Sequence[Phase]) -> Sequence[int]:
+    """Start offset (elapsed milliseconds) of every phase."""
+
+    if isinstance(phases, PhaseTimeline):
+        return phases.offsets()
+    offsets: List[int] = list(accumulate((phase.duration for phase in phases), initial=0))
+    offsets.pop()
+    return offsets
+
+
+def locate(phases: Sequence[Phase], offsets: Sequence[int], elapsed: int) -> Tuple[int, int]:
+    """Return ``(phase index, remaining milliseconds)`` at ``elapsed`` by binary search."""
+
+    index = bisect_right(offsets, elapsed) - 1
+    return index, phases[index].duration - (elapsed - offsets[index])
+
+
+def build_sequence(menu: TrainingMenu) -> PhaseTimeline:
+    return PhaseTimeline.from_menu(menu)
 
 
 def total_duration(phases: Iterable[Phase]) -> int:
+    if isinstance(phases, (PhaseTimeline, PhaseArray)):
+        return phases.total_duration
     return sum(phase.duration for phase in phases)
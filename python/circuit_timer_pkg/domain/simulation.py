@@ -0,0 +1,167 @@
+﻿"""Headless simulation of whole workouts on a virtual clock."""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Union
+
+from .async_controller import COMPLETE, PHASE_START, TICK
+from .controller import TICK_MS, EventCallback, TickCallback, TimerController
+from .menu import MS_PER_SECOND, TrainingMenu, ceil_seconds
+from .sequence import Phase, build_sequence, phase_offsets, total_duration
+
+
+class VirtualClock:
+    """A monotonic clock that only moves when slept on; pass it as both ``clock`` and ``sleep``."""
+
+    __slots__ = ("now",)
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            self.now += seconds
+
+    advance = sleep
+
+
+class SimEvent(NamedTuple):
+    at: float
+    kind: str
+    phase: Optional[Phase]
+    remaining: int  # milliseconds
+    elapsed: int  # milliseconds
+
+
+@dataclass
+class SimulationResult:
+    name: str
+    phases: Sequence[Phase]
+    events: List[SimEvent] = field(default_factory=list)
+    phase_starts: int = 0
+    ticks: int = 0
+    completed: int = 0
+    elapsed_ms: int = 0
+    virtual_seconds: float = 0.0
+    wall_seconds: float = 0.0
+
+    @property
+    def speedup(self) -> float:
+        return self.virtual_seconds / self.wall_seconds if self.wall_seconds else float("inf")
+
+
+def simulate(
+    workout: Union[TrainingMenu, Iterable[Phase]],
+    on_phase_start: Optional[EventCallback] = None,
+    on_tick: Optional[TickCallback] = None,
+    on_complete: Optional[Callable[[], None]] = None,
+    ticks: bool = True,
+    record: bool = True,
+    interval: float = 1.0,
+) -> SimulationResult:
+    """Run a workout to completion without waiting.
+
+    With ``ticks=True`` every deadline is delivered as a one-second tick on
+    a :class:`VirtualClock`, which is what ``run_until_complete`` does when
+    nothing is ever late, so callbacks fire in exactly the real order and at
+    the real (virtual) times; a phase boundary between two ticks is reported
+    at the later one. ``ticks=False`` jumps from one phase boundary to the
+    next: phase starts land exactly on the boundaries and per-second
+    ``on_tick`` calls are skipped. ``interval`` is virtual seconds per timer
+    second.
+    """
+
+    if isinstance(workout, TrainingMenu):
+        name, phases = workout.name, build_sequence(workout)
+    else:
+        name, phases = "", workout
+    clock = VirtualClock()
+    result = SimulationResult(name, phases)
+    events = result.events
+
+    def _phase_start(phase: Phase) -> None:
+        result.phase_starts += 1
+        if record:
+            # A phase crossed whole within one tick has nothing left of it.
+            remaining = max(0, controller.remaining_ms)
+            events.append(SimEvent(clock.now, PHASE_START, phase, remaining, controller.elapsed_ms))
+        if on_phase_start:
+            on_phase_start(phase)
+
+    def _tick(phase: Phase, remaining: int, elapsed: int) -> None:
+        result.ticks += 1
+        if record:
+            events.append(SimEvent(clock.now, TICK, phase, remaining, elapsed))
+        if on_tick:
+            on_tick(phase, remaining, elapsed)
+
+    def _complete() -> None:
+        result.completed += 1
+        if record:
+            events.append(SimEvent(clock.now, COMPLETE, None, 0, controller.elapsed_ms))
+        if on_complete:
+            on_complete()
+
+    controller = TimerController(on_phase_start=_phase_start, on_tick=_tick if ticks else None, on_complete=_complete)
+    controller.load_sequence(phases)
+    result.phases = controller.sequence
+    if not controller.sequence:
+        return result
+
+    started = time.perf_counter()
+    controller.start()
+    if ticks:
+        tick = controller.tick
+        while controller.running:
+            # Derived from the tick count rather than accumulated, so no float drift.
+            clock.now = (controller.elapsed_ms + TICK_MS) / MS_PER_SECOND * interval
+            tick(TICK_MS)
+    else:
+        while controller.running:
+            step = controller.remaining_ms
+            clock.now = (controller.elapsed_ms + step) / MS_PER_SECOND * interval
+            controller.tick(step)
+    result.wall_seconds = time.perf_counter() - started
+    result.elapsed_ms = controller.elapsed_ms
+    result.virtual_seconds = clock.now
+    return result
+
+
+def simulate_batch(workouts: Iterable[Union[TrainingMenu, Iterable[Phase]]], **options: object) -> Iterator[SimulationResult]:
+    for workout in workouts:
+        yield simulate(workout, **options)  # type: ignore[arg-type]
+
+
+def validate(result: SimulationResult, ticks: bool = True) -> List[str]:
+    """Check a simulated run against its sequence; returns human-readable problems."""
+
+    phases = result.phases
+    total = total_duration(phases)
+    problems: List[str] = []
+    label = result.name or "(無名)"
+    if not phases:
+        return [f"{label}: フェーズがありません。"]
+    if result.completed != 1:
+        problems.append(f"{label}: 完了通知が {result.completed} 回でした。")
+    if result.elapsed_ms != total:
+        problems.append(f"{label}: 経過 {result.elapsed_ms} ms (期待値 {total} ms)。")
+    if result.phase_starts != len(phases):
+        problems.append(f"{label}: フェーズ開始が {result.phase_starts} 回 (期待値 {len(phases)} 回)。")
+    # One report at start and per non-final second; phase changes add none.
+    expected_ticks = ceil_seconds(total)
+    if ticks and result.ticks != expected_ticks:
+        problems.append(f"{label}: tick が {result.ticks} 回 (期待値 {expected_ticks} 回)。")
+    if result.events:
+        starts = [event.elapsed for event in result.events if event.kind == PHASE_START]
+        expected = list(phase_offsets(phases))
+        if ticks:
+            # Boundaries between ticks are reported on the next one.
+            expected = [ceil_seconds(offset) * TICK_MS for offset in expected]
+        if starts and starts != expected:
+            problems.append(f"{label}: フェーズ開始時刻がシーケンスと一致しません。")
+    return problems
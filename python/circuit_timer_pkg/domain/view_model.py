@@ -0,0 +1,176 @@
+﻿"""Timer display values computed per frame and pushed to widgets only when they change."""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Callable, Dict, Mapping, NamedTuple, Optional, Tuple
+
+from .menu import MS_PER_SECOND, ceil_seconds, format_time
+from .sequence import Phase
+
+Setter = Callable[[object], None]
+
+# The progress bar (in milliseconds) moves on ticks, in 1/PROGRESS_STEPS of the workout,
+# about one pixel at the UI's width, or one second, whichever is longer.
+PROGRESS_STEPS = 500
+
+
+class TimerFrame(NamedTuple):
+    timer: str
+    detail: str
+    clock: str
+    tenths: str
+    progress: float
+
+
+_MISSING = object()
+
+
+class DirtyView:
+    """Widget setters by field name; a value is pushed only if it differs from the last one pushed."""
+
+    __slots__ = ("_setters", "_values", "pushes", "skipped")
+
+    def __init__(self, setters: Mapping[str, Setter]):
+        self._setters: Dict[str, Setter] = dict(setters)
+        self._values: Dict[str, object] = {}
+        self.pushes = 0
+        self.skipped = 0
+
+    def push(self, name: str, value: object) -> bool:
+        if self._values.get(name, _MISSING) == value:
+            self.skipped += 1
+            return False
+        self._setters[name](value)
+        self._values[name] = value
+        self.pushes += 1
+        return True
+
+    def push_frame(self, frame: NamedTuple) -> int:
+        pushed = 0
+        for name, value in zip(frame._fields, frame):
+            if name in self._setters and self.push(name, value):
+                pushed += 1
+        return pushed
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """Forget what was pushed, e.g. after a widget was changed behind the view's back."""
+
+        if name is None:
+            self._values.clear()
+        else:
+            self._values.pop(name, None)
+
+
+class TimerFrames:
+    """Builds :class:`TimerFrame` values for a running timer.
+
+    Times are milliseconds from the controller; ``fraction`` is the part of
+    the current tick already elapsed. With ``tenths`` the clock counts
+    down in tenths, rounded to the nearest, so 45 s with 0.3 s gone reads
+    00:44 and .7; without, it shows whole seconds rounded up. Given
+    ``tenths_below_ms``, tenths are counted only once a tick starts with
+    at most that much left, and :meth:`sub_second` tells the caller to
+    skip frames until the next tick before then.
+
+    Everything but the clock and tenths changes only on ticks and is
+    computed by :meth:`render` once per tick. :meth:`advance` is the
+    per-frame path between ticks; it pushes the tenths and, once a
+    second, the clock.
+    """
+
+    def __init__(self, tenths: bool = True, progress_steps: int = PROGRESS_STEPS, tenths_below_ms: Optional[int] = None):
+        self.tenths = tenths
+        self.tenths_below_ms = tenths_below_ms
+        self.progress_steps = progress_steps
+        self._key: Optional[Tuple[Phase, int, int, int]] = None
+        self._text: Tuple[str, str, str] = ("", "", "")
+        self._progress = 0.0
+        # What holds for a whole phase: the start of the timer and detail text and the progress step.
+        self._phase_text: Tuple[Optional[Phase], int, str, str, float] = (None, 0, "", "", 0.0)
+        self._deciseconds = -1
+        # Remaining milliseconds at the last tick, while tenths are being counted; else -1.
+        self._counting_from = -1
+
+    def sub_second(self, remaining_ms: int) -> bool:
+        """Whether frames between ticks can change anything while ``remaining_ms`` is left."""
+
+        return self.tenths and (self.tenths_below_ms is None or remaining_ms <= self.tenths_below_ms)
+
+    def _tick_text(self, phase: Phase, remaining_ms: int, elapsed_ms: int, total_ms: int) -> bool:
+        """Refresh what only changes on ticks; returns whether it changed."""
+
+        key = (phase, remaining_ms, elapsed_ms, total_ms)
+        if key == self._key:
+            return False
+        self._key = key
+        if self._phase_text[0] is not phase or self._phase_text[1] != total_ms:
+            self._phase_text = (
+                phase,
+                total_ms,
+                f"{phase.label} - セット {phase.set_index}/{phase.total_sets}: 残り ",
+                f"総時間 {format_time(ceil_seconds(total_ms) or 1)} / 経過 ",
+                # No finer than a second, so short workouts do not move the bar every tick.
+                max(MS_PER_SECOND, total_ms / self.progress_steps),
+            )
+        _, _, timer, detail, step = self._phase_text
+        remaining = ceil_seconds(remaining_ms)
+        self._text = (f"{timer}{remaining:02d} 秒", detail + _clock_text(elapsed_ms // MS_PER_SECOND), _clock_text(remaining))
+        self._progress = min(total_ms, int(elapsed_ms / step) * step) if total_ms > 0 else 0.0
+        self._deciseconds = -1
+        return True
+
+    def _countdown(self, remaining_ms: int, fraction: float) -> int:
+        """Tenths of a second left ``fraction`` of a tick after ``remaining_ms``."""
+
+        return max(0, round((remaining_ms - fraction * MS_PER_SECOND) / 100))
+
+    def frame(
+        self, phase: Phase, remaining_ms: int, elapsed_ms: int, total_ms: int, fraction: float = 0.0
+    ) -> TimerFrame:
+        self._tick_text(phase, remaining_ms, elapsed_ms, total_ms)
+        clock, tenths = self._text[2], ""
+        if self.sub_second(remaining_ms):
+            seconds, tenth = divmod(self._countdown(remaining_ms, fraction), 10)
+            clock, tenths = _clock_text(seconds), _TENTHS[tenth]
+        return TimerFrame(self._text[0], self._text[1], clock, tenths, self._progress)
+
+    def render(
+        self, view: DirtyView, phase: Phase, remaining_ms: int, elapsed_ms: int, total_ms: int, fraction: float = 0.0
+    ) -> None:
+        if self._tick_text(phase, remaining_ms, elapsed_ms, total_ms):
+            timer, detail, clock = self._text
+            view.push("timer", timer)
+            view.push("detail", detail)
+            view.push("progress", self._progress)
+            self._counting_from = remaining_ms if self.sub_second(remaining_ms) else -1
+            if self._counting_from < 0:
+                view.push("clock", clock)
+                view.push("tenths", "")
+                return
+        self.advance(view, fraction)
+
+    def advance(self, view: DirtyView, fraction: float) -> None:
+        """Frame between ticks, ``fraction`` of a tick after the last :meth:`render`."""
+
+        if self._counting_from < 0:
+            # Whole seconds only move on ticks.
+            return
+        deciseconds = max(0, round((self._counting_from - fraction * MS_PER_SECOND) / 100))
+        previous = self._deciseconds
+        if deciseconds == previous:
+            return
+        self._deciseconds = deciseconds
+        seconds, tenth = divmod(deciseconds, 10)
+        if previous < 0 or previous // 10 != seconds:
+            view.push("clock", _clock_text(seconds))
+        view.push("tenths", _TENTHS[tenth])
+
+    def reset(self) -> None:
+        self._key = None
+        self._counting_from = -1
+
+
+_TENTHS = tuple(f".{digit}" for digit in range(10))
+# Whole seconds repeat every set, so their mm:ss text is formatted once.
+_clock_text = lru_cache(maxsize=4096)(format_time)
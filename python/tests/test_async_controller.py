@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from circuit_timer_pkg.domain.async_controller import COMPLETE, PHASE_START, TICK, AsyncTimerController
+from circuit_timer_pkg.domain.menu import TrainingMenu
+
+# Two 2 s sets with 1 s rest: five ticks, one every INTERVAL seconds.
+MENU = TrainingMenu.from_seconds("t", 2, 1, 2)
+INTERVAL = 0.02
+
+
+def timer(**callbacks) -> AsyncTimerController:
+    controller = AsyncTimerController(interval=INTERVAL, **callbacks)
+    controller.load_menu(MENU)
+    return controller
+
+
+async def collect(controller: AsyncTimerController) -> list:
+    return [event async for event in controller.events()]
+
+
+def test_events_fan_out_to_every_subscriber_and_callback():
+    seen_ticks = []
+    completed = []
+
+    async def on_tick(_phase, _remaining, elapsed):
+        await asyncio.sleep(0)
+        seen_ticks.append(elapsed)
+
+    async def main():
+        controller = timer(on_tick=on_tick, on_complete=lambda: completed.append(True))
+        first = asyncio.ensure_future(collect(controller))
+        second = asyncio.ensure_future(collect(controller))
+        await asyncio.sleep(0)
+        await controller.start()
+        return await first, await second
+
+    first, second = asyncio.run(main())
+
+    assert first == second
+    assert [event.kind for event in first].count(PHASE_START) == 3
+    assert [event.elapsed for event in first if event.kind == TICK] == seen_ticks
+    assert first[-1].kind == COMPLETE and first[-1].elapsed == 5000
+    assert completed == [True]
+
+
+def test_subscribing_after_the_run_yields_complete_and_returns():
+    async def main():
+        controller = timer()
+        await controller.start()
+        return await asyncio.wait_for(collect(controller), 1.0)
+
+    events = asyncio.run(main())
+
+    assert [event.kind for event in events] == [COMPLETE]
+
+
+def test_pause_holds_the_countdown():
+    async def main():
+        loop = asyncio.get_running_loop()
+        controller = timer()
+        events = asyncio.ensure_future(collect(controller))
+        await asyncio.sleep(0)
+        started = loop.time()
+        task = controller.start()
+        await asyncio.sleep(INTERVAL * 1.5)
+        controller.pause()
+        elapsed_at_pause = controller.controller.elapsed_ms
+        await asyncio.sleep(INTERVAL * 5)
+        assert controller.controller.elapsed_ms == elapsed_at_pause
+        controller.resume()
+        await task
+        return loop.time() - started, await events
+
+    duration, events = asyncio.run(main())
+
+    assert duration >= INTERVAL * 10
+    assert [event.elapsed for event in events if event.kind == TICK] == [0, 1000, 2000, 3000, 4000]
+    assert events[-1].kind == COMPLETE
+
+
+def test_cancel_stops_the_run_and_ends_subscriptions():
+    async def main():
+        controller = timer()
+        events = asyncio.ensure_future(collect(controller))
+        await asyncio.sleep(0)
+        task = controller.start()
+        await asyncio.sleep(INTERVAL * 1.5)
+        controller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return controller, await asyncio.wait_for(events, 1.0), await asyncio.wait_for(collect(controller), 1.0)
+
+    controller, events, late = asyncio.run(main())
+
+    assert not controller.running
+    assert events and COMPLETE not in [event.kind for event in events]
+    assert late == []
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import threading
+import wave
+
+import pytest
+
+from circuit_timer_pkg.adapters.audio import (
+    FINISH,
+    REST,
+    WORK,
+    AudioSink,
+    CueEngine,
+    NullSink,
+    WaveFileSink,
+    render_cues,
+)
+
+CUES = render_cues(rate=8000)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class HeldSink(NullSink):
+    """Blocks in ``play`` until released, so cues pile up behind it."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.playing = threading.Event()
+        self.release = threading.Event()
+
+    def play(self, cue) -> None:
+        self.playing.set()
+        assert self.release.wait(5.0)
+        super().play(cue)
+
+
+def test_sink_must_implement_play():
+    with pytest.raises(TypeError):
+        AudioSink()
+
+
+def test_latency_is_measured_from_the_due_time():
+    clock = FakeClock()
+    sink = NullSink()
+    engine = CueEngine(sink, CUES, clock=clock)
+    clock.now = 10.25
+
+    engine.cue(WORK, due=10.0)
+    engine.cue(REST)
+    assert engine.wait()
+    engine.close()
+
+    assert sink.played == [WORK, REST]
+    assert (engine.played, engine.dropped, engine.errors) == (2, 0, 0)
+    assert engine.latency.count == 2
+    assert engine.latency.max == pytest.approx(0.25)
+    assert engine.latency.total == pytest.approx(0.25)
+
+
+def test_full_queue_drops_the_oldest_cue():
+    sink = HeldSink()
+    engine = CueEngine(sink, CUES, maxsize=2)
+    engine.cue(FINISH)
+    assert sink.playing.wait(5.0)
+
+    for name in (WORK, REST, WORK, REST):
+        engine.cue(name)
+    sink.release.set()
+    assert engine.wait()
+    engine.close()
+
+    assert sink.played == [FINISH, WORK, REST]
+    assert (engine.played, engine.dropped) == (3, 2)
+
+
+def test_wave_file_sink_writes_the_cues_back_to_back(tmp_path):
+    path = tmp_path / "cues.wav"
+    engine = CueEngine(WaveFileSink(path, rate=8000), CUES)
+
+    engine.cue(WORK)
+    engine.cue(FINISH)
+    engine.close()
+
+    with wave.open(str(path), "rb") as reader:
+        assert (reader.getnchannels(), reader.getsampwidth(), reader.getframerate()) == (1, 2, 8000)
+        frames = reader.readframes(reader.getnframes())
+    assert frames == CUES[WORK].frames + CUES[FINISH].frames
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from circuit_timer_pkg.adapters import storage
+from circuit_timer_pkg.adapters.binary_store import MenuSnapshot, encode_snapshot
+from circuit_timer_pkg.domain.menu import TrainingMenu
+
+
+def menu(name: str, sets: int = 3) -> TrainingMenu:
+    return TrainingMenu.from_seconds(name, 30, 10, sets)
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    path = tmp_path / "menus.ctm"
+    storage.save_menus({name: menu(name) for name in ("alpha", "bravo", "delta", "echo")}, path)
+    return path
+
+
+def expected_pages(path):
+    return [loaded for _, loaded in sorted(storage.load_menus(path).items())]
+
+
+def test_get_sees_upserts_after_open(snapshot_path):
+    with MenuSnapshot(snapshot_path) as snapshot:
+        storage.upsert_menu(menu("charlie"), snapshot_path)
+        storage.upsert_menu(menu("bravo", sets=9), snapshot_path)
+        storage.delete_menu("delta", snapshot_path)
+
+        assert snapshot.get("charlie") == menu("charlie")
+        assert snapshot.get("bravo").sets == 9
+        assert snapshot.get("delta") is None
+        assert "delta" not in snapshot and "charlie" in snapshot
+        assert len(snapshot) == 4
+        assert snapshot.page(0, 10) == expected_pages(snapshot_path)
+        assert snapshot.load_all() == storage.load_menus(snapshot_path)
+
+
+def test_snapshot_without_journal_ignores_it(snapshot_path):
+    storage.upsert_menu(menu("charlie"), snapshot_path)
+    with MenuSnapshot(snapshot_path, journal=False) as snapshot:
+        assert snapshot.get("charlie") is None
+        assert len(snapshot) == 4
+
+
+def test_compaction_and_rewrites_are_followed(snapshot_path):
+    with MenuSnapshot(snapshot_path) as snapshot:
+        storage.upsert_menu(menu("foxtrot"), snapshot_path)
+        assert storage.compact(snapshot_path)
+        storage.delete_menu("alpha", snapshot_path)
+        assert [found.name for found in snapshot.page(0, 10)] == ["bravo", "delta", "echo", "foxtrot"]
+
+        storage.save_menus({"golf": menu("golf")}, snapshot_path)
+        assert snapshot.load_all() == {"golf": menu("golf")}
+
+
+def test_pages_merge_journal_into_name_order(snapshot_path):
+    rng = random.Random(7)
+    names = [f"m{value:03d}" for value in range(60)]
+    storage.save_menus({name: menu(name) for name in names[::2]}, snapshot_path)
+    with MenuSnapshot(snapshot_path) as snapshot:
+        for _ in range(80):
+            name = rng.choice(names)
+            if rng.random() < 0.3:
+                storage.delete_menu(name, snapshot_path)
+            else:
+                storage.upsert_menu(menu(name, rng.randint(1, 9)), snapshot_path)
+        expected = expected_pages(snapshot_path)
+        assert len(snapshot) == len(expected)
+        for size in (1, 3, 7, 50):
+            for start in range(0, len(expected) + 2):
+                assert snapshot.page(start, size) == expected[start : start + size]
+
+
+@pytest.mark.parametrize("size", [0, 10])
+def test_short_files_are_reported_as_corrupt(tmp_path, size):
+    path = tmp_path / "menus.ctm"
+    path.write_bytes(b"\0" * size)
+    with pytest.raises(ValueError, match="壊れています"):
+        MenuSnapshot(path)
+
+
+def test_only_the_current_version_is_read(tmp_path):
+    path = tmp_path / "menus.ctm"
+    data = bytearray(encode_snapshot({"alpha": menu("alpha")}))
+    data[4:6] = (1).to_bytes(2, "little")
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match="対応していない形式"):
+        MenuSnapshot(path)
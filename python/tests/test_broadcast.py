@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import pytest
+
+from circuit_timer_pkg.domain.broadcast import (
+    VERSION,
+    Publisher,
+    StateMessage,
+    TickMessage,
+    decode,
+    decode_all,
+    encode_tick,
+)
+from circuit_timer_pkg.domain.controller import TimerController
+from circuit_timer_pkg.domain.menu import TrainingMenu
+from circuit_timer_pkg.domain.scheduler import TickSchedule
+
+
+class Transport:
+    def __init__(self) -> None:
+        self.frames = []
+        self.snapshot = None
+
+    def send(self, frame: bytes) -> None:
+        self.frames.append(frame)
+
+
+def test_long_template_publishes_wide_indices():
+    controller = TimerController()
+    controller.load_menu(TrainingMenu.from_seconds("big", 1, 1, 40000))
+    schedule = TickSchedule(interval=0.01)
+    transport = Transport()
+    Publisher(controller, schedule, transport).attach()
+    schedule.start(now=0.0, elapsed_ms=controller.total_ms - 3000)
+    controller.start_at(controller.total_ms - 3000)
+    controller.tick()
+
+    messages = decode_all(b"".join(transport.frames))
+    state = messages[0]
+    assert isinstance(state, StateMessage)
+    assert state.count == 79999
+    assert state.index == 79996
+    assert state.phase.set_index == 39999
+    assert state.phase.total_sets == 40000
+    assert state.at == pytest.approx(schedule.time_at(state.elapsed_ms))
+    assert messages[-1].index == 79997
+
+
+def test_frames_carry_the_version():
+    frame = encode_tick(7, 1.5, 2000, 70000)
+    assert frame[1] == VERSION
+    assert decode(frame[1:]) == TickMessage(7, 1.5, 2000, 70000)
+
+
+def test_frames_without_a_version_are_rejected():
+    with pytest.raises(ValueError):
+        decode(bytes((ord("T"),)) + bytes(18))
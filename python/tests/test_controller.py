@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from circuit_timer_pkg.domain.controller import TimerController
+from circuit_timer_pkg.domain.menu import TrainingMenu
+from circuit_timer_pkg.domain.sequence import Phase
+from circuit_timer_pkg.domain.simulation import simulate, validate
+
+
+def recording_controller(events: list) -> TimerController:
+    controller = TimerController(
+        on_phase_start=lambda phase: events.append(("start", phase.label, phase.set_index)),
+        on_tick=lambda phase, remaining, elapsed: events.append(("tick", phase.label, remaining, elapsed)),
+        on_complete=lambda: events.append(("complete",)),
+    )
+    # 3s work / 2s rest / 3 sets: starts at 0, 3000, 5000, 8000, 10000; total 13000.
+    controller.load_menu(TrainingMenu.from_seconds("catch-up", 3, 2, 3))
+    return controller
+
+
+def test_catch_up_tick_reports_only_the_phase_it_lands_in():
+    events: list = []
+    controller = recording_controller(events)
+    controller.start_at(4500)
+    del events[:]
+
+    controller.tick(7000)
+
+    assert events == [
+        ("start", "作業", 2),
+        ("start", "休憩", 2),
+        ("start", "作業", 3),
+        ("tick", "作業", 1500, 11500),
+    ]
+    assert controller.phase_start_ms == 10000
+
+
+def test_catch_up_past_the_end_completes_without_ticks():
+    events: list = []
+    controller = recording_controller(events)
+    controller.start_at(4500)
+    del events[:]
+
+    controller.tick(10000)
+
+    assert [event[0] for event in events] == ["start", "start", "start", "complete"]
+    assert controller.elapsed_ms == 13000
+    assert not controller.running
+
+
+def test_simulated_ticks_match_validation():
+    phases = [Phase("a", 300, 1, 1), Phase("b", 450, 1, 1), Phase("c", 2250, 1, 1)]
+    for workout in (TrainingMenu.from_seconds("menu", 3, 2, 3), phases):
+        result = simulate(workout)
+        assert validate(result) == []
+        assert all(event.remaining >= 0 for event in result.events)
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from circuit_timer_pkg.domain.controller import TimerController
+from circuit_timer_pkg.domain.engine import TimerEngine
+from circuit_timer_pkg.domain.menu import TrainingMenu
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def make_engine() -> TimerEngine:
+    clock = FakeClock()
+    return TimerEngine(clock=clock, sleep=clock.sleep)
+
+
+def loaded_controller() -> TimerController:
+    controller = TimerController()
+    controller.load_menu(TrainingMenu.from_seconds("engine", 2, 1, 2))
+    return controller
+
+
+def stale_entries(engine: TimerEngine) -> int:
+    return sum(1 for entry in engine._heap if not engine._is_live(entry))
+
+
+def test_session_removed_on_complete():
+    engine = make_engine()
+    controller = loaded_controller()
+    session_id = engine.add(controller)
+    controller.on_complete = lambda: engine.remove(session_id)
+
+    engine.run()
+
+    assert session_id not in engine
+    assert not controller.running
+
+
+def test_session_removed_mid_run_is_not_ticked_again():
+    engine = make_engine()
+    controller = loaded_controller()
+    ticks = []
+    session_id = engine.add(controller)
+
+    def on_tick(phase, remaining, elapsed):
+        ticks.append(elapsed)
+        engine.remove(session_id)
+
+    controller.on_tick = on_tick
+    engine.run()
+
+    assert ticks == [1000]
+    assert len(engine) == 0
+    assert engine._stale == stale_entries(engine) == 0
+
+
+def test_session_paused_by_callback_stays_paused():
+    engine = make_engine()
+    controller = loaded_controller()
+    session_id = engine.add(controller)
+    controller.on_phase_start = lambda phase: engine.pause(session_id)
+
+    engine.run_pending(engine.clock() + 2.0)
+    elapsed = controller.elapsed_ms
+    engine.run_pending(engine.clock() + 10.0)
+
+    assert controller.elapsed_ms == elapsed
+    assert engine._stale == stale_entries(engine) == 0
+    assert engine.next_deadline() is None
+
+
+def test_removing_another_session_counts_its_stale_entry():
+    engine = make_engine()
+    first, second = loaded_controller(), loaded_controller()
+    first_id = engine.add(first)
+    second_id = engine.add(second, now=engine.clock() + 0.5)
+    first.on_tick = lambda *_args: engine.remove(second_id)
+
+    engine.run_pending(engine.clock() + 1.0)
+
+    assert second_id not in engine and first_id in engine
+    assert engine._stale == stale_entries(engine) == 1
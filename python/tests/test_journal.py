@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from circuit_timer_pkg.adapters import storage
+from circuit_timer_pkg.adapters.journal import MenuJournal, journal_path, record_menu, upsert_record
+from circuit_timer_pkg.domain.menu import TrainingMenu
+
+
+def menu(name: str, sets: int = 3) -> TrainingMenu:
+    return TrainingMenu.from_seconds(name, 30, 10, sets)
+
+
+def torn_journal(tmp_path) -> MenuJournal:
+    """A journal of three upserts whose last append stopped halfway through the record."""
+
+    journal = MenuJournal(tmp_path / "menus.json.journal")
+    journal.append([upsert_record(menu("alpha")), upsert_record(menu("bravo"))])
+    size = journal.append([upsert_record(menu("charlie"))])
+    with journal.path.open("r+b") as handle:
+        handle.truncate(size - 12)
+    return journal
+
+
+def test_read_stops_before_a_torn_record(tmp_path):
+    journal = torn_journal(tmp_path)
+
+    records, offset = journal.read()
+
+    assert [record_menu(record) for record in records] == [menu("alpha"), menu("bravo")]
+    assert journal.read(offset) == ([], offset)
+    assert offset < journal.size()
+
+
+def test_append_seals_the_torn_tail(tmp_path):
+    journal = torn_journal(tmp_path)
+    _, offset = journal.read()
+
+    journal.append([upsert_record(menu("delta"))])
+
+    assert [record_menu(record).name for record in journal.read()[0]] == ["alpha", "bravo", "delta"]
+    assert [record_menu(record) for record in journal.read(offset)[0]] == [menu("delta")]
+    assert journal.read()[1] == journal.size()
+
+
+def test_compact_folds_the_journal_into_the_snapshot(tmp_path):
+    path = tmp_path / "menus.json"
+    storage.save_menus({"alpha": menu("alpha")}, path)
+    storage.upsert_menu(menu("bravo"), path)
+    storage.upsert_menu(menu("alpha", sets=5), path)
+    storage.delete_menu("bravo", path)
+    expected = {"alpha": menu("alpha", sets=5)}
+
+    assert storage.compact(path)
+
+    assert not journal_path(path).exists()
+    assert storage.load_menus(path) == expected
+    storage.upsert_menu(menu("charlie"), path)
+    assert [record_menu(record) for record in MenuJournal(journal_path(path)).read()[0]] == [menu("charlie")]
+    assert storage.load_menus(path) == {**expected, "charlie": menu("charlie")}
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from circuit_timer_pkg.adapters.json_stream import MenuFormatError, RecordError, iter_menus, validate_file
+
+
+def record(index: int) -> dict:
+    return {"name": f"menu-{index}", "set_seconds": 30, "rest_seconds": 10, "sets": 3}
+
+
+def write_menus(tmp_path, count: int = 5, bad_sets=()):
+    records = [record(index) for index in range(count)]
+    for index in bad_sets:
+        records[index]["sets"] = "x"
+    path = tmp_path / "menus.json"
+    path.write_text(json.dumps(records, indent=2), encoding="utf-8")
+    return path
+
+
+def read(path, chunk_size: int = 64):
+    errors = []
+    names = [menu.name for menu in iter_menus(path, errors, chunk_size=chunk_size)]
+    return names, errors
+
+
+def test_errors_carry_line_column_and_index(tmp_path):
+    path = tmp_path / "menus.json"
+    path.write_text(
+        '[\n  {"name": "a", "set_seconds": 30, "rest_seconds": 10, "sets": 3},\n'
+        '  {"name": "b", "set_seconds": -1, "rest_seconds": 10, "sets": 3}\n]\n',
+        encoding="utf-8",
+    )
+
+    names, errors = read(path)
+
+    assert names == ["a"]
+    assert [(error.index, error.line, error.column) for error in errors] == [(1, 3, 3)]
+    with pytest.raises(MenuFormatError) as raised:
+        list(iter_menus(path))
+    assert raised.value.error == errors[0]
+
+
+def test_reader_resyncs_after_a_malformed_record(tmp_path):
+    path = write_menus(tmp_path)
+    text = path.read_text(encoding="utf-8").replace('"name": "menu-2"', '"name": "menu-2', 1)
+    path.write_text(text, encoding="utf-8")
+
+    names, errors = read(path)
+
+    assert names == ["menu-0", "menu-1", "menu-3", "menu-4"]
+    assert [error.index for error in errors] == [2]
+
+
+@pytest.mark.parametrize("cut", [1, 40])
+def test_truncated_file_is_reported(tmp_path, cut):
+    path = write_menus(tmp_path)
+    path.write_text(path.read_text(encoding="utf-8")[:-cut], encoding="utf-8")
+
+    names, errors = read(path)
+
+    assert names == [f"menu-{index}" for index in range(len(names))]
+    assert errors and "途中で切れています" in errors[-1].message
+
+
+def test_trailing_text_after_the_array_is_reported(tmp_path):
+    path = write_menus(tmp_path, 2)
+    lines = path.read_text(encoding="utf-8").count("\n")
+    with path.open("a", encoding="utf-8") as handle:
+        handle.write("\n\n  garbage\n")
+
+    names, errors = read(path)
+
+    assert names == ["menu-0", "menu-1"]
+    assert errors == [RecordError(2, lines + 3, 3, "']' の後に余分な内容があります。")]
+    path.write_text("[] {}", encoding="utf-8")
+    assert read(path)[1] == [RecordError(0, 1, 4, "']' の後に余分な内容があります。")]
+
+
+def test_parallel_validation_matches_a_single_pass(tmp_path):
+    path = write_menus(tmp_path, 400, bad_sets=(3, 150, 151, 398))
+    text = path.read_text(encoding="utf-8").replace('"name": "menu-260"', '"name": "menu-260', 1)
+    path.write_text(text + "x", encoding="utf-8")
+
+    single = validate_file(path)
+    parallel = validate_file(path, workers=3, split_bytes=4096)
+
+    assert len(single.errors) == 6
+    assert parallel.valid == single.valid == 395
+    assert parallel.errors == single.errors
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import pytest
+
+from circuit_timer_pkg.domain.menu import TrainingMenu, parse_duration_ms
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("45", 45000),
+        (".5m", 30000),
+        ("0.5m", 30000),
+        ("5.", 5000),
+        (".25s", 250),
+        ("1m .5s", 60500),
+        ("1h 2m 3.5s", 3723500),
+        ("1m30", 90000),
+        ("250ms", 250),
+    ],
+)
+def test_parse_duration(text, expected):
+    assert parse_duration_ms(text) == expected
+
+
+@pytest.mark.parametrize("text", ["1m1m", "1s 1s", "30s 5", "1m 2ms 3ms", "1.5m .5m"])
+def test_repeated_units_are_rejected(text):
+    with pytest.raises(ValueError, match="同じ単位"):
+        parse_duration_ms(text)
+
+
+@pytest.mark.parametrize("text", [".", "m", "1..5s", "", "0s"])
+def test_invalid_durations(text):
+    with pytest.raises(ValueError):
+        parse_duration_ms(text)
+
+
+def test_seconds_keywords_are_still_accepted():
+    menu = TrainingMenu(name="tabata", set_seconds=20, rest_seconds=7.5, sets=8)
+
+    assert menu == TrainingMenu("tabata", 20000, 7500, 8)
+    assert (menu.set_seconds, menu.rest_seconds) == (20, 7.5)
+
+
+def test_seconds_attributes_are_assignable():
+    menu = TrainingMenu("tabata", 20000, 10000, 8)
+
+    menu.set_seconds = 30
+    menu.rest_seconds = 2.5
+
+    assert (menu.set_ms, menu.rest_ms) == (30000, 2500)
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [{"set_ms": 1000, "set_seconds": 1, "rest_ms": 0}, {"rest_ms": 0}, {"set_ms": 1000, "rest_seconds": 1, "rest_ms": 0}],
+)
+def test_each_duration_is_given_once(kwargs):
+    with pytest.raises(TypeError):
+        TrainingMenu("x", sets=1, **kwargs)
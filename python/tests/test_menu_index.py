@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from itertools import islice
+
+import pytest
+
+from benchmarks.bench_index import QUERIES, make_menus
+from circuit_timer_pkg.domain.menu_index import parse_query, scan
+from circuit_timer_pkg.domain.sequence import build_sequence, total_duration
+
+EXTRA_QUERIES = ("sets>2 rest>2", "total<5m", "name:le* sets<=3 cardio", "rest=0 set>=60s")
+
+
+@pytest.fixture(scope="module")
+def menus():
+    return make_menus(6000)
+
+
+def brute_force(menus, text):
+    query = parse_query(text)
+    values = {
+        "set_ms": lambda menu: menu.set_ms,
+        "rest_ms": lambda menu: menu.rest_ms,
+        "sets": lambda menu: menu.sets,
+        "total": lambda menu: total_duration(build_sequence(menu)),
+    }
+    hits = []
+    for menu in menus:
+        name = menu.name.casefold()
+        if not name.startswith(query.name_prefix) or any(needle not in name for needle in query.name_contains):
+            continue
+        if all(
+            (low is None or values[field](menu) >= low) and (high is None or values[field](menu) <= high)
+            for field, (low, high) in query.ranges.items()
+        ):
+            hits.append(menu.name)
+    return hits
+
+
+@pytest.mark.parametrize("text", QUERIES + EXTRA_QUERIES)
+def test_scan_agrees_with_brute_force(menus, text):
+    assert [menu.name for menu in scan(menus, text)] == brute_force(menus, text)
+
+
+def test_scan_stops_after_the_page(menus):
+    seen = []
+
+    def library():
+        for menu in menus:
+            seen.append(menu)
+            yield menu
+
+    page = list(islice(scan(library(), "sets>2 rest>2"), 21))
+
+    assert len(page) == 21
+    assert len(seen) < len(menus) // 10
+
+
+def test_parse_query_narrows_repeated_bounds():
+    query = parse_query("total>=30m total<=45m total<40m sets=3 name:HI*")
+
+    assert query.ranges == {"total": (1_800_000, 2_399_999), "sets": (3, 3)}
+    assert query.name_prefix == "hi"
+
+
+@pytest.mark.parametrize("text", ["name<3", "colour=red", "sets=abc"])
+def test_parse_query_rejects_bad_tokens(text):
+    with pytest.raises(ValueError):
+        parse_query(text)
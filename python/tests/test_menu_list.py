@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import random
+
+from circuit_timer_pkg.domain.menu_list import MenuListModel
+
+NAMES = ["core", "Cardio", "cardio", "HIIT", "hiit-30", "legs", "Legs", "upper", "コア", "コア2"]
+
+
+def expected_order(names):
+    return sorted(names, key=lambda name: (name.casefold(), name))
+
+
+def test_filter_selects_the_prefix_range():
+    model = MenuListModel(NAMES)
+
+    model.set_filter("CAR")
+    assert model.window(0, 10) == ["Cardio", "cardio"]
+    assert model.index("cardio") == 1 and model.index("core") is None
+
+    model.set_filter("コア")
+    assert model.window(0, 10) == ["コア", "コア2"]
+
+    model.set_filter("zzz")
+    assert len(model) == 0 and model.window(0, 10) == []
+
+    model.set_filter("")
+    assert model.window(0, 100) == expected_order(NAMES)
+
+
+def test_casefold_ties_sort_by_the_original_name():
+    model = MenuListModel(["legs", "LEGS", "Legs"])
+
+    assert model.window(0, 3) == ["LEGS", "Legs", "legs"]
+    assert [model.index(name) for name in ("LEGS", "Legs", "legs")] == [0, 1, 2]
+
+
+def test_insert_and_remove_keep_order_inside_and_outside_the_filter():
+    rng = random.Random(3)
+    names = list(NAMES)
+    model = MenuListModel(names)
+    model.set_filter("c")
+    for step in range(200):
+        name = rng.choice(["Core", "cargo", "abs", "calf", "Zone", "cardio", "コア3"]) + str(step % 7)
+        if name in names:
+            row = model.remove(name)
+            names.remove(name)
+            assert (row is None) == (not name.casefold().startswith("c"))
+        else:
+            row = model.insert(name)
+            names.append(name)
+            visible = [found for found in expected_order(names) if found.casefold().startswith("c")]
+            assert row == (visible.index(name) if name in visible else None)
+        assert model.window(0, 1000) == [found for found in expected_order(names) if found.casefold().startswith("c")]
+    model.set_filter("")
+    assert model.window(0, 1000) == expected_order(names)
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import pytest
+
+from circuit_timer_pkg.domain.controller import TimerController
+from circuit_timer_pkg.domain.menu import TrainingMenu
+from circuit_timer_pkg.domain.metrics import ControllerInstrumentation, Histogram, TimerMetrics
+
+WRAPPED = ("tick", "_emit_phase_start", "start", "start_at", "stop")
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_histogram_buckets_are_upper_inclusive_and_cumulative():
+    hist = Histogram((1.0, 2.0, 5.0))
+    for value in (0.5, 1.0, 1.5, 5.0, 7.0):
+        hist.observe(value)
+
+    assert hist.counts == [2, 1, 1, 1]
+    assert hist.cumulative() == [("1.0", 2), ("2.0", 3), ("5.0", 4), ("+Inf", 5)]
+    assert hist.snapshot() == {
+        "count": 5,
+        "sum": 15.0,
+        "max": 7.0,
+        "mean": 3.0,
+        "buckets": {"1.0": 2, "2.0": 3, "5.0": 4, "+Inf": 5},
+    }
+
+
+def test_prometheus_text_format():
+    metrics = TimerMetrics(ticks=3, merged_ticks=1)
+    metrics.tick_seconds = Histogram((0.001, 0.01))
+    metrics.tick_seconds.observe(0.0005)
+    metrics.tick_seconds.observe(0.02)
+    metrics.callback_seconds["on_tick"].observe(0.0002)
+
+    lines = metrics.to_prometheus(prefix="t").splitlines()
+
+    assert lines[:3] == ["# HELP t_ticks_total Controller tick calls.", "# TYPE t_ticks_total counter", "t_ticks_total 3"]
+    assert "t_merged_ticks_total 1" in lines
+    start = lines.index("# TYPE t_tick_seconds histogram")
+    assert lines[start + 1 : start + 6] == [
+        't_tick_seconds_bucket{le="0.001"} 1',
+        't_tick_seconds_bucket{le="0.01"} 1',
+        't_tick_seconds_bucket{le="+Inf"} 2',
+        "t_tick_seconds_sum 0.0205",
+        "t_tick_seconds_count 2",
+    ]
+    assert 't_callback_seconds_bucket{callback="on_tick",le="0.0005"} 1' in lines
+    assert 't_callback_seconds_count{callback="on_tick"} 1' in lines
+    assert all(line.startswith("# ") or len(line.split(" ")) == 2 for line in lines)
+
+
+def test_instrumentation_records_and_restores_the_controller():
+    def on_tick(_phase, _remaining, _elapsed):
+        clock.now += 0.001
+
+    clock = FakeClock()
+    controller = TimerController(on_tick=on_tick)
+    controller.load_menu(TrainingMenu.from_seconds("t", 3, 1, 2))
+    instrumentation = ControllerInstrumentation(controller, clock=clock)
+
+    instrumentation.enable()
+    assert set(WRAPPED) <= set(vars(controller))
+    controller.start()
+    for step in (1.0, 2.0, 4.5):
+        clock.now = step
+        controller.tick(1000 if step < 4 else 2000)
+    instrumentation.disable()
+
+    metrics = instrumentation.metrics
+    assert (metrics.ticks, metrics.merged_ticks, metrics.missed_ticks) == (3, 1, 1)
+    assert metrics.callback_seconds["on_tick"].count == 4
+    assert metrics.tick_jitter_seconds.max == pytest.approx(0.5, abs=0.01)
+    assert not set(WRAPPED) & set(vars(controller))
+    assert controller.on_tick is on_tick
+    assert controller.tick.__func__ is TimerController.tick
+    ticks = metrics.ticks
+    controller.tick()
+    assert metrics.ticks == ticks
+
+
+def test_callbacks_replaced_while_enabled_are_kept():
+    controller = TimerController(on_tick=lambda *_args: None)
+    instrumentation = ControllerInstrumentation(controller)
+    instrumentation.enable()
+
+    def replacement(*_args):
+        return None
+
+    controller.on_tick = replacement
+    instrumentation.disable()
+
+    assert controller.on_tick is replacement
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import math
+import random
+from itertools import combinations
+
+import pytest
+
+from circuit_timer_pkg.domain.menu import TrainingMenu
+from circuit_timer_pkg.domain.planning import MenuColumns, count_pairs_within, end_times, plan_stats, total_ms
+from circuit_timer_pkg.domain.sequence import build_sequence, total_duration
+
+
+def library(count: int) -> list:
+    rng = random.Random(count)
+    menus = [
+        TrainingMenu(f"m{index}", rng.randint(1, 120_000), rng.choice([0, rng.randint(1, 60_000)]), rng.randint(1, 20))
+        for index in range(count)
+    ]
+    # One set never rests, whatever its rest duration.
+    return menus + [TrainingMenu("single", 45_000, 15_000, 1), TrainingMenu("no-rest", 20_000, 0, 8)]
+
+
+LIBRARIES = {"empty": [], "one-set": [TrainingMenu("single", 45_000, 15_000, 1)], "mixed": library(300)}
+
+
+def as_list(column) -> list:
+    return [value.item() if hasattr(value, "item") else value for value in column]
+
+
+@pytest.mark.parametrize("name", LIBRARIES)
+def test_pure_python_matches_the_phase_sequence(name):
+    menus = LIBRARIES[name]
+    columns = MenuColumns.from_menus(menus, use_numpy=False)
+    stats = plan_stats(columns)
+    sequences = [build_sequence(menu) for menu in menus]
+
+    assert total_ms(columns) == stats.total_ms == [total_duration(phases) for phases in sequences]
+    assert stats.phases == [len(phases) for phases in sequences]
+    assert end_times(stats.total_ms, start=5, gap=7) == [
+        5 + sum(stats.total_ms[: index + 1]) + 7 * index for index in range(len(menus))
+    ]
+    for slot in (0, 60_000, 600_000, 3_600_000):
+        expected = sum(1 for a, b in combinations(stats.total_ms, 2) if a + 10_000 + b <= slot)
+        assert count_pairs_within(stats.total_ms, slot, gap=10_000) == expected
+
+
+@pytest.mark.parametrize("name", LIBRARIES)
+def test_numpy_matches_pure_python(name):
+    pytest.importorskip("numpy")
+    menus = LIBRARIES[name]
+    plain = MenuColumns.from_menus(menus, use_numpy=False)
+    vector = MenuColumns.from_menus(menus, use_numpy=True)
+    assert vector.vectorized and not plain.vectorized
+
+    expected, actual = plan_stats(plain), plan_stats(vector)
+    for field in ("total_ms", "work_ms", "rest_ms", "phases"):
+        assert as_list(getattr(actual, field)) == getattr(expected, field)
+    for got, want in zip(as_list(actual.work_rest_ratio), expected.work_rest_ratio):
+        assert got == want or (math.isinf(got) and math.isinf(want)) or got == pytest.approx(want)
+    assert as_list(total_ms(vector)) == total_ms(plain)
+    assert as_list(end_times(total_ms(vector), start=5, gap=7)) == end_times(total_ms(plain), start=5, gap=7)
+    for slot in (0, 60_000, 600_000, 3_600_000):
+        assert count_pairs_within(total_ms(vector), slot, gap=10_000) == count_pairs_within(total_ms(plain), slot, gap=10_000)
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import pytest
+
+from circuit_timer_pkg.domain.controller import TimerController
+from circuit_timer_pkg.domain.menu import TrainingMenu
+from circuit_timer_pkg.domain.scheduler import TickSchedule, run_until_complete
+
+
+class VirtualClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def test_mid_tick_start_keeps_the_remainder():
+    schedule = TickSchedule(interval=0.5, clock=VirtualClock())
+    schedule.start(now=0.0, elapsed_ms=4500)
+
+    assert schedule.delay_until_next(0.0) == pytest.approx(0.25)
+    assert schedule.due_ms(0.24) == 0
+    assert schedule.due_ms(0.25) == 500
+    assert schedule.due_ms(0.75) == 1000
+    assert schedule.time_at(6000) == pytest.approx(0.75)
+
+
+def test_run_until_complete_reports_elapsed_on_the_schedule():
+    clock = VirtualClock()
+    controller = TimerController()
+    controller.load_menu(TrainingMenu.from_seconds("bench", 8, 2, 2))
+    schedule = TickSchedule(clock=clock)
+    seen = []
+    controller.on_tick = lambda _phase, _remaining, elapsed: seen.append((clock.now, elapsed))
+
+    schedule.start(elapsed_ms=4500)
+    controller.start_at(4500)
+    run_until_complete(controller, schedule, clock.sleep, restart=False)
+
+    assert seen[:2] == [(0.0, 4500), (pytest.approx(0.5), 5000)]
+    assert all(elapsed == pytest.approx(4500 + now * 1000) for now, elapsed in seen)
+    assert controller.elapsed_ms == controller.total_ms
+    assert clock.now == pytest.approx((controller.total_ms - 4500) / 1000)
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import pytest
+
+from circuit_timer_pkg.domain import sequence
+from circuit_timer_pkg.domain.sequence import Phase, PhaseArray, PhaseTimeline
+
+
+def test_phase_array_keeps_more_than_256_labels():
+    phases = [Phase(f"ドリル {index}", 1000, index + 1, 300) for index in range(300)]
+
+    stored = PhaseArray(phases)
+
+    assert list(stored) == phases
+    assert stored[-1].label == "ドリル 299"
+
+
+def test_phase_array_rejects_labels_past_the_code_range(monkeypatch):
+    monkeypatch.setattr(sequence, "_MAX_LABEL_CODE", 3)
+
+    with pytest.raises(ValueError):
+        PhaseArray(Phase(f"ドリル {index}", 1000, 1, 1) for index in range(3))
+
+
+def test_phase_sequences_are_unhashable():
+    for phases in (PhaseTimeline(30000, 10000, 3), PhaseArray([Phase("作業", 1000, 1, 1)])):
+        with pytest.raises(TypeError):
+            hash(phases)
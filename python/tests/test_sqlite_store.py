@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import pytest
+
+from circuit_timer_pkg.adapters import storage
+from circuit_timer_pkg.adapters.sqlite_store import MenuRepository, RepositoryCache, migrate_from_json
+from circuit_timer_pkg.domain.menu import TrainingMenu
+
+
+def menu(name: str, set_seconds: int = 30, rest_seconds: int = 10, sets: int = 3) -> TrainingMenu:
+    return TrainingMenu.from_seconds(name, set_seconds, rest_seconds, sets)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    with MenuRepository(tmp_path / "menus.sqlite3") as repo:
+        yield repo
+
+
+def test_keyset_pages_cover_the_library_once(repo):
+    names = [f"m{value:03d}" for value in range(53)]
+    repo.upsert_many(menu(name) for name in reversed(names))
+
+    seen, after = [], None
+    while True:
+        page = repo.list_page(limit=10, after=after)
+        if not page:
+            break
+        seen.extend(found.name for found in page)
+        after = page[-1].name
+
+    assert seen == names
+    assert [found.name for found in repo.list_page(limit=5, prefix="m01")] == names[10:15]
+    assert [found.name for found in repo.list_page(limit=5, after="m015", prefix="m01")] == names[16:20]
+
+
+def test_list_by_total_orders_by_duration_then_name(repo):
+    repo.upsert_many(
+        [menu("long", 60, 30, 10), menu("short-b", 10, 0, 1), menu("short-a", 10, 0, 1), menu("mid", 30, 10, 4)]
+    )
+
+    assert [found.name for found in repo.list_by_total()] == ["short-a", "short-b", "mid", "long"]
+    assert [found.name for found in repo.list_by_total(min_ms=11_000, max_ms=200_000)] == ["mid"]
+    assert [found.name for found in repo.list_by_total(limit=2, offset=1)] == ["short-b", "mid"]
+
+
+def test_upserting_a_name_again_replaces_the_row(repo):
+    repo.upsert(menu("tabata", 20, 10, 8))
+    repo.upsert(menu("tabata", 30, 15, 6))
+
+    assert repo.count() == 1
+    assert repo.get("tabata") == menu("tabata", 30, 15, 6)
+    assert repo.list_by_total(max_ms=6 * 45_000) == [menu("tabata", 30, 15, 6)]
+
+
+def test_migrate_from_json_round_trip(tmp_path):
+    json_path, db_path = tmp_path / "menus.json", tmp_path / "menus.sqlite3"
+    storage.save_menus({"tabata": menu("tabata", 20, 10, 8), "emom": menu("emom", 50, 10, 10)}, json_path)
+    storage.upsert_menu(menu("core", 40, 20, 5), json_path)
+    storage.delete_menu("emom", json_path)
+
+    assert migrate_from_json(json_path, db_path) == 2
+    assert storage.load_menus(db_path) == storage.load_menus(json_path)
+
+
+def test_storage_writes_rows_for_sqlite_paths(tmp_path):
+    path = tmp_path / "menus.sqlite3"
+    storage.save_menus({"tabata": menu("tabata"), "emom": menu("emom")}, path)
+    storage.upsert_menu(menu("core"), path)
+    storage.delete_menu("emom", path)
+
+    assert sorted(storage.load_menus(path)) == ["core", "tabata"]
+    assert not storage.compact(path)
+    assert not (tmp_path / "menus.sqlite3.journal").exists()
+
+
+def test_repository_cache_reports_other_connections_changes(tmp_path):
+    path = tmp_path / "menus.sqlite3"
+    storage.save_menus({"tabata": menu("tabata"), "emom": menu("emom")}, path)
+    cache = storage.open_cache(path)
+    assert isinstance(cache, RepositoryCache)
+    assert sorted(cache.refresh().added) == ["emom", "tabata"]
+    shared = cache.menus
+    assert shared["tabata"] == menu("tabata")
+
+    storage.upsert_menu(menu("tabata", sets=9), path)
+    storage.upsert_menu(menu("core"), path)
+    storage.delete_menu("emom", path)
+    changes = cache.refresh()
+
+    assert (changes.added, changes.removed, changes.modified) == (["core"], ["emom"], ["tabata"])
+    assert cache.menus is shared and shared["tabata"].sets == 9 and "emom" not in shared
+    assert not cache.refresh()
+    cache.close()
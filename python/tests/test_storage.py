@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import errno
+import os
+
+import pytest
+
+from circuit_timer_pkg.adapters import filelock, storage
+from circuit_timer_pkg.domain.menu import TrainingMenu
+
+
+def refuse_lock_files(monkeypatch, code: int, existing_ok: bool = False) -> list:
+    """Make opening ``*.lock`` for writing fail like it does on read-only media."""
+
+    real_open = os.open
+    read_only_opens = []
+
+    def fake_open(path, flags, *args):
+        if str(path).endswith(".lock"):
+            if flags & (os.O_RDWR | os.O_WRONLY | os.O_CREAT):
+                raise OSError(code, os.strerror(code), str(path))
+            read_only_opens.append(path)
+            if not existing_ok:
+                raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), str(path))
+        return real_open(path, flags, *args)
+
+    monkeypatch.setattr(filelock.os, "open", fake_open)
+    return read_only_opens
+
+
+@pytest.fixture
+def library(tmp_path):
+    path = tmp_path / "menus.json"
+    storage.save_menus({"tabata": TrainingMenu.from_seconds("tabata", 20, 10, 8)}, path)
+    storage.upsert_menu(TrainingMenu.from_seconds("emom", 50, 10, 10), path)
+    (tmp_path / "menus.json.lock").unlink(missing_ok=True)
+    return path
+
+
+@pytest.mark.parametrize("code", [errno.EACCES, errno.EROFS])
+def test_load_without_a_writable_lock_file(library, monkeypatch, code):
+    refuse_lock_files(monkeypatch, code)
+
+    menus = storage.load_menus(library)
+
+    assert sorted(menus) == ["emom", "tabata"]
+    assert not library.with_name("menus.json.lock").exists()
+
+
+def test_existing_lock_file_is_used_read_only(library, monkeypatch):
+    library.with_name("menus.json.lock").touch()
+    opened = refuse_lock_files(monkeypatch, errno.EACCES, existing_ok=True)
+
+    assert sorted(storage.load_menus(library)) == ["emom", "tabata"]
+    assert opened
+
+
+def test_cache_refresh_without_a_writable_lock_file(library, monkeypatch):
+    refuse_lock_files(monkeypatch, errno.EROFS)
+    cache = storage.MenuCache(library)
+
+    assert sorted(cache.refresh().added) == ["emom", "tabata"]
+
+
+def test_writers_still_need_the_lock(library, monkeypatch):
+    refuse_lock_files(monkeypatch, errno.EROFS)
+
+    with pytest.raises(OSError):
+        storage.save_menus({}, library)
+
+
+def test_cache_reports_journal_appends_in_place(library):
+    cache = storage.MenuCache(library)
+    cache.refresh()
+    shared = cache.menus
+
+    storage.upsert_menu(TrainingMenu.from_seconds("core", 40, 20, 5), library)
+    storage.upsert_menu(TrainingMenu.from_seconds("tabata", 20, 10, 6), library)
+    storage.delete_menu("emom", library)
+    changes = cache.refresh()
+
+    assert (changes.added, changes.removed, changes.modified) == (["core"], ["emom"], ["tabata"])
+    assert cache.menus is shared
+    assert sorted(shared) == ["core", "tabata"] and shared["tabata"].sets == 6
+    assert not cache.refresh()
+
+
+def test_cache_reports_a_rewritten_snapshot(library):
+    cache = storage.MenuCache(library)
+    cache.refresh()
+    shared = cache.menus
+    emom = shared["emom"]
+
+    library.write_text(
+        '[{"name": "emom", "set_seconds": 50, "rest_seconds": 10, "sets": 10},'
+        ' {"name": "tabata", "set_seconds": 20, "rest_seconds": 15, "sets": 8},'
+        ' {"name": "legs", "set_seconds": 45, "rest_seconds": 15, "sets": 4}]',
+        encoding="utf-8",
+    )
+    library.with_name("menus.json.journal").unlink()
+    changes = cache.refresh()
+
+    assert (changes.added, changes.removed, changes.modified) == (["legs"], [], ["tabata"])
+    assert cache.menus is shared and shared["emom"] is emom
+    assert shared["tabata"].rest_ms == 15000
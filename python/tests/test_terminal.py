@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import io
+
+from circuit_timer_pkg.adapters.terminal import LineRenderer, StatusRenderer, open_renderer
+
+
+class Terminal(io.StringIO):
+    def isatty(self) -> bool:
+        return True
+
+
+def frames(renderer: StatusRenderer, stream: io.StringIO, *texts: str) -> list:
+    """What each frame wrote to the stream."""
+
+    written = []
+    for text in texts:
+        start = len(stream.getvalue())
+        renderer.status(text)
+        renderer.flush()
+        written.append(stream.getvalue()[start:])
+    return written
+
+
+def test_repeated_frame_writes_nothing():
+    stream = io.StringIO()
+    renderer = StatusRenderer(stream)
+
+    assert frames(renderer, stream, "作業 00:10", "作業 00:10") == ["作業 00:10", ""]
+    assert renderer.bytes_written == len("作業 00:10".encode("utf-8"))
+
+
+def test_one_cell_change_is_a_backspace_and_the_character():
+    stream = io.StringIO()
+    renderer = StatusRenderer(stream)
+
+    assert frames(renderer, stream, "作業 00:10", "作業 00:11")[1] == "\b1"
+
+
+def test_wide_characters_count_two_cells():
+    stream = io.StringIO()
+    renderer = StatusRenderer(stream)
+
+    written = frames(renderer, stream, "作業 00:10", "休憩 00:10", "休憩 00:11", "休息 00:11")
+
+    # Back ten cells: a carriage return is cheapest.
+    assert written[1] == "\r休憩"
+    # Forward five cells from after "休憩": the escape beats re-sending " 00:1".
+    assert written[2] == "\x1b[5C1"
+    # Back eight cells (not seven characters) to the second wide character.
+    assert written[3] == "\x1b[8D息"
+
+
+def test_shorter_layout_erases_the_tail():
+    stream = io.StringIO()
+    renderer = StatusRenderer(stream)
+
+    # "休憩 0" is unchanged; rewrite from the first difference and erase the freed cell.
+    assert frames(renderer, stream, "休憩 00:10", "休憩 0:09")[1] == "\b\b\b\b:09\x1b[K"
+    renderer.line("done")
+    renderer.close()
+    assert stream.getvalue().endswith("\x1b[K\ndone\n")
+
+
+def test_open_renderer_picks_lines_for_pipes():
+    pipe = io.StringIO()
+    renderer = open_renderer(pipe)
+
+    assert isinstance(renderer, LineRenderer) and not renderer.interactive
+    renderer.status("作業 00:10")
+    renderer.bell()
+    renderer.line("完了")
+    renderer.close()
+    assert pipe.getvalue() == "完了\n"
+    assert isinstance(open_renderer(Terminal()), StatusRenderer)
+    assert isinstance(open_renderer(Terminal(), interactive=False), LineRenderer)
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from circuit_timer_pkg.domain.sequence import Phase
+from circuit_timer_pkg.domain.view_model import DirtyView, TimerFrames
+
+FIELDS = ("timer", "detail", "clock", "tenths", "progress")
+PHASE = Phase("作業", 10000, 1, 1)
+
+
+def recording_view(pushed: list) -> DirtyView:
+    return DirtyView({name: (lambda value, name=name: pushed.append((name, value))) for name in FIELDS})
+
+
+def render_second(frames: TimerFrames, view: DirtyView, remaining_ms: int) -> None:
+    elapsed_ms = PHASE.duration - remaining_ms
+    for step in range(10):
+        frames.render(view, PHASE, remaining_ms, elapsed_ms, PHASE.duration, step / 10)
+
+
+def test_whole_seconds_push_only_on_ticks():
+    pushed: list = []
+    frames, view = TimerFrames(tenths_below_ms=3000), recording_view(pushed)
+
+    render_second(frames, view, 5000)
+
+    assert not frames.sub_second(5000)
+    assert ("clock", "00:05") in pushed and ("tenths", "") in pushed
+    assert [name for name, _ in pushed].count("clock") == 1
+
+
+def test_tenths_count_down_in_the_last_seconds():
+    pushed: list = []
+    frames, view = TimerFrames(tenths_below_ms=3000), recording_view(pushed)
+    render_second(frames, view, 4000)
+    del pushed[:]
+
+    render_second(frames, view, 3000)
+
+    assert frames.sub_second(3000)
+    assert [value for name, value in pushed if name == "tenths"] == [".0", ".9", ".8", ".7", ".6", ".5", ".4", ".3", ".2", ".1"]
+    assert [value for name, value in pushed if name == "clock"] == ["00:03", "00:02"]
+    assert frames.frame(PHASE, 3000, 7000, PHASE.duration, 0.3).tenths == ".7"
+
+
+def test_tenths_count_down_the_whole_phase_by_default():
+    pushed: list = []
+    frames, view = TimerFrames(), recording_view(pushed)
+
+    frames.render(view, PHASE, 10000, 0, PHASE.duration)
+    for step in range(1, 10):
+        frames.advance(view, step / 10)
+
+    assert frames.sub_second(PHASE.duration)
+    assert [value for name, value in pushed if name == "clock"] == ["00:10", "00:09"]
+    assert [value for name, value in pushed if name == "tenths"][-2:] == [".2", ".1"]